@@ -0,0 +1,101 @@
+# arrow_bullying.py
+# Jalur load MongoDB → Arrow → pandas
+# Dokumen dari cursor diambil per batch dan langsung dipecah menjadi kolom Arrow
+# bertipe (dictionary untuk kolom kategori, int16/float32, timestamp), lalu dict
+# batch itu dibuang. Memori puncak = kolom Arrow + satu batch dokumen, bukan
+# list seluruh dokumen + DataFrame object + salinan hasil cast. Konversi ke
+# pandas memakai split_blocks/self_destruct sehingga kolom numerik tanpa null
+# tidak disalin dan buffer Arrow dilepas kolom per kolom.
+
+from itertools import islice, repeat
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from schema_bullying import TWEET_SCHEMA, CCTV_SCHEMA
+
+DEFAULT_ARROW_BATCH = 10000
+
+# dtype schema_bullying → tipe Arrow (category = dictionary agar jadi pd.Categorical tanpa cast ulang)
+ARROW_TYPES = {
+    'object': pa.string(),
+    'category': pa.dictionary(pa.int32(), pa.string()),
+    'int16': pa.int16(),
+    'float32': pa.float32(),
+    'bool': pa.bool_(),
+    'datetime': pa.timestamp('ns')
+}
+
+def arrow_schema(schema):
+    """Schema Arrow dari schema DataFrame (dict kolom → dtype) schema_bullying"""
+    return pa.schema([(name, ARROW_TYPES[dtype]) for name, dtype in schema.items()])
+
+TWEET_ARROW_SCHEMA = arrow_schema(TWEET_SCHEMA)
+CCTV_ARROW_SCHEMA = arrow_schema(CCTV_SCHEMA)
+
+def schema_projection(schema):
+    """Projection MongoDB berisi kolom schema saja (tanpa _id)"""
+    return {"_id": 0, **{name: 1 for name in schema.names}}
+
+# ========== DOKUMEN → KOLOM ==========
+def _fallback_column(values, arrow_type):
+    """Konversi lewat pandas untuk nilai campuran (angka berupa string, tanggal ISO, NaN, ...)"""
+    series = pd.Series(values, dtype=object)
+    if pa.types.is_dictionary(arrow_type) or pa.types.is_string(arrow_type):
+        series = series.where(series.notna(), None).map(lambda v: v if v is None else str(v))
+        return pa.array(series, type=pa.string())
+    if pa.types.is_timestamp(arrow_type):
+        return pa.array(pd.to_datetime(series, errors='coerce'), type=arrow_type)
+    if pa.types.is_boolean(arrow_type):
+        return pa.array(series.fillna(False).astype(bool), type=arrow_type)
+    return pc.cast(pa.array(pd.to_numeric(series, errors='coerce'), from_pandas=True), arrow_type, safe=False)
+
+def _column(values, arrow_type):
+    """Satu kolom Arrow bertipe dari list nilai Python (None/NaN = null)"""
+    value_type = arrow_type.value_type if pa.types.is_dictionary(arrow_type) else arrow_type
+    try:
+        array = pa.array(values, type=value_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = _fallback_column(values, value_type)
+    if pa.types.is_boolean(arrow_type):
+        array = array.fill_null(False)
+    if pa.types.is_dictionary(arrow_type):
+        array = array.dictionary_encode()
+    return array
+
+def docs_to_batch(docs, schema):
+    """RecordBatch dari list dokumen; field yang tidak ada di dokumen menjadi null"""
+    # map(dict.get, ...) mengambil field tanpa loop bytecode per dokumen (~2x lebih cepat)
+    columns = [_column(list(map(dict.get, docs, repeat(field.name, len(docs)))), field.type) for field in schema]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+def cursor_batches(cursor, schema, batch_size=DEFAULT_ARROW_BATCH):
+    """Generator RecordBatch dari cursor, batch_size dokumen per langkah"""
+    while True:
+        docs = list(islice(cursor, batch_size))
+        if not docs:
+            break
+        yield docs_to_batch(docs, schema)
+
+def cursor_table(cursor, schema, batch_size=DEFAULT_ARROW_BATCH):
+    """Tabel Arrow dari seluruh isi cursor (MongoDB asli maupun mongomock)"""
+    batches = list(cursor_batches(cursor, schema, batch_size))
+    if not batches:
+        return schema.empty_table()
+    return pa.Table.from_batches(batches, schema=schema).unify_dictionaries()
+
+# ========== ARROW → PANDAS ==========
+def table_to_frame(table):
+    """DataFrame dengan dtype sama seperti apply_schema
+
+    Tabel tidak boleh dipakai lagi setelah dipanggil (self_destruct melepas
+    buffer Arrow per kolom begitu kolom pandas-nya selesai dibuat).
+    """
+    # int16 dengan null tidak muat di numpy int16; samakan dengan _cast (float32)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_int16(field.type) and table.column(i).null_count:
+            table = table.set_column(i, field.name, pc.cast(table.column(i), pa.float32()))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def find_frame(cursor, schema, batch_size=DEFAULT_ARROW_BATCH):
+    """Cursor MongoDB → DataFrame lewat Arrow (pengganti pd.DataFrame(list(cursor)) + apply_schema)"""
+    return table_to_frame(cursor_table(cursor, schema, batch_size))
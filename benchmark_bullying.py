@@ -0,0 +1,484 @@
+# benchmark_bullying.py
+# Benchmark performa: NLP, pipeline, tulis/baca MongoDB, filter dan figure dashboard
+# Dataset dibuat dari generator_bullying dengan seed dan waktu tetap sehingga
+# setiap run mengukur data yang sama. Hasil (throughput, latensi p50/p95 dan
+# memori puncak) ditambahkan ke file history JSON lalu dibandingkan dengan run
+# sebelumnya untuk menandai regresi.
+#
+# Contoh:
+#   python benchmark_bullying.py                        # 10k / 100k / 1M baris
+#   python benchmark_bullying.py --sizes 10000 --only nlp
+#   python benchmark_bullying.py --mongo-uri mongodb://localhost:27017 --fail-on-regression
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from arrow_bullying import TWEET_ARROW_SCHEMA, find_frame
+from generator_bullying import tweets_table, cctv_table, alerts_table
+from index_bullying import FilterIndex, TWEET_INDEX_FIELDS
+from nlp_bullying import (
+    SentimentCache, SENTIMENT_CACHE, preprocess_text, preprocess_series,
+    analyze_sentiment, analyze_sentiment_batch, calculate_risk_level
+)
+from pipeline_bullying import DEFAULT_BATCH_SIZE, bulk_upsert_tweets, process_tweets_batched
+from query_bullying import (
+    build_tweet_filter, filter_frame, page_frame, all_cursor, fetch_all,
+    TWEET_PAGE_PROJECTION, TWEET_SORT_FIELD
+)
+from rollup_bullying import rebuild_rollups, load_rollup_stats
+from schema_bullying import TWEET_SCHEMA, CCTV_SCHEMA, apply_schema
+from stats_bullying import stats_from_frames
+from store_bullying import IncrementalStore
+
+BENCH_SEED = 2025
+BENCH_NOW = datetime(2025, 12, 15, 12, 0)
+BENCH_DB = "bullying_benchmark"
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+DEFAULT_REPEATS = 5
+DEFAULT_TIME_BUDGET = 30.0      # detik per kasus; repeat berhenti jika terlampaui
+DEFAULT_THRESHOLD = 0.20        # turun throughput / naik p95 lebih dari 20% = regresi
+MOCK_MAX_ROWS = 2000            # upsert mongomock O(n) per dokumen, ukuran lebih besar butuh mongod
+HISTORY_PATH = os.path.join("benchmarks", "history.json")
+
+# Kombinasi filter yang dipilih user di tab "Semua Tweet"
+FILTER_CASES = [
+    {},
+    {"risk_level": "merah"},
+    {"city": "Jakarta", "sentiment": "negatif"},
+    {"city": "Bandung", "risk_level": "kuning", "sentiment": "netral"}
+]
+PER_PAGE = 20
+
+BENCHMARKS = []
+
+def benchmark(name, per_item=False, needs_mongo=False):
+    """Daftarkan fungsi setup benchmark
+
+    Setup menerima (data, db) dan mengembalikan dict:
+      per_item=False -> {"run": fn, "reset": fn opsional, "items": n}
+      per_item=True  -> {"items": list, "func": fn} (latensi dicatat per panggilan)
+    """
+    def register(setup):
+        BENCHMARKS.append({"name": name, "setup": setup, "per_item": per_item, "needs_mongo": needs_mongo})
+        return setup
+    return register
+
+# ========== DATASET ==========
+class BenchData:
+    """Dataset benchmark untuk satu ukuran, setiap bagian dibuat sekali saat pertama dipakai"""
+
+    def __init__(self, size):
+        self.size = size
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def raw_tweets(self):
+        """Tweet mentah (belum diproses) sebagai list dict"""
+        return self._get("raw", lambda: tweets_table(self.size, BENCH_SEED, now=BENCH_NOW).to_pylist())
+
+    @property
+    def texts(self):
+        return self._get("texts", lambda: [tweet["text"] for tweet in self.raw_tweets])
+
+    @property
+    def cleaned(self):
+        return self._get("cleaned", lambda: preprocess_series(self.texts).tolist())
+
+    @property
+    def sentiments(self):
+        return self._get("sentiments", lambda: analyze_sentiment_batch(self.cleaned, cache=SentimentCache()))
+
+    @property
+    def processed_table(self):
+        return self._get("processed", lambda: tweets_table(self.size, BENCH_SEED, now=BENCH_NOW, processed=True))
+
+    @property
+    def processed_tweets(self):
+        return self._get("processed_records", lambda: self.processed_table.to_pylist())
+
+    @property
+    def tweets_df(self):
+        return self._get("tweets_df", lambda: apply_schema(self.processed_table.to_pandas(), TWEET_SCHEMA))
+
+    @property
+    def cctv_df(self):
+        return self._get("cctv_df", lambda: apply_schema(
+            cctv_table(self.size, BENCH_SEED, now=BENCH_NOW).to_pandas(), CCTV_SCHEMA))
+
+    @property
+    def alerts_df(self):
+        return self._get("alerts_df", lambda: alerts_table(self.processed_table, BENCH_NOW).to_pandas())
+
+    @property
+    def stats(self):
+        return self._get("stats", lambda: stats_from_frames(self.tweets_df, self.cctv_df, self.alerts_df,
+                                                            trend_days=36500))
+
+def make_db(mongo_uri):
+    """Database benchmark kosong: mongod jika mongo_uri diisi, selain itu mongomock"""
+    if mongo_uri:
+        from connection_bullying import get_client
+        client = get_client(mongo_uri, profile="pipeline")
+        client.drop_database(BENCH_DB)
+        return client[BENCH_DB]
+    import mongomock
+    return mongomock.MongoClient()[BENCH_DB]
+
+def _copies(records):
+    """Salinan dokumen (insert/update menambah _id dan field hasil ke dict asli)"""
+    return [dict(record) for record in records]
+
+# ========== NLP ==========
+@benchmark("nlp.preprocess_text", per_item=True)
+def bench_preprocess_text(data, db):
+    return {"items": data.texts, "func": preprocess_text}
+
+@benchmark("nlp.preprocess_series")
+def bench_preprocess_series(data, db):
+    return {"run": lambda: preprocess_series(data.texts), "items": data.size}
+
+@benchmark("nlp.analyze_sentiment", per_item=True)
+def bench_analyze_sentiment(data, db):
+    return {"items": data.cleaned, "func": lambda text: analyze_sentiment(text, verbose=False)}
+
+@benchmark("nlp.analyze_sentiment_batch")
+def bench_analyze_sentiment_batch(data, db):
+    # Cache baru setiap run: mengukur kondisi dingin, hit datang dari teks duplikat di batch
+    return {"run": lambda: analyze_sentiment_batch(data.cleaned, cache=SentimentCache()), "items": data.size}
+
+@benchmark("nlp.calculate_risk_level", per_item=True)
+def bench_calculate_risk_level(data, db):
+    pairs = list(zip(data.raw_tweets, data.sentiments))
+    return {"items": pairs, "func": lambda pair: calculate_risk_level(pair[0], pair[1], verbose=False)}
+
+# ========== PIPELINE & MONGODB ==========
+@benchmark("pipeline.process_tweets", needs_mongo=True)
+def bench_process_tweets(data, db):
+    state = {}
+
+    def reset():
+        db.tweets.drop()
+        db.alerts.drop()
+        SENTIMENT_CACHE.clear()
+        state["tweets"] = _copies(data.raw_tweets)
+
+    def run():
+        process_tweets_batched(db.tweets, db.alerts, state["tweets"], workers=1)
+
+    return {"run": run, "reset": reset, "items": data.size}
+
+@benchmark("mongo.save_processed_tweets", needs_mongo=True)
+def bench_save_processed_tweets(data, db):
+    state = {}
+
+    def reset():
+        db.tweets.drop()
+        state["tweets"] = _copies(data.processed_tweets)
+
+    def run():
+        tweets = state["tweets"]
+        for i in range(0, len(tweets), DEFAULT_BATCH_SIZE):
+            bulk_upsert_tweets(db.tweets, tweets[i:i + DEFAULT_BATCH_SIZE])
+
+    return {"run": run, "reset": reset, "items": data.size}
+
+def _seed_collections(data, db):
+    """Isi tweets, cctv_logs dan alerts untuk benchmark load"""
+    for name in ["tweets", "cctv_logs", "alerts"]:
+        db[name].drop()
+    db.tweets.insert_many(_copies(data.processed_tweets), ordered=False)
+    db.cctv_logs.insert_many(data.cctv_df.to_dict("records"), ordered=False)
+    db.alerts.insert_many(data.alerts_df.to_dict("records"), ordered=False)
+
+@benchmark("load.store_refresh", needs_mongo=True)
+def bench_store_refresh(data, db):
+    # Setara load_dashboard_data saat store dibangun dari awal (refresh pertama)
+    _seed_collections(data, db)
+
+    def run():
+        store = IncrementalStore(db, "tweets", "cctv_logs", "alerts")
+        store.refresh(force=True)
+        store.stats()
+
+    return {"run": run, "items": data.size}
+
+@benchmark("load.mongo_frame_dicts", needs_mongo=True)
+def bench_mongo_frame_dicts(data, db):
+    # Jalur lama: list(cursor) lalu DataFrame + apply_schema (pembanding load.mongo_frame_arrow)
+    _seed_collections(data, db)
+
+    def run():
+        docs = fetch_all(db.tweets, {"processed": True}, TWEET_PAGE_PROJECTION, TWEET_SORT_FIELD)
+        apply_schema(pd.DataFrame(docs), TWEET_SCHEMA)
+
+    return {"run": run, "items": data.size}
+
+@benchmark("load.mongo_frame_arrow", needs_mongo=True)
+def bench_mongo_frame_arrow(data, db):
+    _seed_collections(data, db)
+
+    def run():
+        cursor = all_cursor(db.tweets, {"processed": True}, TWEET_PAGE_PROJECTION, TWEET_SORT_FIELD)
+        find_frame(cursor, TWEET_ARROW_SCHEMA)
+
+    return {"run": run, "items": data.size}
+
+@benchmark("load.rollup_stats", needs_mongo=True)
+def bench_rollup_stats(data, db):
+    _seed_collections(data, db)
+    rebuild_rollups(db)
+    return {"run": lambda: load_rollup_stats(db), "items": data.size}
+
+# ========== DASHBOARD ==========
+@benchmark("dashboard.filter_frame")
+def bench_filter_frame(data, db):
+    tweets_df = data.tweets_df
+    queries = [build_tweet_filter(**case) for case in FILTER_CASES]
+
+    def run():
+        for query in queries:
+            page_frame(filter_frame(tweets_df, query), TWEET_SORT_FIELD, 1, PER_PAGE)
+
+    return {"run": run, "items": data.size * len(queries)}
+
+@benchmark("dashboard.filter_index_build")
+def bench_filter_index_build(data, db):
+    tweets_df = data.tweets_df
+    return {"run": lambda: FilterIndex(tweets_df, TWEET_INDEX_FIELDS, TWEET_SORT_FIELD), "items": data.size}
+
+@benchmark("dashboard.filter_index")
+def bench_filter_index(data, db):
+    # Index baru setiap run agar hasil filter belum ada di cache (setara ganti filter pertama kali)
+    tweets_df = data.tweets_df
+    queries = [build_tweet_filter(**case) for case in FILTER_CASES]
+    state = {}
+
+    def reset():
+        state["index"] = FilterIndex(tweets_df, TWEET_INDEX_FIELDS, TWEET_SORT_FIELD)
+
+    def run():
+        for query in queries:
+            state["index"].count(query)
+            state["index"].page(tweets_df, query, 1, PER_PAGE)
+
+    return {"run": run, "reset": reset, "items": data.size * len(queries)}
+
+@benchmark("dashboard.stats_from_frames")
+def bench_stats_from_frames(data, db):
+    return {"run": lambda: stats_from_frames(data.tweets_df, data.cctv_df, data.alerts_df), "items": data.size}
+
+def _figure(builder_name, *stat_keys):
+    """Setup benchmark untuk satu builder figure di dashboard_bullying"""
+    def setup(data, db):
+        # Import dashboard di luar `streamlit run` memicu log peringatan runtime
+        os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+        import dashboard_bullying
+        builder = getattr(dashboard_bullying, builder_name)
+        args = [data.stats[key] for key in stat_keys] if stat_keys else [data.stats]
+        return {"run": lambda: builder(*args), "items": data.size}
+    return setup
+
+benchmark("figure.create_indonesia_heatmap")(_figure("create_indonesia_heatmap", "high_risk_city", "anomaly_city"))
+benchmark("figure.create_matching_sentiment_chart")(_figure("create_matching_sentiment_chart", "sentiment"))
+benchmark("figure.create_matching_risk_chart")(_figure("create_matching_risk_chart", "risk_level"))
+benchmark("figure.create_matching_complete_dashboard")(_figure("create_matching_complete_dashboard"))
+
+# ========== PENGUKURAN ==========
+def _percentiles(seconds):
+    """p50 dan p95 dalam milidetik"""
+    values = np.array(seconds) * 1000
+    return float(np.percentile(values, 50)), float(np.percentile(values, 95))
+
+def _measure_items(case, repeats, budget):
+    """Ukur latensi setiap panggilan func atas semua item"""
+    items, func = case["items"], case["func"]
+    latencies = []
+    total = 0.0
+    runs = 0
+    while runs < repeats and (runs == 0 or total < budget):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+        total = sum(latencies)
+        runs += 1
+    p50, p95 = _percentiles(latencies)
+    return {"repeats": runs, "items": len(items), "latency": "call", "p50_ms": p50, "p95_ms": p95,
+            "items_per_sec": len(latencies) / total if total > 0 else 0.0}
+
+def _measure_runs(case, repeats, budget):
+    """Ukur waktu dinding setiap run penuh"""
+    durations = []
+    while len(durations) < repeats and sum(durations) < budget:
+        if case.get("reset"):
+            case["reset"]()
+        start = time.perf_counter()
+        case["run"]()
+        durations.append(time.perf_counter() - start)
+    p50, p95 = _percentiles(durations)
+    return {"repeats": len(durations), "items": case["items"], "latency": "run", "p50_ms": p50, "p95_ms": p95,
+            "items_per_sec": case["items"] / statistics.median(durations)}
+
+def _peak_memory_mb(case):
+    """Memori puncak (tracemalloc) satu run / satu putaran item"""
+    if case.get("reset"):
+        case["reset"]()
+    tracemalloc.start()
+    try:
+        if "run" in case:
+            case["run"]()
+        else:
+            for item in case["items"]:
+                case["func"](item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+def run_case(spec, size, data, args, backend):
+    """Jalankan satu benchmark untuk satu ukuran dataset, return dict hasil"""
+    result = {"name": spec["name"], "size": size, "backend": backend if spec["needs_mongo"] else None}
+    if spec["needs_mongo"] and backend == "mongomock" and size > MOCK_MAX_ROWS:
+        result["skipped"] = f"mongomock dibatasi {MOCK_MAX_ROWS} baris, pakai --mongo-uri"
+        return result
+
+    db = make_db(args.mongo_uri) if spec["needs_mongo"] else None
+    # Output print dari pipeline/store tidak ikut ditampilkan
+    with contextlib.redirect_stdout(io.StringIO()):
+        case = spec["setup"](data, db)
+        measure = _measure_items if spec["per_item"] else _measure_runs
+        result.update(measure(case, args.repeats, args.budget))
+        if not args.no_memory:
+            result["peak_mb"] = _peak_memory_mb(case)
+    return result
+
+# ========== HISTORY & REGRESI ==========
+def _git_commit():
+    """Commit yang sedang diukur (None jika bukan repo git)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_history(path, history):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _previous_results(history):
+    """Hasil terakhir per (nama, ukuran, backend) dari run-run sebelumnya"""
+    previous = {}
+    for run in history:
+        for result in run["results"]:
+            if "skipped" not in result:
+                previous[(result["name"], result["size"], result["backend"])] = result
+    return previous
+
+def find_regressions(results, history, threshold=DEFAULT_THRESHOLD):
+    """Bandingkan dengan run sebelumnya: throughput turun atau p95 naik melebihi threshold"""
+    previous = _previous_results(history)
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["size"], result["backend"]))
+        if before is None or "skipped" in result:
+            continue
+        if result["items_per_sec"] < before["items_per_sec"] * (1 - threshold):
+            regressions.append(f"{result['name']} [{result['size']}]: throughput "
+                               f"{before['items_per_sec']:,.0f} → {result['items_per_sec']:,.0f}/detik")
+        if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{result['name']} [{result['size']}]: p95 "
+                               f"{before['p95_ms']:.3f} → {result['p95_ms']:.3f} ms")
+    return regressions
+
+def print_result(result):
+    """Satu baris ringkasan hasil"""
+    label = f"{result['name']:<42} {result['size']:>9,}"
+    if "skipped" in result:
+        print(f"   {label}  ⏭️ {result['skipped']}")
+        return
+    memory = f"{result['peak_mb']:8.1f} MB" if "peak_mb" in result else ""
+    print(f"   {label}  {result['items_per_sec']:>12,.0f}/detik  p50 {result['p50_ms']:9.3f} ms  "
+          f"p95 {result['p95_ms']:9.3f} ms /{result['latency']:<4} {memory}")
+
+# ========== MAIN ==========
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sistem deteksi bullying")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", default=None, help="hanya benchmark yang namanya mengandung teks ini")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET, help="batas detik per kasus")
+    parser.add_argument("--mongo-uri", default=None, help="mongod untuk benchmark MongoDB (default mongomock)")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--no-memory", action="store_true", help="lewati pengukuran memori puncak")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    backend = "mongod" if args.mongo_uri else "mongomock"
+    specs = [spec for spec in BENCHMARKS
+             if not args.only or any(text in spec["name"] for text in args.only)]
+
+    print(f"🏁 Benchmark {len(specs)} kasus x ukuran {args.sizes} (seed {BENCH_SEED}, MongoDB: {backend})")
+    results = []
+    for size in args.sizes:
+        data = BenchData(size)
+        print(f"\n📦 Dataset {size:,} baris")
+        for spec in specs:
+            result = run_case(spec, size, data, args, backend)
+            print_result(result)
+            results.append(result)
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, args.threshold)
+    history.append({
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "backend": backend,
+        "results": results
+    })
+    save_history(args.history, history)
+    print(f"\n💾 History: {args.history} ({len(history)} run)")
+
+    if regressions:
+        print(f"⚠️ {len(regressions)} regresi dibanding run sebelumnya:")
+        for line in regressions:
+            print(f"   • {line}")
+        if args.fail_on_regression:
+            return 1
+    else:
+        print("✅ Tidak ada regresi")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
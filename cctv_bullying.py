@@ -0,0 +1,131 @@
+# cctv_bullying.py
+# Rule engine anomali CCTV
+# Aturan anomali (keramaian, kebisingan, area sepi saat istirahat) dievaluasi
+# sekaligus untuk satu batch pembacaan kamera dengan mask NumPy, bukan per log.
+# Ambang batas diambil dari tabel LOCATION_RULES sehingga bisa diubah tanpa
+# menyentuh kode, dan engine tidak terikat pada generator data dummy.
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+WARNING_LEVELS = np.array(["hijau", "kuning", "merah"], dtype=object)
+
+# Ambang per lokasi:
+#   normal_crowd      -> keramaian normal (dipakai generator data dummy)
+#   anomaly_threshold -> keramaian di atas nilai ini = anomali
+#   noise_threshold   -> kebisingan di atas nilai ini = anomali (None = tidak dicek)
+#   min_break_crowd   -> keramaian di bawah nilai ini saat istirahat = anomali (None = tidak dicek)
+LOCATION_RULES = {
+    "gerbang": {"normal_crowd": 5, "anomaly_threshold": 20, "noise_threshold": 65, "min_break_crowd": None},
+    "lorong": {"normal_crowd": 3, "anomaly_threshold": 15, "noise_threshold": 65, "min_break_crowd": None},
+    "kantin": {"normal_crowd": 30, "anomaly_threshold": 50, "noise_threshold": None, "min_break_crowd": 5},
+    "lapangan": {"normal_crowd": 10, "anomaly_threshold": 30, "noise_threshold": None, "min_break_crowd": 5},
+    "parkir": {"normal_crowd": 5, "anomaly_threshold": 15, "noise_threshold": 65, "min_break_crowd": None},
+    "toilet": {"normal_crowd": 2, "anomaly_threshold": 5, "noise_threshold": 65, "min_break_crowd": None},
+    "kelas": {"normal_crowd": 25, "anomaly_threshold": 35, "noise_threshold": 65, "min_break_crowd": None}
+}
+
+# Lokasi di luar tabel: keramaian tidak dicek, kebisingan tetap dicek
+DEFAULT_RULE = {"normal_crowd": None, "anomaly_threshold": None, "noise_threshold": 65, "min_break_crowd": None}
+
+CROWD_RED_FACTOR = 1.5  # keramaian > ambang x 1.5 = merah
+NOISE_RED_LEVEL = 75    # kebisingan > nilai ini = merah
+
+# Jam istirahat dalam menit sejak 00:00, [mulai, selesai): 10:00-10:30 dan 12:00-13:00
+BREAK_WINDOWS = [(10 * 60, 10 * 60 + 30), (12 * 60, 13 * 60)]
+
+# ========== TABEL ATURAN ==========
+def _rule_arrays(rules):
+    """Ubah tabel aturan menjadi array per kolom (indeks terakhir = DEFAULT_RULE)
+
+    Nilai None menjadi inf (untuk batas atas) atau -inf (untuk batas bawah)
+    sehingga perbandingan di mask otomatis selalu False.
+    """
+    rows = list(rules.values()) + [DEFAULT_RULE]
+
+    def column(name, missing):
+        return np.array([missing if row[name] is None else row[name] for row in rows], dtype=np.float64)
+
+    return {
+        "anomaly_threshold": column("anomaly_threshold", np.inf),
+        "noise_threshold": column("noise_threshold", np.inf),
+        "min_break_crowd": column("min_break_crowd", -np.inf)
+    }
+
+# ========== AMBIL KOLOM ==========
+def _frame_columns(df, locations):
+    """(indeks lokasi, menit dalam hari, keramaian, kebisingan) dari DataFrame"""
+    location_idx = pd.Index(locations).get_indexer(df["location"])
+    timestamp = pd.to_datetime(df["timestamp"])
+    minutes = (timestamp.dt.hour * 60 + timestamp.dt.minute).to_numpy()
+    crowd = pd.to_numeric(df["crowd_level"], errors="coerce").to_numpy(dtype=np.float64)
+    noise = pd.to_numeric(df["noise_level"], errors="coerce").to_numpy(dtype=np.float64)
+    return location_idx, minutes, crowd, noise
+
+def _arrow_columns(batch, locations):
+    """(indeks lokasi, menit dalam hari, keramaian, kebisingan) dari RecordBatch/Table Arrow"""
+    location_idx = pc.index_in(batch.column("location"), value_set=pa.array(locations))
+    location_idx = location_idx.fill_null(-1).to_numpy(zero_copy_only=False)
+    timestamp = batch.column("timestamp")
+    minutes = pc.add(pc.multiply(pc.hour(timestamp), 60), pc.minute(timestamp)).to_numpy(zero_copy_only=False)
+    crowd = pc.cast(batch.column("crowd_level"), pa.float64()).to_numpy(zero_copy_only=False)
+    noise = pc.cast(batch.column("noise_level"), pa.float64()).to_numpy(zero_copy_only=False)
+    return location_idx, minutes, crowd, noise
+
+# ========== EVALUASI ==========
+def evaluate_rules(location_idx, minutes, crowd, noise, rules=LOCATION_RULES):
+    """Evaluasi semua aturan untuk array pembacaan kamera
+
+    location_idx: indeks lokasi di tabel rules (-1 = lokasi tidak dikenal).
+    Return (is_anomaly bool array, warning_level array string). Jika beberapa
+    aturan terpenuhi, warning level mengikuti aturan terakhir (urutan sama
+    dengan aturan lama: keramaian → kebisingan → sepi saat istirahat).
+    """
+    arrays = _rule_arrays(rules)
+    location_idx = np.where(location_idx < 0, len(rules), location_idx)
+    crowd_threshold = arrays["anomaly_threshold"][location_idx]
+    noise_threshold = arrays["noise_threshold"][location_idx]
+    min_break_crowd = arrays["min_break_crowd"][location_idx]
+
+    # 0 = hijau, 1 = kuning, 2 = merah
+    levels = np.zeros(len(location_idx), dtype=np.int8)
+
+    # Rule 1: Keramaian melebihi threshold
+    crowded = crowd > crowd_threshold
+    levels = np.where(crowded, np.where(crowd > crowd_threshold * CROWD_RED_FACTOR, 2, 1), levels)
+
+    # Rule 2: Kebisingan tinggi di lokasi yang seharusnya tenang
+    noisy = noise > noise_threshold
+    levels = np.where(noisy, np.where(noise > NOISE_RED_LEVEL, 2, 1), levels)
+
+    # Rule 3: Terlalu sepi saat jam istirahat
+    is_break = np.zeros(len(location_idx), dtype=bool)
+    for start, end in BREAK_WINDOWS:
+        is_break |= (minutes >= start) & (minutes < end)
+    too_quiet = is_break & (crowd < min_break_crowd)
+    levels = np.where(too_quiet, 1, levels)
+
+    return crowded | noisy | too_quiet, WARNING_LEVELS[levels]
+
+def evaluate_cctv(readings, rules=LOCATION_RULES):
+    """Tambahkan kolom is_anomaly dan warning_level ke satu batch pembacaan CCTV
+
+    readings: DataFrame pandas atau RecordBatch/Table Arrow dengan kolom
+    location, timestamp, crowd_level, noise_level. Return objek bertipe sama.
+    """
+    locations = list(rules)
+    if isinstance(readings, (pa.RecordBatch, pa.Table)):
+        is_anomaly, warning_level = evaluate_rules(*_arrow_columns(readings, locations), rules=rules)
+        columns = {name: readings.column(name) for name in readings.schema.names}
+        columns["is_anomaly"] = pa.array(is_anomaly)
+        columns["warning_level"] = pa.array(warning_level, type=pa.string())
+        builder = pa.RecordBatch if isinstance(readings, pa.RecordBatch) else pa.Table
+        return builder.from_arrays(list(columns.values()), names=list(columns))
+
+    is_anomaly, warning_level = evaluate_rules(*_frame_columns(readings, locations), rules=rules)
+    readings = readings.copy()
+    readings["is_anomaly"] = is_anomaly
+    readings["warning_level"] = warning_level
+    return readings
@@ -0,0 +1,334 @@
+# connection_bullying.py
+# Manajemen koneksi MongoDB bersama untuk dashboard, notebook dan pipeline
+# Satu MongoClient per (URI, profil) per proses dengan pool, timeout, read
+# preference dan kompresi yang sudah diatur. Bootstrap koleksi + index
+# dijalankan sekali per deployment: hasilnya dicatat di koleksi _meta sehingga
+# connect berikutnya (proses lain / restart) cukup membaca satu dokumen.
+# Metrik pool (koneksi dibuat/dipakai, waktu tunggu checkout) dikumpulkan lewat
+# listener pymongo dan ikut diekspor ke file metrik Prometheus timing_bullying.
+# cctv_logs dibuat sebagai koleksi time-series dengan TTL log mentah; koleksi
+# lama yang masih biasa dipindahkan sekali lewat migrate_cctv_timeseries.
+
+import importlib.util
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from pymongo import MongoClient, monitoring
+from pymongo.server_api import ServerApi
+from rollup_bullying import ensure_rollup_indexes, rebuild_rollups, CCTV_RAW_DAYS
+from timing_bullying import register_metrics
+
+LOCAL_URI = "mongodb://localhost:27017/"
+APP_NAME = "bullying-detection"
+
+# Opsi pool dan timeout per profil pemakai:
+#   dashboard -> banyak sesi baca bersamaan, boleh baca dari secondary (statistik toleran lag)
+#   pipeline  -> tulis batch besar, baca/tulis ke primary dengan write concern majority
+CLIENT_PROFILES = {
+    "dashboard": {
+        "maxPoolSize": 20,
+        "minPoolSize": 2,
+        "readPreference": "secondaryPreferred",
+        "socketTimeoutMS": 20000
+    },
+    "pipeline": {
+        "maxPoolSize": 8,
+        "minPoolSize": 1,
+        "readPreference": "primary",
+        "w": "majority",
+        "socketTimeoutMS": 120000
+    }
+}
+
+COMMON_OPTIONS = {
+    "maxIdleTimeMS": 300000,
+    "connectTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 5000,
+    "waitQueueTimeoutMS": 10000,
+    "retryWrites": True,
+    "retryReads": True,
+    "appname": APP_NAME
+}
+
+# Urutan preferensi kompresi wire protocol (server memilih yang pertama didukung)
+COMPRESSOR_MODULES = [("zstd", "zstandard"), ("snappy", "snappy"), ("zlib", "zlib")]
+
+# ========== BOOTSTRAP ==========
+# Naikkan BOOTSTRAP_VERSION setiap COLLECTION_SPECS / INDEX_SPECS berubah
+BOOTSTRAP_VERSION = 4
+META_COLLECTION = "_meta"
+
+COLLECTION_SPECS = {
+    "tweets": {"validator": {"$jsonSchema": {
+        "bsonType": "object",
+        "required": ["text", "created_at"],
+        "properties": {
+            "text": {"bsonType": "string"},
+            "risk_level": {"enum": ["merah", "kuning", "hijau", "aman"]}
+        }
+    }}},
+    # Time-series per kamera (metaField), log mentah kedaluwarsa setelah CCTV_RAW_DAYS;
+    # riwayat lebih lama tersimpan di tier cctv_hourly/cctv_daily (rollup_bullying)
+    "cctv_logs": {
+        "timeseries": {"timeField": "timestamp", "metaField": "cctv_id", "granularity": "minutes"},
+        "expireAfterSeconds": CCTV_RAW_DAYS * 86400
+    },
+    "schools": {},
+    "alerts": {}
+}
+
+INDEX_SPECS = {
+    "tweets": [
+        [("created_at", -1)],                 # sorting terbaru
+        [("risk_level", 1), ("city", 1)],     # filter
+        [("tweet_id", 1)],                    # upsert bulk_write
+        [("processed", 1), ("processed_at", 1)]  # watermark store inkremental
+    ],
+    "alerts": [
+        [("created_at", -1), ("status", 1)],
+        [("tweet_id", 1)]                     # upsert satu alert per tweet
+    ],
+    "cctv_logs": [[("timestamp", -1), ("is_anomaly", 1)]]
+}
+
+# ========== METRIK POOL ==========
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Hitungan event pool koneksi pymongo untuk semua client di proses ini"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_started = {}
+        self.counts = {"created": 0, "closed": 0, "checked_out": 0, "checked_in": 0,
+                       "checkout_failed": 0, "pool_cleared": 0}
+        self.in_use = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait = 0.0
+
+    def _count(self, name, in_use=0):
+        with self._lock:
+            self.counts[name] += 1
+            self.in_use += in_use
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count("pool_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count("closed")
+
+    def connection_check_out_started(self, event):
+        self._checkout_started[threading.get_ident()] = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._checkout_started.pop(threading.get_ident(), None)
+        self._count("checkout_failed")
+
+    def connection_checked_out(self, event):
+        started = self._checkout_started.pop(threading.get_ident(), None)
+        wait = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            self.counts["checked_out"] += 1
+            self.in_use += 1
+            self.checkout_wait_seconds += wait
+            self.max_checkout_wait = max(self.max_checkout_wait, wait)
+
+    def connection_checked_in(self, event):
+        self._count("checked_in", in_use=-1)
+
+    def snapshot(self):
+        """Dict metrik pool saat ini (untuk panel debug dashboard)"""
+        with self._lock:
+            checkouts = self.counts["checked_out"]
+            return {
+                **self.counts,
+                "in_use": self.in_use,
+                "open": self.counts["created"] - self.counts["closed"],
+                "avg_checkout_wait_ms": self.checkout_wait_seconds / checkouts * 1000 if checkouts else 0.0,
+                "max_checkout_wait_ms": self.max_checkout_wait * 1000
+            }
+
+    def to_prometheus(self, prefix="bullying_mongo_pool"):
+        """Metrik pool dalam format Prometheus"""
+        stats = self.snapshot()
+        lines = [f"# TYPE {prefix}_events_total counter"]
+        for name in self.counts:
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {stats[name]}')
+        lines += [
+            f"# TYPE {prefix}_connections gauge",
+            f'{prefix}_connections{{state="open"}} {stats["open"]}',
+            f'{prefix}_connections{{state="in_use"}} {stats["in_use"]}',
+            f"# TYPE {prefix}_checkout_wait_seconds_total counter",
+            f"{prefix}_checkout_wait_seconds_total {self.checkout_wait_seconds:.6f}",
+            f"# TYPE {prefix}_checkout_wait_seconds_max gauge",
+            f"{prefix}_checkout_wait_seconds_max {self.max_checkout_wait:.6f}"
+        ]
+        return "\n".join(lines) + "\n"
+
+POOL_METRICS = PoolMetrics()
+register_metrics(POOL_METRICS.to_prometheus)
+
+# ========== CLIENT BERSAMA ==========
+_clients = {}
+_clients_lock = threading.Lock()
+_bootstrapped = set()
+
+def available_compressors():
+    """Kompresor yang modul Python-nya terpasang (zlib selalu ada)"""
+    return [name for name, module in COMPRESSOR_MODULES if importlib.util.find_spec(module) is not None]
+
+def client_options(profile="dashboard", **overrides):
+    """Opsi MongoClient untuk satu profil (overrides menimpa default)"""
+    return {
+        **COMMON_OPTIONS,
+        **CLIENT_PROFILES[profile],
+        "compressors": ",".join(available_compressors()),
+        "event_listeners": [POOL_METRICS],
+        **overrides
+    }
+
+def _option_key(value):
+    """Bentuk hashable dan sebanding dari nilai opsi client (untuk key cache client)"""
+    if isinstance(value, ServerApi):
+        return ("ServerApi", value.version, value.strict, value.deprecation_errors)
+    if isinstance(value, dict):
+        return tuple(sorted((name, _option_key(item)) for name, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_option_key(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+def get_client(uri, profile="dashboard", **overrides):
+    """MongoClient bersama per (uri, profil, overrides); dibuat dan di-ping sekali per proses"""
+    key = (uri, profile, _option_key(overrides))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            start = time.perf_counter()
+            options = client_options(profile, **overrides)
+            client = MongoClient(uri, **options)
+            try:
+                # Ping memaksa server selection + handshake sekarang, bukan di query pertama
+                client.admin.command('ping')
+            except Exception:
+                client.close()
+                raise
+            print(f"🔌 MongoClient '{profile}' siap dalam {time.perf_counter() - start:.2f}s "
+                  f"(kompresi: {options['compressors']})")
+            _clients[key] = client
+    return client
+
+def get_database(uri, db_name, profile="dashboard", bootstrap=False, **overrides):
+    """Database dari client bersama, opsional dengan bootstrap koleksi + index"""
+    db = get_client(uri, profile, **overrides)[db_name]
+    if bootstrap:
+        bootstrap_database(db)
+    return db
+
+def close_clients():
+    """Tutup semua client bersama (mis. di akhir script/notebook)"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+def _create_collection(db, name, options):
+    """Buat koleksi dengan opsi COLLECTION_SPECS"""
+    try:
+        db.create_collection(name, **options)
+    except NotImplementedError:
+        # mongomock tidak mendukung validator $jsonSchema maupun time-series
+        db.create_collection(name)
+
+def _is_timeseries(db, name):
+    """True jika koleksi sudah time-series (mongomock tanpa info koleksi dianggap sudah)"""
+    try:
+        info = next(iter(db.list_collections(filter={"name": name})), None)
+    except NotImplementedError:
+        return True
+    return bool(info) and info.get("type") == "timeseries"
+
+def bootstrap_database(db, force=False):
+    """Buat koleksi + index sekali per deployment (dicatat di _meta dengan BOOTSTRAP_VERSION)
+
+    Return True jika bootstrap dijalankan, False jika sudah pernah untuk versi ini.
+    """
+    key = (id(db.client), db.name)
+    if not force and key in _bootstrapped:
+        return False
+    marker = db[META_COLLECTION].find_one({"_id": "bootstrap"})
+    if not force and marker and marker.get("version") == BOOTSTRAP_VERSION:
+        _bootstrapped.add(key)
+        return False
+
+    print("🔍 Bootstrap koleksi dan index MongoDB...")
+    existing = set(db.list_collection_names())
+    for name, options in COLLECTION_SPECS.items():
+        if name not in existing:
+            _create_collection(db, name, options)
+            print(f"📁 Koleksi '{name}' dibuat")
+        elif "timeseries" in options and not _is_timeseries(db, name):
+            print(f"⚠️ Koleksi '{name}' masih koleksi biasa, jalankan migrate_cctv_timeseries(db) "
+                  f"untuk pindah ke time-series")
+    for name, indexes in INDEX_SPECS.items():
+        for keys in indexes:
+            db[name].create_index(keys)
+    ensure_rollup_indexes(db)  # Index kunci koleksi rollup (daily_stats, cctv_hourly, alert_daily)
+    db[META_COLLECTION].replace_one(
+        {"_id": "bootstrap"},
+        {"_id": "bootstrap", "version": BOOTSTRAP_VERSION, "at": datetime.now()},
+        upsert=True
+    )
+    _bootstrapped.add(key)
+    print("✅ Koleksi dan index siap")
+    return True
+
+def migrate_cctv_timeseries(db, name="cctv_logs", batch_size=10000):
+    """Pindahkan cctv_logs biasa ke koleksi time-series (sekali, saat upgrade deployment lama)
+
+    Rollup dibangun ulang dulu dari seluruh log lama sehingga riwayatnya tetap
+    ada di tier per jam/hari, lalu hanya log dalam CCTV_RAW_DAYS terakhir yang
+    disalin. Koleksi lama di-rename menjadi <name>_legacy dan tidak dihapus
+    otomatis. Return jumlah log yang disalin.
+    """
+    options = COLLECTION_SPECS["cctv_logs"]
+    if _is_timeseries(db, name):
+        print(f"✅ Koleksi '{name}' sudah time-series")
+        return 0
+    start = time.perf_counter()
+    rebuild_rollups(db, cctv_name=name, cctv_complete=True)
+    legacy = f"{name}_legacy"
+    db[name].rename(legacy)
+    _create_collection(db, name, options)
+    for keys in INDEX_SPECS.get("cctv_logs", []):
+        db[name].create_index(keys)
+
+    since = datetime.now() - timedelta(days=CCTV_RAW_DAYS)
+    cursor = db[legacy].find({"timestamp": {"$gte": since}}, {"_id": 0}).batch_size(batch_size)
+    copied = 0
+    while True:
+        docs = list(islice(cursor, batch_size))
+        if not docs:
+            break
+        db[name].insert_many(docs, ordered=False)
+        copied += len(docs)
+    print(f"✅ '{name}' dipindah ke time-series: {copied:,} log {CCTV_RAW_DAYS} hari terakhir disalin "
+          f"dalam {time.perf_counter() - start:.1f}s; hapus '{legacy}' setelah dicek")
+    return copied
@@ -8,14 +8,28 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from pymongo import MongoClient
 from pymongo.server_api import ServerApi
+import os
 import time
 import urllib.parse
 import warnings
 warnings.filterwarnings('ignore')
 from plotly.subplots import make_subplots
-import random
+from query_bullying import (
+    SEMUA, TWEET_PAGE_PROJECTION, CCTV_PAGE_PROJECTION, TWEET_SORT_FIELD, CCTV_SORT_FIELD,
+    build_tweet_filter, build_cctv_filter, page_cursor, all_cursor, fetch_distinct
+)
+from stats_bullying import stats_from_frames
+from rollup_bullying import CCTV_ROLLUP_STATS, CCTV_RAW_DAYS, load_cctv_range_stats
+from store_bullying import IncrementalStore
+from source_bullying import StoreDataSource, FileDataSource
+from schema_bullying import tweets_frame, cctv_frame, frame_memory_mb
+from generator_bullying import tweets_table, cctv_table, alerts_table, schools_table
+from arrow_bullying import TWEET_ARROW_SCHEMA, CCTV_ARROW_SCHEMA, cursor_table, table_to_frame
+from index_bullying import FilterIndex, TWEET_INDEX_FIELDS, CCTV_INDEX_FIELDS
+import timing_bullying as timing
+from timing_bullying import timed, timed_call
+from connection_bullying import POOL_METRICS, get_database
 
 # ========== KONFIGURASI MONGODB ATLAS ==========
 MONGODB_USERNAME = "f1d02310107"
@@ -35,6 +49,19 @@ COLLECTION_CCTV = "cctv_logs"
 COLLECTION_ALERTS = "alerts"
 COLLECTION_SCHOOLS = "schools"
 
+# Folder hasil export notebook, dipakai sebagai sumber data offline
+EXPORT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "HASIL_ANALISIS_BULLYING")
+
+# Ukuran data dummy (hanya dipakai jika MongoDB dan file export tidak ada)
+DUMMY_TWEETS = 500
+DUMMY_CCTV_LOGS = 100
+
+# Schema Arrow per koleksi yang dibaca per halaman (kolom + dtype sama dengan schema_bullying)
+COLLECTION_SCHEMAS = {
+    COLLECTION_TWEETS: TWEET_ARROW_SCHEMA,
+    COLLECTION_CCTV: CCTV_ARROW_SCHEMA
+}
+
 # Koordinat kota di Indonesia
 CITY_COORDINATES = {
     "Jakarta": {"lat": -6.2088, "lon": 106.8456},
@@ -117,166 +144,336 @@ st.markdown("""
 # ========== FUNGSI KONEKSI MONGODB ==========
 @st.cache_resource
 def init_connection():
-    """Connect ke MongoDB Atlas - FIX error"""
+    """Connect ke MongoDB Atlas lewat client bersama (pool, timeout, read preference, kompresi)"""
     try:
-        client = MongoClient(MONGODB_ATLAS_URI, server_api=ServerApi('1'))
-        db = client[DB_NAME]
-        # Test koneksi
-        client.admin.command('ping')
-        return db
+        return get_database(MONGODB_ATLAS_URI, DB_NAME, profile="dashboard", server_api=ServerApi('1'))
     except Exception as e:
         st.sidebar.error(f"❌ MongoDB Error: {str(e)[:100]}")
         return None
 
-# ========== FUNGSI LOAD DATA ==========
-@st.cache_data(ttl=30)
-def load_mongodb_data():
-    """Load data dari MongoDB - FIX error dengan debug info"""
+@st.cache_resource
+def init_store():
+    """Store statistik inkremental, satu untuk semua sesi dashboard"""
     db = init_connection()
-    
     if db is None:
-        st.warning("⚠️ Menggunakan data dummy karena tidak bisa konek ke MongoDB")
-        return create_dummy_data(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return None
+    return IncrementalStore(db, COLLECTION_TWEETS, COLLECTION_CCTV, COLLECTION_ALERTS)
+
+@st.cache_resource
+def init_data_source():
+    """Pilih sumber data: MongoDB jika terkoneksi, lalu file export terbaru (offline)"""
+    store = init_store()
+    if store is not None:
+        return StoreDataSource(store)
+    file_source = FileDataSource(EXPORT_FOLDER)
+    if file_source.available():
+        return file_source
+    return None
+
+# ========== FUNGSI LOAD DATA ==========
+def load_dashboard_data(force_refresh=False):
+    """Load statistik dashboard dari sumber data aktif
+    
+    MongoDB: statistik dari store inkremental (refresh hanya mengagregasi dokumen baru
+    sejak watermark terakhir), tab explorer membaca MongoDB per halaman.
+    File export: DataFrame dimuat sekali per file terbaru dan dipakai explorer pandas.
+    Return (stats, tweets_df, cctv_df). Data dummy hanya dipakai jika keduanya tidak ada.
+    """
+    source = init_data_source()
+    
+    if source is None:
+        st.warning("⚠️ Menggunakan data dummy karena tidak bisa konek ke MongoDB dan file export tidak ditemukan")
+        return load_dummy_data()
+    
+    if source.name == "file":
+        st.info("📂 MongoDB tidak tersedia, dashboard membaca file export terbaru")
     
     try:
-        # AMBIL DATA dengan debug print
-        print("🔍 Loading data from MongoDB...")
+        # AMBIL STATISTIK dengan debug print
+        print(f"🔍 Loading statistik dari sumber '{source.name}'...")
         
-        # Tweets
-        tweets = list(db[COLLECTION_TWEETS].find({"processed": True}))
-        print(f"   • Tweets loaded: {len(tweets)}")
-        if tweets:
-            print(f"   • Tweet fields: {list(tweets[0].keys())[:10]}...")
+        with timed(f"load.refresh.{source.name}"):
+            source.refresh(force=force_refresh)
+        stale = source.stale()
+        if stale:
+            st.warning(f"⏳ Data {', '.join(stale)} belum terbaru ({', '.join(stale.values())}), menampilkan hasil terakhir")
+        with timed(f"load.stats.{source.name}"):
+            stats = source.stats()
+        stats['data_version'] = f"{source.name}-{source.version}"
+        with timed(f"load.frames.{source.name}") as span:
+            tweets_df, cctv_df = source.frames()
+            span.measure(tweets_df)
+        print(f"   • Tweets: {stats['total_tweets']}")
+        print(f"   • CCTV logs: {stats['total_cctv']}")
+        print(f"   • Alert 7 hari: {int(stats['alert_trend']['alert_count'].sum())}")
         
-        # CCTV - ambil semua, tidak ada filter
-        cctv = list(db[COLLECTION_CCTV].find())
-        print(f"   • CCTV logs loaded: {len(cctv)}")
-        if cctv:
-            print(f"   • CCTV fields: {list(cctv[0].keys())}")
-        
-        # Alerts
-        alerts = list(db[COLLECTION_ALERTS].find())
-        print(f"   • Alerts loaded: {len(alerts)}")
-        
-        # Schools
-        schools = list(db[COLLECTION_SCHOOLS].find())
-        print(f"   • Schools loaded: {len(schools)}")
-        
-        return tweets, cctv, alerts, schools
+        return stats, tweets_df, cctv_df
         
     except Exception as e:
         st.error(f"Error loading data: {e}")
         import traceback
         traceback.print_exc()
-        return create_dummy_data(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return load_dummy_data()
+
+@timed_call("load.dummy")
+@st.cache_data(ttl=30)
+def load_dummy_data():
+    """Bungkus data dummy menjadi format yang sama dengan load_dashboard_data"""
+    tweets_data, cctv_data, alerts_data, schools_data = create_dummy_data()
+    tweets_df = tweets_frame(tweets_data)
+    cctv_df = cctv_frame(cctv_data)
+    stats = stats_from_frames(tweets_df, cctv_df, pd.DataFrame(alerts_data))
+    # Data dummy dibuat ulang setiap TTL habis, jadi setiap pembuatan adalah versi baru
+    stats['data_version'] = f"dummy-{datetime.now():%Y%m%d%H%M%S%f}"
+    return stats, tweets_df, cctv_df
 
 def create_dummy_data():
-    """Buat data dummy jika MongoDB error"""
+    """Buat data dummy jika MongoDB error (generator vectorized, tweet sudah berlabel)"""
     print("⚠️ Membuat data dummy...")
-    
-    cities = list(CITY_COORDINATES.keys())[:10]
-    sentiments = ['positif', 'netral', 'negatif']
-    risk_levels = ['merah', 'kuning', 'hijau', 'aman']
-    categories = ['korban_direct', 'pelaku', 'saksi', 'support', 'report', 'positif_umum']
-    locations = ['gerbang', 'lorong', 'kantin', 'lapangan', 'parkir', 'toilet', 'kelas']
-    
-    # Buat dummy tweets
-    tweets_data = []
-    for i in range(500):
-        city = random.choice(cities)
-        sentiment = random.choices(sentiments, weights=[0.2, 0.3, 0.5])[0]
-        risk_level = random.choices(risk_levels, weights=[0.3, 0.4, 0.2, 0.1])[0]
-        category = random.choice(categories)
-        
-        tweets_data.append({
-            'tweet_id': f'dummy_tweet_{i}',
-            'text': f'Contoh tweet tentang bullying di sekolah {i} di kota {city}',
-            'city': city,
-            'sentiment': sentiment,
-            'risk_level': risk_level,
-            'risk_score': random.randint(1, 20),
-            'bullying_detected': risk_level in ['merah', 'kuning'],
-            'created_at': datetime.now() - timedelta(days=random.randint(0, 30)),
-            'school': f'SMP Negeri {random.randint(1, 5)} {city}',
-            'category': category,
-            'processed': True
-        })
-    
-    # Buat dummy CCTV logs
-    cctv_data = []
-    for i in range(100):
-        city = random.choice(cities)
-        location = random.choice(locations)
-        
-        cctv_data.append({
-            'log_id': f'cctv_log_{i}',
-            'cctv_id': f'cctv_{random.randint(1, 20)}',
-            'school': f'SMP Negeri {random.randint(1, 5)} {city}',
-            'city': city,
-            'location': location,
-            'timestamp': datetime.now() - timedelta(hours=random.randint(0, 72)),
-            'crowd_level': random.randint(1, 100),
-            'noise_level': random.randint(30, 90),
-            'is_anomaly': random.choice([True, False, False, False]),  # 25% anomaly
-            'warning_level': random.choice(['merah', 'kuning', 'hijau']),
-            'processed': False
-        })
-    
-    return tweets_data, cctv_data, [], []
+    now = datetime.now()
+    tweets = tweets_table(DUMMY_TWEETS, seed=None, now=now, processed=True)
+    cctv = cctv_table(DUMMY_CCTV_LOGS, seed=None, now=now)
+    alerts = alerts_table(tweets, now)
+    return tweets.to_pandas(), cctv.to_pandas(), alerts.to_pandas(), schools_table(seed=None, now=now).to_pandas()
+
+# ========== FUNGSI QUERY PER HALAMAN ==========
+@timed_call(lambda collection_name, *args: f"mongo.count.{collection_name}")
+@st.cache_data(ttl=30)
+def count_mongodb(collection_name, query):
+    """Hitung dokumen yang cocok dengan filter langsung di MongoDB"""
+    db = init_connection()
+    return db[collection_name].count_documents(query)
+
+@timed_call(lambda collection_name, *args: f"mongo.page.{collection_name}")
+@st.cache_data(ttl=30)
+def load_mongodb_page(collection_name, query, projection, sort_field, page, per_page):
+    """Ambil satu halaman data dari MongoDB (filter + projection + skip/limit)"""
+    db = init_connection()
+    cursor = page_cursor(db[collection_name], query, projection, sort_field, page, per_page)
+    with timed(f"mongo.fetch.{collection_name}") as span:
+        table = span.measure(cursor_table(cursor, COLLECTION_SCHEMAS[collection_name]))
+    with timed(f"frame.build.{collection_name}") as span:
+        return span.measure(table_to_frame(table))
+
+@timed_call(lambda collection_name, *args: f"mongo.filtered.{collection_name}")
+@st.cache_data(ttl=30)
+def load_mongodb_filtered(collection_name, query, projection, sort_field):
+    """Ambil semua data hasil filter untuk download CSV (per batch cursor langsung ke Arrow)"""
+    db = init_connection()
+    cursor = all_cursor(db[collection_name], query, projection, sort_field)
+    with timed(f"mongo.fetch.{collection_name}") as span:
+        table = span.measure(cursor_table(cursor, COLLECTION_SCHEMAS[collection_name]))
+    with timed(f"frame.build.{collection_name}") as span:
+        return span.measure(table_to_frame(table))
+
+@timed_call(lambda collection_name, field, *args: f"mongo.distinct.{collection_name}.{field}")
+@st.cache_data(ttl=300)
+def load_filter_options(collection_name, field, query):
+    """Ambil nilai unik untuk selectbox filter"""
+    db = init_connection()
+    return fetch_distinct(db[collection_name], field, query)
+
+# ========== FUNGSI TAMPILAN EXPLORER ==========
+RISK_EMOJI = {'merah': '🔴', 'kuning': '🟡', 'hijau': '🟢', 'aman': '🔵'}
+SENTIMENT_EMOJI = {'positif': '😊', 'netral': '😐', 'negatif': '😔'}
+WARNING_EMOJI = {'merah': '🔴', 'kuning': '🟡', 'hijau': '🟢'}
+
+VIEW_TABLE = "📋 Tabel ringkas"
+VIEW_CARDS = "🗂️ Kartu detail"
+
+TWEET_TABLE_COLUMNS = ['created_at', 'city', 'school', 'text', 'sentiment', 'risk_level',
+                       'risk_score', 'category', 'tweet_id']
+CCTV_TABLE_COLUMNS = ['timestamp', 'cctv_id', 'school', 'city', 'location', 'status',
+                      'warning_level', 'crowd_level', 'noise_level']
+
+TWEET_COLUMN_CONFIG = {
+    'created_at': st.column_config.DatetimeColumn("Waktu", format="YYYY-MM-DD HH:mm"),
+    'city': "Kota",
+    'school': "Sekolah",
+    'text': st.column_config.TextColumn("💬 Text", width="large"),
+    'sentiment': "Sentimen",
+    'risk_level': "Risk",
+    'risk_score': st.column_config.ProgressColumn("Score", min_value=0, max_value=20, format="%.1f"),
+    'category': "Category",
+    'tweet_id': "ID"
+}
+
+CCTV_COLUMN_CONFIG = {
+    'timestamp': st.column_config.DatetimeColumn("Waktu", format="YYYY-MM-DD HH:mm"),
+    'cctv_id': "CCTV",
+    'school': "Sekolah",
+    'city': "Kota",
+    'location': "Lokasi",
+    'status': "Status",
+    'warning_level': "Warning",
+    'crowd_level': st.column_config.NumberColumn("👥 Keramaian", format="%d orang"),
+    'noise_level': st.column_config.NumberColumn("🔊 Kebisingan", format="%d dB")
+}
+
+def _with_emoji(values, emoji_map):
+    """Tambahkan emoji di depan nilai kategori (vectorized)"""
+    values = values.astype(object).fillna('N/A').astype(str)
+    return values.map(emoji_map).fillna('⚪') + ' ' + values
+
+def _time_strings(values):
+    """Format kolom waktu menjadi 'YYYY-MM-DD HH:MM' untuk label"""
+    times = pd.to_datetime(values, errors='coerce')
+    return times.dt.strftime('%Y-%m-%d %H:%M').fillna(values.astype(str))
+
+def build_tweet_table(page_tweets):
+    """Tabel ringkas satu halaman tweet, dibangun per kolom tanpa loop per baris"""
+    table = page_tweets.reindex(columns=TWEET_TABLE_COLUMNS).reset_index(drop=True)
+    table['created_at'] = pd.to_datetime(table['created_at'], errors='coerce')
+    table['sentiment'] = _with_emoji(table['sentiment'], SENTIMENT_EMOJI)
+    table['risk_level'] = _with_emoji(table['risk_level'], RISK_EMOJI)
+    table['risk_score'] = pd.to_numeric(table['risk_score'], errors='coerce')
+    return table
+
+def build_cctv_table(page_cctv):
+    """Tabel ringkas satu halaman log CCTV, dibangun per kolom tanpa loop per baris"""
+    table = page_cctv.reindex(columns=CCTV_TABLE_COLUMNS + ['log_id', 'is_anomaly']).reset_index(drop=True)
+    table['timestamp'] = pd.to_datetime(table['timestamp'], errors='coerce')
+    table['cctv_id'] = table['cctv_id'].astype(object).fillna(table['log_id'])
+    table['status'] = np.where(table['is_anomaly'].fillna(False).astype(bool), "🔴 ANOMALI", "🟢 NORMAL")
+    table['warning_level'] = _with_emoji(table['warning_level'], WARNING_EMOJI)
+    return table[CCTV_TABLE_COLUMNS]
+
+def tweet_labels(page_tweets):
+    """Label pilihan baris tweet: 'Tweet dari <kota> - <waktu>'"""
+    cities = page_tweets.get('city', pd.Series('N/A', index=page_tweets.index)).astype(object).fillna('N/A').astype(str)
+    times = _time_strings(page_tweets.get('created_at', pd.Series('N/A', index=page_tweets.index)))
+    return ("Tweet dari " + cities + " - " + times).tolist()
+
+def cctv_labels(page_cctv):
+    """Label pilihan baris CCTV: '<status> CCTV <id> - <waktu>'"""
+    table = page_cctv.reindex(columns=['cctv_id', 'log_id', 'is_anomaly', 'timestamp'])
+    ids = table['cctv_id'].astype(object).fillna(table['log_id']).fillna('N/A').astype(str)
+    colors = pd.Series(np.where(table['is_anomaly'].fillna(False).astype(bool), "🔴", "🟢"), index=table.index)
+    times = _time_strings(table['timestamp'].fillna('N/A'))
+    return (colors + " CCTV " + ids + " - " + times).tolist()
+
+def render_tweet_detail(tweet):
+    """Detail satu tweet (isi kartu expander / panel baris terpilih)"""
+    col_a, col_b = st.columns([3, 1])
+
+    with col_a:
+        # Text (potong jika terlalu panjang)
+        text = str(tweet.get('text', 'N/A'))
+        if len(text) > 300:
+            text = text[:300] + "..."
+        st.write(f"**💬 Text:** {text}")
+
+        # School
+        school = str(tweet.get('school', 'N/A'))
+        st.write(f"**🏫 Sekolah:** {school}")
+
+    with col_b:
+        risk_level = tweet.get('risk_level', 'aman')
+        st.write(f"{RISK_EMOJI.get(risk_level, '⚪')} **Risk:** {risk_level}")
+
+        # Sentiment dengan emoji
+        sentiment = tweet.get('sentiment', 'N/A')
+        st.write(f"{SENTIMENT_EMOJI.get(sentiment, '❓')} **Sentimen:** {sentiment}")
+
+        # Risk score
+        risk_score = tweet.get('risk_score', 'N/A')
+        st.write(f"📊 **Score:** {risk_score}/20")
+
+    # Footer info
+    st.caption(f"ID: {tweet.get('tweet_id', 'N/A')} • Category: {tweet.get('category', 'N/A')}")
+
+def render_cctv_detail(log):
+    """Detail satu log CCTV (isi kartu expander / panel baris terpilih)"""
+    col_a, col_b = st.columns(2)
+
+    with col_a:
+        st.write(f"**🏫 Sekolah:** {log.get('school', 'N/A')}")
+        st.write(f"**📍 Lokasi:** {log.get('location', 'N/A')}")
+        st.write(f"**🌆 Kota:** {log.get('city', 'N/A')}")
+
+    with col_b:
+        # Status
+        anomaly_status = "🔴 ANOMALI" if log.get('is_anomaly', False) else "🟢 NORMAL"
+        st.write(f"**📊 Status:** {anomaly_status}")
+
+        # Warning level
+        warning_level = log.get('warning_level', 'N/A')
+        st.write(f"{WARNING_EMOJI.get(warning_level, '⚪')} **Warning:** {warning_level}")
+
+        # Metrics
+        st.write(f"**👥 Keramaian:** {log.get('crowd_level', 'N/A')} orang")
+        st.write(f"**🔊 Kebisingan:** {log.get('noise_level', 'N/A')} dB")
+
+def render_page(page_df, view_mode, build_table, column_config, labels, render_detail, key):
+    """Tampilkan satu halaman data
+
+    Mode tabel: satu st.dataframe + detail hanya untuk baris yang dipilih.
+    Mode kartu: satu expander per baris (tampilan lama, lebih berat).
+    """
+    if view_mode == VIEW_CARDS:
+        st.markdown('<div class="data-container">', unsafe_allow_html=True)
+        for label, (_, row) in zip(labels, page_df.iterrows()):
+            with st.expander(label, expanded=False):
+                render_detail(row)
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+
+    table = build_table(page_df)
+    st.dataframe(table, column_config=column_config, hide_index=True,
+                 use_container_width=True, height=min(600, 38 + 35 * len(table)))
+    # Nomor baris membuat label unik walau kota dan waktunya sama
+    options = [f"{i + 1}. {label}" for i, label in enumerate(labels)]
+    selected = st.selectbox("🔎 Lihat detail:", options, key=key)
+    if selected is not None:
+        with st.container(border=True):
+            render_detail(page_df.iloc[options.index(selected)])
 
 # ========== FUNGSI UNTUK PETA ==========
-def create_indonesia_heatmap(tweets_df, cctv_df):
-    """Buat heatmap peta Indonesia seperti di notebook"""
-    if tweets_df.empty and cctv_df.empty:
-        return None
+# Tabel koordinat dibangun sekali saat import, dipakai untuk join per kota
+CITY_COORDINATES_DF = pd.DataFrame.from_dict(CITY_COORDINATES, orient='index').rename_axis('city')
+
+# Bobot anomali CCTV terhadap tweet risiko tinggi di peta
+CCTV_HEAT_WEIGHT = 2
+
+def build_heat_frame(high_risk_city_counts, anomaly_city_counts):
+    """Gabungkan hitungan tweet risiko tinggi dan anomali CCTV per kota (outer join)
+
+    Return DataFrame (city, lat, lon, count, type, label). Kota tanpa koordinat
+    dibuang; urutan: kota tweet dulu, lalu kota yang hanya punya anomali CCTV.
+    """
+    counts = pd.concat({'tweet': high_risk_city_counts, 'cctv': anomaly_city_counts},
+                       axis=1, sort=False)
+    heat_df = counts.join(CITY_COORDINATES_DF, how='inner')
+    if heat_df.empty:
+        return pd.DataFrame(columns=['city', 'lat', 'lon', 'count', 'type', 'label'])
     
-    heat_data = []
+    has_tweet = heat_df['tweet'].notna()
+    has_cctv = heat_df['cctv'].notna()
+    tweet = heat_df['tweet'].fillna(0).astype('int64')
+    cctv = heat_df['cctv'].fillna(0).astype('int64')
     
-    # 1. Hitung tweet risiko tinggi per kota
-    if not tweets_df.empty and 'city' in tweets_df.columns and 'risk_level' in tweets_df.columns:
-        high_risk_tweets = tweets_df[tweets_df['risk_level'].isin(['merah', 'kuning'])]
-        if not high_risk_tweets.empty:
-            tweet_counts = high_risk_tweets['city'].value_counts()
-            for city, count in tweet_counts.items():
-                if city in CITY_COORDINATES:
-                    heat_data.append({
-                        'city': city,
-                        'lat': CITY_COORDINATES[city]['lat'],
-                        'lon': CITY_COORDINATES[city]['lon'],
-                        'count': count,
-                        'type': 'tweet',
-                        'label': f'Tweet: {count} risiko tinggi'
-                    })
+    heat_df['count'] = tweet + cctv * CCTV_HEAT_WEIGHT
+    heat_df['type'] = np.where(has_tweet, 'tweet', 'cctv')
     
-    # 2. Hitung anomali CCTV per kota
-    if not cctv_df.empty and 'city' in cctv_df.columns and 'is_anomaly' in cctv_df.columns:
-        anomaly_df = cctv_df[cctv_df['is_anomaly'] == True]
-        if not anomaly_df.empty:
-            cctv_counts = anomaly_df['city'].value_counts()
-            for city, count in cctv_counts.items():
-                if city in CITY_COORDINATES:
-                    # Cek apakah kota sudah ada di data
-                    found = False
-                    for item in heat_data:
-                        if item['city'] == city:
-                            item['count'] += count * 2  # CCTV lebih berat
-                            item['label'] = f"{item['label']} + CCTV: {count}"
-                            found = True
-                            break
-                    if not found:
-                        heat_data.append({
-                            'city': city,
-                            'lat': CITY_COORDINATES[city]['lat'],
-                            'lon': CITY_COORDINATES[city]['lon'],
-                            'count': count * 2,
-                            'type': 'cctv',
-                            'label': f'CCTV: {count} anomali'
-                        })
+    # Label: "Tweet: n risiko tinggi[ + CCTV: m]" atau "CCTV: m anomali"
+    tweet_label = 'Tweet: ' + tweet.astype(str) + ' risiko tinggi'
+    cctv_suffix = (' + CCTV: ' + cctv.astype(str)).where(has_cctv, '')
+    heat_df['label'] = (tweet_label + cctv_suffix).where(has_tweet, 'CCTV: ' + cctv.astype(str) + ' anomali')
     
-    if not heat_data:
+    heat_df = heat_df.rename_axis('city').reset_index()
+    return heat_df[['city', 'lat', 'lon', 'count', 'type', 'label']]
+
+def create_indonesia_heatmap(high_risk_city_counts, anomaly_city_counts):
+    """Buat heatmap peta Indonesia seperti di notebook
+    
+    Input berupa hitungan per kota: tweet risiko tinggi dan anomali CCTV.
+    """
+    if high_risk_city_counts.empty and anomaly_city_counts.empty:
         return None
     
-    heat_df = pd.DataFrame(heat_data)
+    heat_df = build_heat_frame(high_risk_city_counts, anomaly_city_counts)
+    if heat_df.empty:
+        return None
     
     # Buat scatter map
     fig = px.scatter_geo(
@@ -327,13 +524,11 @@ def create_indonesia_heatmap(tweets_df, cctv_df):
     return fig
 
 # ========== FUNGSI VISUALISASI ==========
-def create_matching_sentiment_chart(tweets_df):
-    """Buat chart sentimen SAMA dengan notebook"""
-    if tweets_df.empty or 'sentiment' not in tweets_df.columns:
+def create_matching_sentiment_chart(sentiment_counts):
+    """Buat chart sentimen SAMA dengan notebook (input: hitungan per sentimen)"""
+    if sentiment_counts.empty:
         return None
     
-    sentiment_counts = tweets_df['sentiment'].value_counts()
-    
     fig = px.pie(
         values=sentiment_counts.values,
         names=sentiment_counts.index,
@@ -351,13 +546,11 @@ def create_matching_sentiment_chart(tweets_df):
     
     return fig
 
-def create_matching_risk_chart(tweets_df):
-    """Buat chart risk level SAMA dengan notebook"""
-    if tweets_df.empty or 'risk_level' not in tweets_df.columns:
+def create_matching_risk_chart(risk_counts):
+    """Buat chart risk level SAMA dengan notebook (input: hitungan per level risiko)"""
+    if risk_counts.empty:
         return None
     
-    risk_counts = tweets_df['risk_level'].value_counts()
-    
     fig = px.bar(
         x=risk_counts.index,
         y=risk_counts.values,
@@ -377,9 +570,9 @@ def create_matching_risk_chart(tweets_df):
     
     return fig
 
-def create_matching_complete_dashboard(tweets_df, cctv_df, alerts_df):
-    """Buat dashboard lengkap SAMA dengan notebook"""
-    if tweets_df.empty:
+def create_matching_complete_dashboard(stats):
+    """Buat dashboard lengkap SAMA dengan notebook dari hasil agregasi"""
+    if stats['total_tweets'] == 0:
         return None
     
     fig = make_subplots(
@@ -393,8 +586,8 @@ def create_matching_complete_dashboard(tweets_df, cctv_df, alerts_df):
     )
     
     # 1. Pie chart sentimen
-    if 'sentiment' in tweets_df.columns:
-        sentiment_counts = tweets_df['sentiment'].value_counts()
+    if not stats['sentiment'].empty:
+        sentiment_counts = stats['sentiment']
         fig.add_trace(
             go.Pie(labels=sentiment_counts.index, values=sentiment_counts.values,
                    name="Sentimen", marker_colors=['green', 'blue', 'red']),
@@ -402,11 +595,11 @@ def create_matching_complete_dashboard(tweets_df, cctv_df, alerts_df):
         )
     
     # 2. Risk level per kota
-    if 'city' in tweets_df.columns and 'risk_level' in tweets_df.columns:
+    if not stats['risk_by_city'].empty:
         # Ambil top 8 kota
-        top_cities = tweets_df['city'].value_counts().head(8).index
-        tweets_top = tweets_df[tweets_df['city'].isin(top_cities)]
-        risk_by_city = tweets_top.groupby(['city', 'risk_level']).size().unstack(fill_value=0)
+        top_cities = stats['city'].head(8).index
+        risk_by_city = stats['risk_by_city']
+        risk_by_city = risk_by_city[risk_by_city.index.isin(top_cities)]
         
         colors = {'merah': 'red', 'kuning': 'yellow', 'hijau': 'green', 'aman': 'blue'}
         
@@ -419,34 +612,23 @@ def create_matching_complete_dashboard(tweets_df, cctv_df, alerts_df):
                 )
     
     # 3. Trend 7 hari terakhir
-    if not alerts_df.empty and 'created_at' in alerts_df.columns:
-        alerts_df['created_at'] = pd.to_datetime(alerts_df['created_at'])
-        last_7_days = datetime.now() - timedelta(days=7)
-        recent_alerts = alerts_df[alerts_df['created_at'] >= last_7_days]
-        
-        if not recent_alerts.empty:
-            recent_alerts['date'] = recent_alerts['created_at'].dt.date
-            daily_recent = recent_alerts.groupby('date').size().reset_index(name='alert_count')
-            
-            fig.add_trace(
-                go.Scatter(x=daily_recent['date'], y=daily_recent['alert_count'],
-                          mode='lines+markers', name='Alert Harian',
-                          line=dict(color='red', width=2)),
-                row=2, col=1
-            )
+    daily_recent = stats['alert_trend']
+    if not daily_recent.empty:
+        fig.add_trace(
+            go.Scatter(x=daily_recent['date'], y=daily_recent['alert_count'],
+                      mode='lines+markers', name='Alert Harian',
+                      line=dict(color='red', width=2)),
+            row=2, col=1
+        )
     
     # 4. CCTV anomalies by location
-    if not cctv_df.empty and 'is_anomaly' in cctv_df.columns:
-        anomaly_locations = cctv_df[cctv_df['is_anomaly'] == True]
-        
-        if not anomaly_locations.empty and 'location' in anomaly_locations.columns:
-            location_counts = anomaly_locations['location'].value_counts()
-            
-            fig.add_trace(
-                go.Bar(x=location_counts.index, y=location_counts.values,
-                       name='Anomali per Lokasi', marker_color='orange'),
-                row=2, col=2
-            )
+    location_counts = stats['anomaly_location']
+    if not location_counts.empty:
+        fig.add_trace(
+            go.Bar(x=location_counts.index, y=location_counts.values,
+                   name='Anomali per Lokasi', marker_color='orange'),
+            row=2, col=2
+        )
     
     fig.update_layout(
         height=800,
@@ -466,58 +648,175 @@ def create_matching_complete_dashboard(tweets_df, cctv_df, alerts_df):
     
     return fig
 
+# ========== CACHE FIGURE ==========
+# Figure hanya dibangun ulang jika versi data berubah. Argumen berawalan _ tidak
+# di-hash oleh Streamlit; key cache cukup versi data (+ tanggal untuk trend 7 hari).
+# Dipakai st.cache_resource agar figure yang sama dikembalikan tanpa copy/pickle,
+# figure tidak pernah diubah setelah dibuat. Span luar (figure.*) mencakup lookup
+# cache, span .build hanya muncul saat figure benar-benar dibangun ulang.
+@timed_call("figure.heatmap")
+@st.cache_resource(max_entries=4)
+def cached_heatmap(data_version, _high_risk_city_counts, _anomaly_city_counts):
+    """create_indonesia_heatmap yang di-cache per versi data"""
+    with timed("figure.heatmap.build"):
+        return create_indonesia_heatmap(_high_risk_city_counts, _anomaly_city_counts)
+
+@timed_call("figure.sentiment")
+@st.cache_resource(max_entries=4)
+def cached_sentiment_chart(data_version, _sentiment_counts):
+    """create_matching_sentiment_chart yang di-cache per versi data"""
+    with timed("figure.sentiment.build"):
+        return create_matching_sentiment_chart(_sentiment_counts)
+
+@timed_call("figure.risk")
+@st.cache_resource(max_entries=4)
+def cached_risk_chart(data_version, _risk_counts):
+    """create_matching_risk_chart yang di-cache per versi data"""
+    with timed("figure.risk.build"):
+        return create_matching_risk_chart(_risk_counts)
+
+@timed_call("figure.complete_dashboard")
+@st.cache_resource(max_entries=4)
+def cached_complete_dashboard(data_version, trend_day, _stats):
+    """create_matching_complete_dashboard yang di-cache per versi data dan hari"""
+    with timed("figure.complete_dashboard.build"):
+        return create_matching_complete_dashboard(_stats)
+
+# ========== INDEX FILTER ==========
+# Explorer pandas (file export / data dummy) memakai index bitmap yang dibangun
+# sekali per versi data dan dipakai bersama semua sesi.
+@timed_call("index.tweets")
+@st.cache_resource(max_entries=2)
+def cached_tweet_index(data_version, _tweets_df):
+    """FilterIndex tweet (kota, risk level, sentimen) per versi data"""
+    with timed("index.tweets.build", rows=len(_tweets_df)):
+        return FilterIndex(_tweets_df, TWEET_INDEX_FIELDS, TWEET_SORT_FIELD)
+
+@timed_call("index.cctv_logs")
+@st.cache_resource(max_entries=2)
+def cached_cctv_index(data_version, _cctv_df):
+    """FilterIndex log CCTV (kota, lokasi, status anomali) per versi data"""
+    with timed("index.cctv_logs.build", rows=len(_cctv_df)):
+        return FilterIndex(_cctv_df, CCTV_INDEX_FIELDS, CCTV_SORT_FIELD)
+
+# ========== RENTANG DATA CCTV ==========
+# Pilihan rentang statistik CCTV di sidebar (jumlah hari terakhir, None = semua data)
+CCTV_RANGES = {
+    "Semua data": None,
+    "24 jam terakhir": 1,
+    "7 hari terakhir": 7,
+    "30 hari terakhir": 30,
+    "90 hari terakhir": 90
+}
+
+@timed_call(lambda data_version, days, *args: f"load.cctv_range.{days}d")
+@st.cache_data(ttl=60)
+def load_cctv_range(data_version, days, _db, _cctv_df):
+    """Statistik CCTV days hari terakhir: tier rollup di MongoDB, filter timestamp di DataFrame
+
+    Return {} jika rentang tidak bisa dihitung (statistik semua data tetap dipakai).
+    """
+    if _db is not None:
+        return load_cctv_range_stats(_db, days)
+    if _cctv_df.empty or 'timestamp' not in _cctv_df.columns:
+        return {}
+    recent = _cctv_df[_cctv_df['timestamp'] >= datetime.now() - timedelta(days=days)]
+    stats = stats_from_frames(pd.DataFrame(), recent, pd.DataFrame())
+    return {key: stats[key] for key in CCTV_ROLLUP_STATS}
+
+# ========== PANEL TIMING ==========
+def render_timing_panel():
+    """Breakdown waktu per tahap untuk rerun ini di sidebar (span bertingkat diindentasi)"""
+    spans = timing.rerun_spans()
+    total_ms = timing.rerun_seconds() * 1000
+    with st.sidebar.expander(f"⏱️ Timing Rerun ({total_ms:.0f} ms)", expanded=False):
+        if not spans:
+            st.write("Belum ada tahap yang tercatat")
+            return
+        st.dataframe(timing.spans_frame(spans), use_container_width=True, hide_index=True)
+        slowest = max((span for span in spans if span.depth == 0), key=lambda span: span.seconds)
+        st.caption(f"Tahap terlama: {slowest.stage} ({slowest.seconds * 1000:.0f} ms dari {total_ms:.0f} ms)")
+        if timing.TIMING_LOG_PATH:
+            st.caption(f"Log JSON: {timing.TIMING_LOG_PATH}")
+        if timing.METRICS_FILE_PATH:
+            st.caption(f"Metrik Prometheus: {timing.METRICS_FILE_PATH}")
+
 # ========== FUNGSI UTAMA DASHBOARD ==========
 def main():
+    timing.start_rerun()
+    
     # Header
     st.markdown('<h1 class="main-header">🚨 Sistem Deteksi Bullying 🚨</h1>', unsafe_allow_html=True)
     st.markdown("**Dashboard dengan Peta Heatmap Indonesia**")
     
-    # Load data
-    tweets_data, cctv_data, alerts_data, schools_data = load_mongodb_data()
-    
-    # Convert to DataFrame
-    tweets_df = pd.DataFrame(tweets_data) if tweets_data else pd.DataFrame()
-    cctv_df = pd.DataFrame(cctv_data) if cctv_data else pd.DataFrame()
-    alerts_df = pd.DataFrame(alerts_data) if alerts_data else pd.DataFrame()
-    schools_df = pd.DataFrame(schools_data) if schools_data else pd.DataFrame()
+    # Load data (statistik hasil agregasi; DataFrame hanya untuk data dummy)
+    db = init_connection()
+    force_refresh = st.session_state.pop('force_refresh', False)
+    stats, tweets_df, cctv_df = load_dashboard_data(force_refresh)
+    data_version = stats['data_version']
     
     # Debug info di sidebar
     with st.sidebar.expander("🔍 Debug Info", expanded=False):
         st.write(f"**Data Loaded:**")
-        st.write(f"• Tweets: {len(tweets_df)} rows")
-        st.write(f"• CCTV Logs: {len(cctv_df)} rows")
-        st.write(f"• Alerts: {len(alerts_df)} rows")
+        source = init_data_source()
+        st.write(f"• Sumber: {source.describe() if source is not None else 'Data dummy'}")
+        st.write(f"• Versi data: {data_version}")
+        st.write(f"• Tweets: {stats['total_tweets']} rows")
+        st.write(f"• CCTV Logs: {stats['total_cctv']} rows")
+        st.write(f"• Alerts 7 hari: {int(stats['alert_trend']['alert_count'].sum())} rows")
+        if db is not None:
+            pool = POOL_METRICS.snapshot()
+            st.write(f"• Pool MongoDB: {pool['open']} koneksi terbuka, {pool['in_use']} dipakai, "
+                     f"tunggu checkout rata-rata {pool['avg_checkout_wait_ms']:.1f} ms "
+                     f"(maks {pool['max_checkout_wait_ms']:.1f} ms)")
         
         if not tweets_df.empty:
             st.write(f"**Tweet Columns:** {list(tweets_df.columns)[:10]}")
+            st.write(f"• Memori tweet: {frame_memory_mb(tweets_df):.2f} MB")
         
         if not cctv_df.empty:
             st.write(f"**CCTV Columns:** {list(cctv_df.columns)}")
+            st.write(f"• Memori CCTV: {frame_memory_mb(cctv_df):.2f} MB")
     
     # ========== SIDEBAR ==========
     st.sidebar.title("⚙️ Kontrol Dashboard")
     
     # Refresh button
     if st.sidebar.button("🔄 Refresh Data", use_container_width=True):
-        st.cache_data.clear()
+        # Statistik cukup ditarik delta-nya; cache per halaman dan data dummy dibuang
+        st.session_state['force_refresh'] = True
+        for cached in [count_mongodb, load_mongodb_page, load_mongodb_filtered, load_dummy_data]:
+            cached.clear()
         st.rerun()
     
+    # Rentang statistik CCTV: rentang pendek dibaca dari tier per jam, panjang dari tier per hari
+    cctv_days = CCTV_RANGES[st.sidebar.selectbox("📹 Rentang Data CCTV", list(CCTV_RANGES), key="cctv_range")]
+    chart_version = data_version
+    if cctv_days is not None:
+        range_stats = load_cctv_range(data_version, cctv_days, db, cctv_df)
+        if range_stats:
+            stats = {**stats, **range_stats}
+            chart_version = f"{data_version}-cctv{cctv_days}"
+        else:
+            st.sidebar.caption("Rollup CCTV belum tersedia, statistik CCTV mencakup semua data")
+    
     st.sidebar.markdown("---")
     st.sidebar.title("📊 Statistik Data")
     
-    st.sidebar.write(f"**Total Tweet:** {len(tweets_df)}")
+    st.sidebar.write(f"**Total Tweet:** {stats['total_tweets']}")
     
-    if not tweets_df.empty:
-        if 'sentiment' in tweets_df.columns:
-            neg_count = len(tweets_df[tweets_df['sentiment'] == 'negatif'])
+    neg_count = int(stats['sentiment'].get('negatif', 0))
+    high_risk = stats['high_risk']
+    anomalies = stats['cctv_anomalies']
+    
+    if stats['total_tweets'] > 0:
+        if not stats['sentiment'].empty:
             st.sidebar.write(f"**Sentimen Negatif:** {neg_count}")
         
-        if 'risk_level' in tweets_df.columns:
-            high_risk = len(tweets_df[tweets_df['risk_level'].isin(['merah', 'kuning'])])
+        if not stats['risk_level'].empty:
             st.sidebar.write(f"**High Risk:** {high_risk}")
     
-    if not cctv_df.empty:
-        anomalies = len(cctv_df[cctv_df['is_anomaly'] == True])
+    if stats['total_cctv'] > 0:
         st.sidebar.write(f"**Anomali CCTV:** {anomalies}")
     
     st.sidebar.markdown("---")
@@ -530,34 +829,22 @@ def main():
     
     with col1:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("📝 Total Tweet", len(tweets_df))
+        st.metric("📝 Total Tweet", stats['total_tweets'])
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if not tweets_df.empty and 'sentiment' in tweets_df.columns:
-            neg_count = len(tweets_df[tweets_df['sentiment'] == 'negatif'])
-            st.metric("😔 Sentimen Negatif", neg_count)
-        else:
-            st.metric("😔 Sentimen Negatif", 0)
+        st.metric("😔 Sentimen Negatif", neg_count)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if not tweets_df.empty and 'risk_level' in tweets_df.columns:
-            high_risk = len(tweets_df[tweets_df['risk_level'].isin(['merah', 'kuning'])])
-            st.metric("🚨 High Risk", high_risk)
-        else:
-            st.metric("🚨 High Risk", 0)
+        st.metric("🚨 High Risk", high_risk)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col4:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        if not cctv_df.empty:
-            anomalies = len(cctv_df[cctv_df['is_anomaly'] == True])
-            st.metric("📹 Anomali CCTV", anomalies)
-        else:
-            st.metric("📹 Anomali CCTV", 0)
+        st.metric("📹 Anomali CCTV", anomalies)
         st.markdown('</div>', unsafe_allow_html=True)
     
     # ========== TABS ==========
@@ -573,7 +860,7 @@ def main():
         st.markdown('<div class="sub-header">🗺️ Peta Heatmap Indonesia</div>', unsafe_allow_html=True)
         
         # Buat peta heatmap
-        heatmap_fig = create_indonesia_heatmap(tweets_df, cctv_df)
+        heatmap_fig = cached_heatmap(chart_version, stats['high_risk_city'], stats['anomaly_city'])
         
         if heatmap_fig:
             st.plotly_chart(heatmap_fig, use_container_width=True)
@@ -581,26 +868,25 @@ def main():
             # Stats di bawah peta
             col1, col2, col3 = st.columns(3)
             with col1:
-                if not tweets_df.empty and 'risk_level' in tweets_df.columns:
-                    red_tweets = len(tweets_df[tweets_df['risk_level'] == 'merah'])
+                if not stats['risk_level'].empty:
+                    red_tweets = int(stats['risk_level'].get('merah', 0))
                     st.metric("🔴 Tweet Merah", red_tweets)
             
             with col2:
-                if not tweets_df.empty and 'risk_level' in tweets_df.columns:
-                    yellow_tweets = len(tweets_df[tweets_df['risk_level'] == 'kuning'])
+                if not stats['risk_level'].empty:
+                    yellow_tweets = int(stats['risk_level'].get('kuning', 0))
                     st.metric("🟡 Tweet Kuning", yellow_tweets)
             
             with col3:
-                if not cctv_df.empty:
-                    total_anomalies = len(cctv_df[cctv_df['is_anomaly'] == True])
-                    st.metric("📹 Total Anomali", total_anomalies)
+                if stats['total_cctv'] > 0:
+                    st.metric("📹 Total Anomali", anomalies)
         else:
             st.info("Data tidak cukup untuk membuat peta heatmap")
             
             # Fallback: bar chart per kota
-            if not tweets_df.empty and 'city' in tweets_df.columns:
+            if not stats['city'].empty:
                 st.subheader("Distribusi per Kota")
-                city_counts = tweets_df['city'].value_counts().head(10).reset_index()
+                city_counts = stats['city'].head(10).reset_index()
                 city_counts.columns = ['city', 'count']
                 
                 fig_bar = px.bar(
@@ -619,7 +905,7 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig1 = create_matching_sentiment_chart(tweets_df)
+            fig1 = cached_sentiment_chart(data_version, stats['sentiment'])
             if fig1:
                 st.plotly_chart(fig1, use_container_width=True)
                 st.caption("**Distribusi Sentimen Tweet**")
@@ -627,7 +913,7 @@ def main():
                 st.info("Data sentimen tidak tersedia")
         
         with col2:
-            fig2 = create_matching_risk_chart(tweets_df)
+            fig2 = cached_risk_chart(data_version, stats['risk_level'])
             if fig2:
                 st.plotly_chart(fig2, use_container_width=True)
                 st.caption("**Distribusi Level Risiko**")
@@ -635,12 +921,11 @@ def main():
                 st.info("Data risk level tidak tersedia")
         
         # Tambahan: Trend waktu
-        if not tweets_df.empty and 'created_at' in tweets_df.columns:
+        if not stats['daily_tweets'].empty:
             st.subheader("📅 Trend Harian")
             
             try:
-                tweets_df['date'] = pd.to_datetime(tweets_df['created_at']).dt.date
-                daily_counts = tweets_df.groupby('date').size().reset_index(name='count')
+                daily_counts = stats['daily_tweets']
                 
                 fig_trend = px.line(
                     daily_counts,
@@ -656,7 +941,7 @@ def main():
     with tab3:
         st.markdown('<div class="sub-header">📊 Dashboard Lengkap (2x2 Subplots)</div>', unsafe_allow_html=True)
         
-        fig3 = create_matching_complete_dashboard(tweets_df, cctv_df, alerts_df)
+        fig3 = cached_complete_dashboard(chart_version, datetime.now().date(), stats)
         if fig3:
             st.plotly_chart(fig3, use_container_width=True)
             st.caption("**Dashboard lengkap dengan 4 visualisasi**")
@@ -664,15 +949,15 @@ def main():
             st.info("Data tidak cukup untuk membuat dashboard lengkap")
             
             # Fallback: simple dashboard
-            if not tweets_df.empty:
+            if stats['total_tweets'] > 0:
                 col1, col2 = st.columns(2)
                 with col1:
-                    fig_fallback1 = create_matching_sentiment_chart(tweets_df)
+                    fig_fallback1 = cached_sentiment_chart(data_version, stats['sentiment'])
                     if fig_fallback1:
                         st.plotly_chart(fig_fallback1, use_container_width=True)
                 
                 with col2:
-                    fig_fallback2 = create_matching_risk_chart(tweets_df)
+                    fig_fallback2 = cached_risk_chart(data_version, stats['risk_level'])
                     if fig_fallback2:
                         st.plotly_chart(fig_fallback2, use_container_width=True)
     
@@ -684,17 +969,20 @@ def main():
         sub_tab1, sub_tab2 = st.tabs(["📨 Semua Tweet", "📹 CCTV Log"])
         
         with sub_tab1:
-            if tweets_df.empty:
+            if stats['total_tweets'] == 0:
                 st.info("📭 Tidak ada data tweet yang tersedia")
                 st.write("Jalankan pipeline di notebook untuk generate data tweet")
             else:
                 st.markdown("**🔍 Filter Data Tweet:**")
                 
                 # Dapatkan unique values untuk filter
-                unique_cities = ["Semua"]
-                if 'city' in tweets_df.columns:
-                    city_list = sorted([str(c) for c in tweets_df['city'].dropna().unique()])
+                unique_cities = [SEMUA]
+                if db is not None:
+                    city_list = load_filter_options(COLLECTION_TWEETS, 'city', {"processed": True})
                     unique_cities += city_list[:15]  # Batasi ke 15 kota pertama
+                else:
+                    tweet_index = cached_tweet_index(data_version, tweets_df)
+                    unique_cities += tweet_index.values('city')[:15]  # Batasi ke 15 kota pertama
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -707,33 +995,31 @@ def main():
                 with col2:
                     selected_risk = st.selectbox(
                         "Pilih Risk Level:",
-                        ["Semua", "merah", "kuning", "hijau", "aman"],
+                        [SEMUA, "merah", "kuning", "hijau", "aman"],
                         key="risk_filter_tab4"
                     )
                 
                 with col3:
                     selected_sentiment = st.selectbox(
                         "Pilih Sentimen:",
-                        ["Semua", "positif", "netral", "negatif"],
+                        [SEMUA, "positif", "netral", "negatif"],
                         key="sentiment_filter_tab4"
                     )
                 
-                # Filter data
-                filtered_tweets = tweets_df.copy()
-                
-                if selected_city != "Semua" and 'city' in filtered_tweets.columns:
-                    filtered_tweets = filtered_tweets[filtered_tweets['city'] == selected_city]
+                # Filter data: di MongoDB jika terkoneksi, lewat index bitmap jika data file/dummy
+                tweet_query = build_tweet_filter(selected_city, selected_risk, selected_sentiment)
                 
-                if selected_risk != "Semua" and 'risk_level' in filtered_tweets.columns:
-                    filtered_tweets = filtered_tweets[filtered_tweets['risk_level'] == selected_risk]
-                
-                if selected_sentiment != "Semua" and 'sentiment' in filtered_tweets.columns:
-                    filtered_tweets = filtered_tweets[filtered_tweets['sentiment'] == selected_sentiment]
+                total_tweets = stats['total_tweets']
+                if db is not None:
+                    total_filtered = count_mongodb(COLLECTION_TWEETS, tweet_query)
+                else:
+                    with timed("filter.tweets") as span:
+                        total_filtered = span.rows = tweet_index.count(tweet_query)
                 
                 # Tampilkan jumlah hasil
-                st.markdown(f"**📊 Menampilkan {len(filtered_tweets)} dari {len(tweets_df)} tweet**")
+                st.markdown(f"**📊 Menampilkan {total_filtered} dari {total_tweets} tweet**")
                 
-                if not filtered_tweets.empty:
+                if total_filtered > 0:
                     # Pagination
                     items_per_page = st.selectbox(
                         "Items per page:",
@@ -741,8 +1027,14 @@ def main():
                         index=1,
                         key="tweet_pagination_tab4"
                     )
+                    tweet_view = st.radio(
+                        "Tampilan:",
+                        [VIEW_TABLE, VIEW_CARDS],
+                        horizontal=True,
+                        key="tweet_view_tab4"
+                    )
                     
-                    total_pages = max(1, (len(filtered_tweets) + items_per_page - 1) // items_per_page)
+                    total_pages = max(1, (total_filtered + items_per_page - 1) // items_per_page)
                     page_number = st.number_input(
                         "Page:",
                         min_value=1,
@@ -753,74 +1045,32 @@ def main():
                     )
                     
                     start_idx = (page_number - 1) * items_per_page
-                    end_idx = min(start_idx + items_per_page, len(filtered_tweets))
+                    end_idx = min(start_idx + items_per_page, total_filtered)
                     
                     st.write(f"**Halaman {page_number}/{total_pages}** (Item {start_idx+1}-{end_idx})")
                     
-                    # Container dengan scroll
-                    st.markdown('<div class="data-container">', unsafe_allow_html=True)
+                    # Hanya baris di halaman ini yang diambil
+                    if db is not None:
+                        page_tweets = load_mongodb_page(COLLECTION_TWEETS, tweet_query, TWEET_PAGE_PROJECTION,
+                                                        TWEET_SORT_FIELD, page_number, items_per_page)
+                    else:
+                        with timed("filter.tweets.page") as span:
+                            page_tweets = span.measure(tweet_index.page(tweets_df, tweet_query, page_number, items_per_page))
                     
-                    for idx in range(start_idx, end_idx):
-                        tweet = filtered_tweets.iloc[idx]
-                        
-                        # Format date jika ada
-                        created_at = tweet.get('created_at', 'N/A')
-                        if isinstance(created_at, (datetime, pd.Timestamp)):
-                            created_at_str = created_at.strftime('%Y-%m-%d %H:%M')
-                        else:
-                            created_at_str = str(created_at)
-                        
-                        # Format city
-                        city = str(tweet.get('city', 'N/A'))
-                        
-                        # Risk color mapping
-                        risk_level = tweet.get('risk_level', 'aman')
-                        risk_color = {
-                            'merah': '🔴',
-                            'kuning': '🟡', 
-                            'hijau': '🟢',
-                            'aman': '🔵'
-                        }.get(risk_level, '⚪')
-                        
-                        # Buat expander
-                        with st.expander(f"Tweet dari {city} - {created_at_str}", expanded=False):
-                            col_a, col_b = st.columns([3, 1])
-                            
-                            with col_a:
-                                # Text (potong jika terlalu panjang)
-                                text = str(tweet.get('text', 'N/A'))
-                                if len(text) > 300:
-                                    text = text[:300] + "..."
-                                st.write(f"**💬 Text:** {text}")
-                                
-                                # School
-                                school = str(tweet.get('school', 'N/A'))
-                                st.write(f"**🏫 Sekolah:** {school}")
-                            
-                            with col_b:
-                                st.write(f"{risk_color} **Risk:** {risk_level}")
-                                
-                                # Sentiment dengan emoji
-                                sentiment = tweet.get('sentiment', 'N/A')
-                                sentiment_emoji = {
-                                    'positif': '😊',
-                                    'netral': '😐', 
-                                    'negatif': '😔'
-                                }.get(sentiment, '❓')
-                                st.write(f"{sentiment_emoji} **Sentimen:** {sentiment}")
-                                
-                                # Risk score
-                                risk_score = tweet.get('risk_score', 'N/A')
-                                st.write(f"📊 **Score:** {risk_score}/20")
-                            
-                            # Footer info
-                            st.caption(f"ID: {tweet.get('tweet_id', 'N/A')} • Category: {tweet.get('category', 'N/A')}")
+                    render_page(page_tweets, tweet_view, build_tweet_table, TWEET_COLUMN_CONFIG,
+                                tweet_labels(page_tweets), render_tweet_detail, "tweet_detail_tab4")
                     
-                    st.markdown('</div>', unsafe_allow_html=True)
+                    # Download button (data lengkap hasil filter hanya diambil saat diminta)
+                    download_cols = ['text', 'city', 'school', 'sentiment', 'risk_level', 'risk_score', 'created_at']
+                    if not st.button("📦 Siapkan Data Tweet (CSV)", key="prepare_tweets_tab4"):
+                        filtered_tweets = pd.DataFrame()
+                    elif db is not None:
+                        filtered_tweets = load_mongodb_filtered(COLLECTION_TWEETS, tweet_query,
+                                                                TWEET_PAGE_PROJECTION, TWEET_SORT_FIELD)
+                    else:
+                        filtered_tweets = tweet_index.frame(tweets_df, tweet_query)
                     
-                    # Download button
                     if 'text' in filtered_tweets.columns:
-                        download_cols = ['text', 'city', 'school', 'sentiment', 'risk_level', 'risk_score', 'created_at']
                         available_cols = [col for col in download_cols if col in filtered_tweets.columns]
                         
                         if available_cols:
@@ -836,22 +1086,32 @@ def main():
                     st.info("Tidak ada tweet yang sesuai dengan filter")
         
         with sub_tab2:
-            if cctv_df.empty:
+            # Explorer membaca log mentah; total tanpa filter diambil dari tier rollup untuk
+            # jendela log mentah (count_documents tanpa filter membongkar semua bucket time-series)
+            if db is not None:
+                raw_stats = load_cctv_range(data_version, CCTV_RAW_DAYS, db, cctv_df)
+                total_cctv = int(raw_stats.get('total_cctv', stats['total_cctv']))
+            else:
+                total_cctv = len(cctv_df)
+            if total_cctv == 0:
                 st.info("📭 Tidak ada data CCTV yang tersedia")
                 st.write("Jalankan fungsi `generate_cctv_data()` di notebook untuk membuat data CCTV")
             else:
                 st.markdown("**🔍 Filter CCTV Log:**")
+                if db is not None:
+                    st.caption(f"Log mentah disimpan {CCTV_RAW_DAYS} hari terakhir; data lebih lama "
+                               f"tersedia sebagai agregat per jam/hari di statistik dan chart")
                 
                 # Dapatkan unique values untuk filter
-                cctv_cities = ["Semua"]
-                if 'city' in cctv_df.columns:
-                    city_list = sorted([str(c) for c in cctv_df['city'].dropna().unique()])
-                    cctv_cities += city_list[:10]  # Batasi ke 10 kota pertama
-                
-                cctv_locations = ["Semua"]
-                if 'location' in cctv_df.columns:
-                    location_list = sorted([str(l) for l in cctv_df['location'].dropna().unique()])
-                    cctv_locations += location_list
+                cctv_cities = [SEMUA]
+                cctv_locations = [SEMUA]
+                if db is not None:
+                    cctv_cities += load_filter_options(COLLECTION_CCTV, 'city', {})[:10]  # Batasi ke 10 kota pertama
+                    cctv_locations += load_filter_options(COLLECTION_CCTV, 'location', {})
+                else:
+                    cctv_index = cached_cctv_index(data_version, cctv_df)
+                    cctv_cities += cctv_index.values('city')[:10]  # Batasi ke 10 kota pertama
+                    cctv_locations += cctv_index.values('location')
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -871,29 +1131,24 @@ def main():
                 with col3:
                     cctv_anomaly_filter = st.selectbox(
                         "Status Anomali:",
-                        ["Semua", "Anomali", "Normal"],
+                        [SEMUA, "Anomali", "Normal"],
                         key="cctv_anomaly_filter_tab4"
                     )
                 
                 # Filter CCTV data
-                filtered_cctv = cctv_df.copy()
-                
-                if cctv_city_filter != "Semua" and 'city' in filtered_cctv.columns:
-                    filtered_cctv = filtered_cctv[filtered_cctv['city'] == cctv_city_filter]
-                
-                if cctv_location_filter != "Semua" and 'location' in filtered_cctv.columns:
-                    filtered_cctv = filtered_cctv[filtered_cctv['location'] == cctv_location_filter]
+                cctv_query = build_cctv_filter(cctv_city_filter, cctv_location_filter, cctv_anomaly_filter)
                 
-                if cctv_anomaly_filter != "Semua":
-                    if cctv_anomaly_filter == "Anomali":
-                        filtered_cctv = filtered_cctv[filtered_cctv['is_anomaly'] == True]
-                    else:
-                        filtered_cctv = filtered_cctv[filtered_cctv['is_anomaly'] == False]
+                if db is not None:
+                    # Hitung ke MongoDB hanya jika ada filter
+                    total_filtered_cctv = count_mongodb(COLLECTION_CCTV, cctv_query) if cctv_query else total_cctv
+                else:
+                    with timed("filter.cctv_logs") as span:
+                        total_filtered_cctv = span.rows = cctv_index.count(cctv_query)
                 
                 # Tampilkan jumlah hasil
-                st.markdown(f"**📊 Menampilkan {len(filtered_cctv)} dari {len(cctv_df)} log CCTV**")
+                st.markdown(f"**📊 Menampilkan {total_filtered_cctv} dari {total_cctv} log CCTV**")
                 
-                if not filtered_cctv.empty:
+                if total_filtered_cctv > 0:
                     # Pagination untuk CCTV
                     cctv_items_per_page = st.selectbox(
                         "Items per page CCTV:",
@@ -901,8 +1156,14 @@ def main():
                         index=1,
                         key="cctv_items_tab4"
                     )
+                    cctv_view = st.radio(
+                        "Tampilan CCTV:",
+                        [VIEW_TABLE, VIEW_CARDS],
+                        horizontal=True,
+                        key="cctv_view_tab4"
+                    )
                     
-                    cctv_total_pages = max(1, (len(filtered_cctv) + cctv_items_per_page - 1) // cctv_items_per_page)
+                    cctv_total_pages = max(1, (total_filtered_cctv + cctv_items_per_page - 1) // cctv_items_per_page)
                     cctv_page_number = st.number_input(
                         "Page CCTV:",
                         min_value=1,
@@ -913,72 +1174,31 @@ def main():
                     )
                     
                     cctv_start_idx = (cctv_page_number - 1) * cctv_items_per_page
-                    cctv_end_idx = min(cctv_start_idx + cctv_items_per_page, len(filtered_cctv))
+                    cctv_end_idx = min(cctv_start_idx + cctv_items_per_page, total_filtered_cctv)
                     
                     st.write(f"**Halaman {cctv_page_number}/{cctv_total_pages}** (Item {cctv_start_idx+1}-{cctv_end_idx})")
                     
-                    # Container dengan scroll
-                    st.markdown('<div class="data-container">', unsafe_allow_html=True)
+                    # Hanya baris di halaman ini yang diambil
+                    if db is not None:
+                        page_cctv = load_mongodb_page(COLLECTION_CCTV, cctv_query, CCTV_PAGE_PROJECTION,
+                                                      CCTV_SORT_FIELD, cctv_page_number, cctv_items_per_page)
+                    else:
+                        with timed("filter.cctv_logs.page") as span:
+                            page_cctv = span.measure(cctv_index.page(cctv_df, cctv_query, cctv_page_number,
+                                                                     cctv_items_per_page))
                     
-                    for idx in range(cctv_start_idx, cctv_end_idx):
-                        log = filtered_cctv.iloc[idx]
-                        
-                        # Format timestamp
-                        timestamp = log.get('timestamp', 'N/A')
-                        if isinstance(timestamp, (datetime, pd.Timestamp)):
-                            timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M')
-                        else:
-                            timestamp_str = str(timestamp)
-                        
-                        # Anomaly status
-                        is_anomaly = log.get('is_anomaly', False)
-                        anomaly_status = "🔴 ANOMALI" if is_anomaly else "🟢 NORMAL"
-                        anomaly_color = "🔴" if is_anomaly else "🟢"
-                        
-                        # CCTV ID - coba beberapa kemungkinan field
-                        cctv_id = log.get('cctv_id', 'N/A')
-                        if cctv_id == 'N/A':
-                            cctv_id = log.get('log_id', 'N/A')  # Coba field alternatif
-                        
-                        # Buat expander
-                        with st.expander(f"{anomaly_color} CCTV {cctv_id} - {timestamp_str}", expanded=False):
-                            col_a, col_b = st.columns(2)
-                            
-                            with col_a:
-                                # School
-                                school = str(log.get('school', 'N/A'))
-                                st.write(f"**🏫 Sekolah:** {school}")
-                                
-                                # Location
-                                location = str(log.get('location', 'N/A'))
-                                st.write(f"**📍 Lokasi:** {location}")
-                                
-                                # City
-                                city = str(log.get('city', 'N/A'))
-                                st.write(f"**🌆 Kota:** {city}")
-                            
-                            with col_b:
-                                # Status
-                                st.write(f"**📊 Status:** {anomaly_status}")
-                                
-                                # Warning level
-                                warning_level = log.get('warning_level', 'N/A')
-                                warning_emoji = {
-                                    'merah': '🔴',
-                                    'kuning': '🟡',
-                                    'hijau': '🟢'
-                                }.get(warning_level, '⚪')
-                                st.write(f"{warning_emoji} **Warning:** {warning_level}")
-                                
-                                # Metrics
-                                crowd_level = log.get('crowd_level', 'N/A')
-                                noise_level = log.get('noise_level', 'N/A')
-                                st.write(f"**👥 Keramaian:** {crowd_level} orang")
-                                st.write(f"**🔊 Kebisingan:** {noise_level} dB")
+                    render_page(page_cctv, cctv_view, build_cctv_table, CCTV_COLUMN_CONFIG,
+                                cctv_labels(page_cctv), render_cctv_detail, "cctv_detail_tab4")
                     
-                    st.markdown('</div>', unsafe_allow_html=True)
+                    # Download button untuk CCTV (data lengkap hasil filter hanya diambil saat diminta)
+                    if not st.button("📦 Siapkan Data CCTV (CSV)", key="prepare_cctv_tab4"):
+                        filtered_cctv = pd.DataFrame()
+                    elif db is not None:
+                        filtered_cctv = load_mongodb_filtered(COLLECTION_CCTV, cctv_query,
+                                                              CCTV_PAGE_PROJECTION, CCTV_SORT_FIELD)
+                    else:
+                        filtered_cctv = cctv_index.frame(cctv_df, cctv_query)
                     
-                    # Download button untuk CCTV
                     available_cctv_cols = []
                     possible_cols = ['timestamp', 'cctv_id', 'log_id', 'school', 'city', 'location', 
                                    'crowd_level', 'noise_level', 'is_anomaly', 'warning_level']
@@ -1012,36 +1232,34 @@ def main():
     with tab5:
         st.markdown('<div class="sub-header">📋 Data Detail dari MongoDB</div>', unsafe_allow_html=True)
         
-        if not tweets_df.empty:
+        total_tweets = stats['total_tweets']
+        if total_tweets > 0:
             # Tampilkan distribusi
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 st.write("**📊 Distribusi Sentimen:**")
-                if 'sentiment' in tweets_df.columns:
-                    sentiment_counts = tweets_df['sentiment'].value_counts()
-                    for sent, count in sentiment_counts.items():
-                        percentage = (count / len(tweets_df)) * 100
+                if not stats['sentiment'].empty:
+                    for sent, count in stats['sentiment'].items():
+                        percentage = (count / total_tweets) * 100
                         st.write(f"- {sent}: {count} ({percentage:.1f}%)")
                 else:
                     st.write("Kolom 'sentiment' tidak ditemukan")
             
             with col2:
                 st.write("**⚠️ Distribusi Risk Level:**")
-                if 'risk_level' in tweets_df.columns:
-                    risk_counts = tweets_df['risk_level'].value_counts()
-                    for risk, count in risk_counts.items():
-                        percentage = (count / len(tweets_df)) * 100
+                if not stats['risk_level'].empty:
+                    for risk, count in stats['risk_level'].items():
+                        percentage = (count / total_tweets) * 100
                         st.write(f"- {risk}: {count} ({percentage:.1f}%)")
                 else:
                     st.write("Kolom 'risk_level' tidak ditemukan")
             
             with col3:
                 st.write("**📍 Top 5 Kota:**")
-                if 'city' in tweets_df.columns:
-                    city_counts = tweets_df['city'].value_counts().head(5)
-                    for city, count in city_counts.items():
-                        percentage = (count / len(tweets_df)) * 100
+                if not stats['city'].empty:
+                    for city, count in stats['city'].head(5).items():
+                        percentage = (count / total_tweets) * 100
                         st.write(f"- {city}: {count} ({percentage:.1f}%)")
                 else:
                     st.write("Kolom 'city' tidak ditemukan")
@@ -1049,11 +1267,12 @@ def main():
             # Tampilkan sample data
             st.subheader("📊 Sample Data Tweet (10 terbaru)")
             
-            # Sort by date jika ada
-            if 'created_at' in tweets_df.columns:
-                tweets_df_sorted = tweets_df.sort_values('created_at', ascending=False)
+            # Ambil 10 terbaru langsung terurut (MongoDB) atau dari DataFrame dummy
+            if db is not None:
+                tweets_df_sorted = load_mongodb_page(COLLECTION_TWEETS, {"processed": True}, TWEET_PAGE_PROJECTION,
+                                                     TWEET_SORT_FIELD, 1, 10)
             else:
-                tweets_df_sorted = tweets_df
+                tweets_df_sorted = cached_tweet_index(data_version, tweets_df).page(tweets_df, {}, 1, 10)
             
             # Pilih kolom untuk ditampilkan
             show_cols = ['text', 'city', 'school', 'sentiment', 'risk_level', 'risk_score', 'category', 'created_at']
@@ -1090,36 +1309,33 @@ def main():
         # CCTV Data Section
         st.subheader("📹 Data CCTV Log")
         
-        if not cctv_df.empty:
+        total_cctv = stats['total_cctv']
+        if total_cctv > 0:
             # Tampilkan distribusi CCTV
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**📍 Lokasi CCTV:**")
-                if 'location' in cctv_df.columns:
-                    location_counts = cctv_df['location'].value_counts()
-                    for loc, count in location_counts.items():
-                        percentage = (count / len(cctv_df)) * 100
-                        st.write(f"- {loc}: {count} ({percentage:.1f}%)")
+                for loc, count in stats['cctv_location'].items():
+                    percentage = (count / total_cctv) * 100
+                    st.write(f"- {loc}: {count} ({percentage:.1f}%)")
             
             with col2:
                 st.write("**⚠️ Status Anomali:**")
-                if 'is_anomaly' in cctv_df.columns:
-                    anomaly_counts = cctv_df['is_anomaly'].value_counts()
-                    total = len(cctv_df)
-                    for status, count in anomaly_counts.items():
-                        status_text = "Anomali" if status else "Normal"
-                        percentage = (count / total) * 100
-                        st.write(f"- {status_text}: {count} ({percentage:.1f}%)")
+                for status, count in stats['anomaly_status'].items():
+                    status_text = "Anomali" if status else "Normal"
+                    percentage = (count / total_cctv) * 100
+                    st.write(f"- {status_text}: {count} ({percentage:.1f}%)")
             
             # Tampilkan sample CCTV data
             st.write("**Sample CCTV Logs (10 terbaru):**")
             
-            # Sort by timestamp jika ada
-            if 'timestamp' in cctv_df.columns:
-                cctv_df_sorted = cctv_df.sort_values('timestamp', ascending=False)
+            # Ambil 10 terbaru langsung terurut (MongoDB) atau dari DataFrame dummy
+            if db is not None:
+                cctv_df_sorted = load_mongodb_page(COLLECTION_CCTV, {}, CCTV_PAGE_PROJECTION,
+                                                   CCTV_SORT_FIELD, 1, 10)
             else:
-                cctv_df_sorted = cctv_df
+                cctv_df_sorted = cached_cctv_index(data_version, cctv_df).page(cctv_df, {}, 1, 10)
             
             # Pilih kolom CCTV untuk ditampilkan
             cctv_show_cols = ['cctv_id', 'log_id', 'school', 'city', 'location', 'crowd_level', 'noise_level', 'is_anomaly', 'timestamp']
@@ -1156,6 +1372,9 @@ def main():
     st.markdown("---")
     st.markdown("**Sistem Deteksi Bullying** • Teknik Informatika UNRAM • © 2025")
     st.caption(f"Dashboard terakhir di-load: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    render_timing_panel()
+    timing.finish_rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,430 @@
+# generator_bullying.py
+# Generator data sintetis untuk load test dan benchmark
+# Semua kolom dibangkitkan sekaligus per chunk dengan NumPy (tanpa loop per
+# baris) lalu disusun sebagai tabel Arrow, sehingga jutaan baris bisa dibuat
+# dalam hitungan detik. Distribusi dan schema sama dengan generator lama di
+# notebook/dashboard. Setiap chunk punya seed turunan sendiri, jadi seed dan
+# ukuran chunk yang sama selalu menghasilkan dataset yang sama persis, baik
+# ditulis ke MongoDB maupun Parquet. seed=None = data acak berbeda tiap run.
+
+import os
+import time
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from cctv_bullying import LOCATION_RULES, evaluate_rules
+from rollup_bullying import update_tweet_rollups, update_cctv_rollups, update_alert_rollups
+from snapshot_bullying import DEFAULT_COMPRESSION
+
+# Daftar kota di Indonesia
+CITIES_INDONESIA = [
+    "Jakarta", "Surabaya", "Bandung", "Medan", "Semarang",
+    "Makassar", "Palembang", "Depok", "Tangerang", "Bekasi",
+    "Mataram", "Denpasar", "Yogyakarta", "Malang", "Surakarta"
+]
+
+# Daftar sekolah contoh
+SCHOOLS_INDONESIA = [
+    "SMP Negeri 1", "SMP Negeri 2", "SMP Negeri 3", "SMP Negeri 4",
+    "SMA Negeri 1", "SMA Negeri 2", "SMA Negeri 3", "SMA Negeri 4",
+    "SMK Negeri 1", "SMK Negeri 2", "SMP Swasta ABC", "SMA Swasta XYZ"
+]
+
+# Template tweet untuk berbagai kategori
+TWEET_TEMPLATES = {
+    "korban_direct": [
+        "aku ngerasa sedih banget di sekolah, selalu dijauhin teman-teman",
+        "gak kuat lagi, setiap hari dihina di kelas",
+        "mau nangis, di-bully terus di sekolah",
+        "kenapa ya aku selalu jadi bahan olokan? capek mental",
+        "gak mau sekolah lagi, trauma di-bully",
+        "dipukuli teman di kamar mandi sekolah hari ini",
+        "uang jajan selalu diambil paksa sama senior, takut melapor",
+        "diancam kalau melapor ke guru, jadi diam aja sedih",
+        "hari ini diejek habis-habisan di depan kelas, malu banget",
+        "rasanya mau hilang saja, gak tahan dibully terus"
+    ],
+    "pelaku": [
+        "wkwk si bodoh itu makin lama makin tolol aja, asyik ngejek dia",
+        "goblok banget sih dia, gampang banget dibully, seru dah",
+        "asyik ngejek si cupu tadi, reaksinya lucu banget hahaha",
+        "hari ini ngerjain si culun lagi, reaksinya selalu bikin ketawa",
+        "gampang banget nakutin anak baru, dia langsung nangis wkwk",
+        "ngegangguin dia tuh seru, gak pernah berani melawan",
+        "wajahnya aja udah minta dijahilin, jadi ya kita jahilin",
+        "bully itu seru sih, apalagi kalo korban lemah dan gak melawan",
+        "tadi ngerjain anak kelas 7, langsung lari dia wkwk",
+        "bikin malu dia di depan temen-temen, asyik banget dah"
+    ],
+    "korban_potensial": [
+        "mulai ngerasa dijauhin teman-teman akhir-akhir ini",
+        "gak tau kenapa teman sekelas mulai menghindariku",
+        "sedih sih, kayaknya mulai gak diterima di kelompok",
+        "apa aku salah ya? kok teman-teman mulai menjaga jarak",
+        "mulai ngerasa sendiri di sekolah padahal dulu ramai",
+        "kayaknya aku mulai diabaikan sama teman dekat",
+        "rasanya ada yang beda, teman-teman mulai berubah",
+        "mulai gak diundang ke acara teman-teman",
+        "kayaknya ada yang gak beres dengan pertemananku",
+        "mulai ngerasa kesepian di sekolah"
+    ],
+    "saksi": [
+        "kasihan lihat temenku selalu dijauhin dan dihina",
+        "ada anak di sekolahku yang sering nangis di toilet sendirian",
+        "liat temen dibully tapi takut ikut campur, sedih banget",
+        "kenapa sih ada yang tega bully anak orang? kasihan liatnya",
+        "di sekolahku ada geng yang suka nakut-nakutin adik kelas",
+        "sedih liat anak kelas 7 dibully sampai mogok sekolah",
+        "harusnya sekolah jadi tempat aman, bukan tempat bully",
+        "tadi liat anak dipukuli di parkiran, tapi takut melapor",
+        "ada yang tau cara bantu korban bullying tanpa ikut dibully?",
+        "liat teman baikku dijauhin teman lain, sedih tapi bingung"
+    ],
+    "support": [
+        "akhirnya ada teman yang mau dengerin ceritaku, terima kasih",
+        "terima kasih buat guru yang bantu atasi bullying di sekolah",
+        "sekolahku mulai program anti bullying, semoga berhasil",
+        "ada support group untuk korban bullying di sekolahku",
+        "senang bisa bantu teman yang dibully, semoga dia kuat",
+        "kampanye anti bullying berhasil di sekolah, semoga terus",
+        "guru BK sangat membantu masalahku, terima kasih banyak",
+        "sekolah yang peduli membuat perbedaan besar, bangga",
+        "teman-teman mulai berubah jadi lebih baik dan peduli",
+        "merasa lebih aman di sekolah sekarang, terima kasih semua"
+    ],
+    "report": [
+        "hari ini melapor ke guru tentang bullying di kelas",
+        "sudah laporkan ke pihak sekolah tentang kekerasan di kantin",
+        "melaporkan teman yang dibully ke guru BK hari ini",
+        "orang tua sudah melapor ke sekolah tentang bullying",
+        "ada pengaduan resmi tentang bullying di sekolah kami",
+        "sudah melapor ke polisi tentang bullying yang parah",
+        "melaporkan ke dinas pendidikan tentang kasus di sekolah",
+        "pengaduan resmi sudah dibuat untuk kasus bullying",
+        "melapor ke konselor sekolah tentang teman yang dibully",
+        "pengaduan tentang bullying sudah disampaikan ke kepala sekolah"
+    ],
+    "positif_umum": [
+        "hari ini belajar kelompok seru banget dengan teman-teman",
+        "olimpiade sains di sekolah menyenangkan dan menantang",
+        "kegiatan ekstrakurikuler basket hari ini asyik banget",
+        "presentasi di kelas berjalan lancar, senang sekali",
+        "dapat nilai bagus ujian, semangat belajar terus",
+        "acara perpisahan sekolah penuh kenangan indah",
+        "study tour ke museum edukatif dan menyenangkan",
+        "kerja bakti di sekolah membuat lingkungan lebih bersih",
+        "upacara bendera hari ini khidmat dan tertib",
+        "kegiatan pramuka mengajarkan banyak keterampilan baru"
+    ]
+}
+
+# Distribusi kategori tweet (dalam persentase)
+CATEGORY_SHARES = {
+    "korban_direct": 0.25,
+    "pelaku": 0.15,
+    "saksi": 0.20,
+    "support": 0.10,
+    "report": 0.10,
+    "positif_umum": 0.10,
+    "korban_potensial": 0.10
+}
+
+# Variasi akhir tweet: 1/5 hashtag, 1/5 mention, 3/5 tanpa tambahan
+HASHTAGS = ['stopbullying', 'antibullying', 'mentalhealth', 'sekolahaman']
+MENTIONS = ['kemdikbud_ri', 'kemenpppa', 'school', 'teacher']
+SUFFIXES = [f" #{tag}" for tag in HASHTAGS] + [f" @{user}" for user in MENTIONS] + [""]
+SUFFIX_WEIGHTS = [0.2 / len(HASHTAGS)] * len(HASHTAGS) + [0.2 / len(MENTIONS)] * len(MENTIONS) + [0.6]
+
+# Hasil analisis untuk tweet yang langsung ditandai processed (data dummy dashboard)
+SENTIMENT_WEIGHTS = {'positif': 0.2, 'netral': 0.3, 'negatif': 0.5}
+RISK_WEIGHTS = {'merah': 0.3, 'kuning': 0.4, 'hijau': 0.2, 'aman': 0.1}
+
+# CCTV: kamera cctv_1..cctv_50, jam operasional 06:00-18:59, kebisingan per jenis lokasi
+CCTV_CAMERAS = 50
+CCTV_HOURS = (6, 18)
+LOUD_LOCATIONS = ["kantin", "lapangan"]
+NOISE_RANGES = {"loud": (50, 80), "normal": (30, 60)}
+
+DEFAULT_CHUNK_SIZE = 250000
+DEFAULT_SEED = 42
+
+# Seed turunan per jenis data agar tweet dan CCTV tidak memakai stream acak yang sama
+STREAM_IDS = {"tweets": 1, "cctv_logs": 2, "schools": 3}
+
+# ========== HELPER ==========
+def resolve_seed(seed):
+    """Seed tetap; None diganti entropy acak (sekali per dataset agar chunk tetap konsisten)"""
+    return np.random.SeedSequence().entropy if seed is None else seed
+
+def _rng(seed, kind, chunk_no=0):
+    """Generator acak untuk satu chunk (reprodusibel per seed, jenis data dan nomor chunk)"""
+    return np.random.default_rng([resolve_seed(seed), STREAM_IDS[kind], chunk_no])
+
+def _pick(rng, options, n, weights=None):
+    """Ambil n indeks acak dari options (seragam atau berbobot)"""
+    return rng.choice(len(options), size=n, p=weights)
+
+def _join(*parts):
+    """Gabung string per baris di Arrow (part boleh string biasa atau array)"""
+    return pc.binary_join_element_wise(*parts, "")
+
+def _numbered(prefix, start, n, suffix=""):
+    """Kolom string prefix + nomor urut (+ suffix), dibuat di Arrow tanpa loop Python"""
+    numbers = pc.cast(pa.array(np.arange(start, start + n)), pa.string())
+    return _join(prefix, numbers, suffix)
+
+def _minus_minutes(now, minutes):
+    """Array timestamp[us] = now - minutes"""
+    return np.datetime64(now, 'us') - minutes.astype('timedelta64[m]')
+
+def _school_names(cities):
+    """Semua kombinasi 'nama sekolah + kota' (indeks = kota * jumlah sekolah + sekolah)"""
+    return pa.array([f"{school} {city}" for city in cities for school in SCHOOLS_INDONESIA])
+
+def _texts():
+    """Semua kombinasi template + variasi, dan indeks awal template per kategori"""
+    texts, offsets = [], {}
+    for category in CATEGORY_SHARES:
+        offsets[category] = len(texts)
+        texts += [template + suffix for template in TWEET_TEMPLATES[category] for suffix in SUFFIXES]
+    return pa.array(texts), offsets
+
+TEXTS, TEXT_OFFSETS = _texts()
+SCHOOL_NAMES = _school_names(CITIES_INDONESIA)
+
+def category_counts(n):
+    """Jumlah tweet per kategori untuk n tweet (sisa pembulatan masuk kategori pertama)"""
+    counts = {category: int(n * share) for category, share in CATEGORY_SHARES.items()}
+    counts[next(iter(counts))] += n - sum(counts.values())
+    return counts
+
+# ========== TWEET ==========
+def tweets_table(n, seed=DEFAULT_SEED, start=0, now=None, processed=False, chunk_no=0):
+    """Tabel Arrow berisi n tweet dummy
+
+    start: nomor tweet pertama (untuk tweet_id unik antar chunk).
+    processed=True menambahkan hasil analisis acak (sentiment, risk_level, ...)
+    seperti data dummy dashboard, selain itu tweet menunggu diproses pipeline.
+    """
+    rng = _rng(seed, "tweets", chunk_no)
+    now = now or datetime.now()
+    categories = list(CATEGORY_SHARES)
+
+    # Kategori dengan proporsi tetap, urutan diacak
+    category_idx = rng.permutation(np.repeat(np.arange(len(categories)), list(category_counts(n).values())))
+    template_count = np.array([len(TWEET_TEMPLATES[category]) for category in categories])
+    template_offset = np.array([TEXT_OFFSETS[category] for category in categories])
+    template_idx = (rng.random(n) * template_count[category_idx]).astype(np.int64)
+    suffix_idx = _pick(rng, SUFFIXES, n, SUFFIX_WEIGHTS)
+    text_idx = template_offset[category_idx] + template_idx * len(SUFFIXES) + suffix_idx
+
+    city_idx = _pick(rng, CITIES_INDONESIA, n)
+    school_idx = city_idx * len(SCHOOLS_INDONESIA) + _pick(rng, SCHOOLS_INDONESIA, n)
+    minutes_ago = (rng.integers(0, 30, n, endpoint=True) * 1440
+                   + rng.integers(0, 23, n, endpoint=True) * 60
+                   + rng.integers(0, 59, n, endpoint=True))
+    created_at = _minus_minutes(now, minutes_ago)
+
+    columns = {
+        "tweet_id": _numbered("dummy_", start, n, f"_{int(now.timestamp())}"),
+        "text": TEXTS.take(pa.array(text_idx)),
+        "original_category": pa.array(np.array(categories, dtype=object)[category_idx], pa.string()),
+        "city": pa.array(np.array(CITIES_INDONESIA, dtype=object)[city_idx], pa.string()),
+        "school": SCHOOL_NAMES.take(pa.array(school_idx)),
+        "created_at": pa.array(created_at),
+        "retweet_count": pa.array(rng.integers(0, 100, n, endpoint=True, dtype=np.int32)),
+        "like_count": pa.array(rng.integers(0, 200, n, endpoint=True, dtype=np.int32)),
+        "reply_count": pa.array(rng.integers(0, 50, n, endpoint=True, dtype=np.int32)),
+        "author_id": _join("user_", pc.cast(pa.array(rng.integers(10000, 99999, n, endpoint=True)), pa.string())),
+        "is_dummy": pa.array(np.ones(n, dtype=bool)),
+        "processed": pa.array(np.full(n, processed))
+    }
+
+    if processed:
+        sentiments, risk_levels = list(SENTIMENT_WEIGHTS), list(RISK_WEIGHTS)
+        risk_idx = _pick(rng, risk_levels, n, list(RISK_WEIGHTS.values()))
+        columns.update({
+            "sentiment": pa.array(np.array(sentiments, dtype=object)[
+                _pick(rng, sentiments, n, list(SENTIMENT_WEIGHTS.values()))], pa.string()),
+            "risk_level": pa.array(np.array(risk_levels, dtype=object)[risk_idx], pa.string()),
+            "risk_score": pa.array(rng.integers(1, 20, n, endpoint=True).astype(np.float32)),
+            "category": columns["original_category"],
+            "bullying_detected": pa.array(risk_idx < 2),  # merah / kuning
+            "processed_at": pa.array(np.full(n, np.datetime64(now, 'us')))
+        })
+    else:
+        columns["risk_level"] = pa.array(np.full(n, "aman", dtype=object), pa.string())
+
+    return pa.table(columns)
+
+# ========== CCTV ==========
+def cctv_table(n, seed=DEFAULT_SEED, start=0, now=None, chunk_no=0):
+    """Tabel Arrow berisi n log CCTV dummy (anomali dari rule engine cctv_bullying)"""
+    rng = _rng(seed, "cctv_logs", chunk_no)
+    now = now or datetime.now()
+    locations = list(LOCATION_RULES)
+
+    city_idx = _pick(rng, CITIES_INDONESIA, n)
+    school_idx = city_idx * len(SCHOOLS_INDONESIA) + _pick(rng, SCHOOLS_INDONESIA, n)
+    location_idx = _pick(rng, locations, n)
+
+    # Waktu: hari ini, jam operasional sekolah
+    minutes = (rng.integers(CCTV_HOURS[0], CCTV_HOURS[1], n, endpoint=True) * 60
+               + rng.integers(0, 59, n, endpoint=True))
+    timestamp = np.datetime64(now.date(), 'us') + minutes.astype('timedelta64[m]')
+
+    # Keramaian sekitar keramaian normal lokasi, kebisingan per jenis lokasi
+    base_crowd = np.array([LOCATION_RULES[location]["normal_crowd"] for location in locations])[location_idx]
+    crowd = rng.integers(np.maximum(1, base_crowd - 5), base_crowd + 10, endpoint=True)
+    loud = np.isin(location_idx, [locations.index(location) for location in LOUD_LOCATIONS])
+    noise = np.where(loud, rng.integers(*NOISE_RANGES["loud"], n, endpoint=True),
+                     rng.integers(*NOISE_RANGES["normal"], n, endpoint=True))
+
+    is_anomaly, warning_level = evaluate_rules(location_idx, minutes, crowd, noise)
+
+    return pa.table({
+        "log_id": _numbered("cctv_log_", start, n, f"_{int(now.timestamp())}"),
+        "cctv_id": _join("cctv_", pc.cast(pa.array(rng.integers(1, CCTV_CAMERAS, n, endpoint=True)), pa.string())),
+        "school": SCHOOL_NAMES.take(pa.array(school_idx)),
+        "city": pa.array(np.array(CITIES_INDONESIA, dtype=object)[city_idx], pa.string()),
+        "location": pa.array(np.array(locations, dtype=object)[location_idx], pa.string()),
+        "timestamp": pa.array(timestamp),
+        "crowd_level": pa.array(crowd.astype(np.int16)),
+        "noise_level": pa.array(noise.astype(np.int16)),
+        "is_anomaly": pa.array(is_anomaly),
+        "warning_level": pa.array(warning_level, pa.string()),
+        "processed": pa.array(np.zeros(n, dtype=bool))
+    })
+
+# ========== ALERT & SEKOLAH ==========
+def alerts_table(tweets, now=None):
+    """Alert untuk tweet processed berisiko merah/kuning (field sama dengan build_alert)"""
+    now = now or datetime.now()
+    risky = tweets.filter(pc.is_in(tweets["risk_level"], pa.array(["merah", "kuning"])))
+    n = risky.num_rows
+    return pa.table({
+        "alert_id": _join("alert_", risky["tweet_id"], f"_{int(now.timestamp())}"),
+        "tweet_id": risky["tweet_id"],
+        "school": risky["school"],
+        "city": risky["city"],
+        "risk_level": risky["risk_level"],
+        "risk_score": risky["risk_score"],
+        "text": pc.utf8_slice_codeunits(risky["text"], 0, 200),
+        "sentiment": risky["sentiment"],
+        "category": risky["category"],
+        "created_at": pa.array(np.full(n, np.datetime64(now, 'us'))),
+        "status": pa.array(np.full(n, "new", dtype=object), pa.string()),
+        "alert_type": pa.array(np.full(n, "tweet_analysis", dtype=object), pa.string()),
+        "priority": pc.if_else(pc.equal(risky["risk_level"], "merah"), "high", "medium")
+    })
+
+def schools_table(cities=None, per_city=3, seed=DEFAULT_SEED, now=None):
+    """Tabel Arrow data sekolah: per_city SMP Negeri untuk setiap kota"""
+    rng = _rng(seed, "schools")
+    now = now or datetime.now()
+    cities = cities or CITIES_INDONESIA[:5]
+    city_col = pa.array(np.repeat(np.array(cities, dtype=object), per_city), pa.string())
+    number = pc.cast(pa.array(np.tile(np.arange(1, per_city + 1), len(cities))), pa.string())
+    n = len(city_col)
+    return pa.table({
+        "school_id": _join("school_", pc.utf8_lower(city_col), "_", number),
+        "name": _join("SMP Negeri ", number, " ", city_col),
+        "city": city_col,
+        "type": pa.array(np.full(n, "SMP", dtype=object), pa.string()),
+        "total_students": pa.array(rng.integers(300, 800, n, endpoint=True)),
+        "counselor_count": pa.array(rng.integers(1, 3, n, endpoint=True)),
+        "cctv_count": pa.array(rng.integers(5, 15, n, endpoint=True)),
+        "risk_level": pa.array(np.array(["hijau", "kuning", "merah"], dtype=object)[rng.integers(0, 3, n)], pa.string()),
+        "last_incident": pa.array(_minus_minutes(now, rng.integers(0, 90, n, endpoint=True) * 1440))
+    })
+
+# ========== DATAFRAME ==========
+def generate_tweets(n, seed=DEFAULT_SEED, processed=False, now=None):
+    """DataFrame n tweet dummy"""
+    return tweets_table(n, seed, now=now, processed=processed).to_pandas()
+
+def generate_cctv(n, seed=DEFAULT_SEED, now=None):
+    """DataFrame n log CCTV dummy"""
+    return cctv_table(n, seed, now=now).to_pandas()
+
+def to_records(table):
+    """List dict siap insert_many (timestamp menjadi datetime Python)"""
+    return table.to_pylist()
+
+# ========== OUTPUT PER CHUNK ==========
+def iter_dataset(num_tweets, num_cctv, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+                 processed=True, now=None, with_schools=True):
+    """Generator (koleksi, tabel Arrow) per chunk: tweets (+ alerts), cctv_logs, schools
+
+    Memori terpakai sebatas satu chunk. now dipakai bersama semua chunk agar
+    timestamp dan id konsisten dan hasil bisa diulang persis.
+    """
+    now = now or datetime.now()
+    seed = resolve_seed(seed)
+    for chunk_no, start in enumerate(range(0, num_tweets, chunk_size)):
+        tweets = tweets_table(min(chunk_size, num_tweets - start), seed, start, now, processed, chunk_no)
+        yield "tweets", tweets
+        if processed:
+            yield "alerts", alerts_table(tweets, now)
+    for chunk_no, start in enumerate(range(0, num_cctv, chunk_size)):
+        yield "cctv_logs", cctv_table(min(chunk_size, num_cctv - start), seed, start, now, chunk_no)
+    if with_schools:
+        yield "schools", schools_table(seed=seed, now=now)
+
+# Rollup yang diperbarui per batch insert (sama dengan jalur pipeline/telemetri)
+ROLLUP_WRITERS = {
+    "tweets": update_tweet_rollups,
+    "cctv_logs": update_cctv_rollups,
+    "alerts": update_alert_rollups
+}
+
+def write_to_mongo(db, num_tweets, num_cctv, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+                   processed=True, now=None, insert_batch=10000):
+    """Tulis dataset sintetis ke MongoDB per chunk (insert_many per insert_batch dokumen)
+
+    Setiap batch juga menambah koleksi rollup yang dibaca dashboard. processed_at
+    tweet diisi waktu tulis batch (bukan now dataset), supaya watermark store
+    inkremental dashboard tidak melewatkan batch yang ditulis belakangan.
+    """
+    counts = {}
+    start = time.perf_counter()
+    for collection_name, table in iter_dataset(num_tweets, num_cctv, chunk_size, seed, processed, now):
+        update_rollups = ROLLUP_WRITERS.get(collection_name)
+        if collection_name == "tweets" and not processed:
+            update_rollups = None  # daily_stats hanya berisi tweet yang sudah diproses
+        for batch in table.to_batches(max_chunksize=insert_batch):
+            if not batch.num_rows:
+                continue
+            records = batch.to_pylist()
+            if collection_name == "tweets" and processed:
+                written_at = datetime.now()
+                for record in records:
+                    record["processed_at"] = written_at
+            db[collection_name].insert_many(records, ordered=False)
+            if update_rollups:
+                update_rollups(db, records)
+        counts[collection_name] = counts.get(collection_name, 0) + table.num_rows
+        print(f"   💾 {collection_name}: {counts[collection_name]:,} dokumen")
+    print(f"✅ Dataset sintetis ke MongoDB: {counts} dalam {time.perf_counter() - start:.1f}s")
+    return counts
+
+def write_to_parquet(folder, num_tweets, num_cctv, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED,
+                     processed=True, now=None):
+    """Tulis dataset sintetis ke <folder>/<koleksi>.parquet, satu row group per chunk"""
+    os.makedirs(folder, exist_ok=True)
+    writers, counts = {}, {}
+    start = time.perf_counter()
+    try:
+        for collection_name, table in iter_dataset(num_tweets, num_cctv, chunk_size, seed, processed, now):
+            if collection_name not in writers:
+                writers[collection_name] = pq.ParquetWriter(os.path.join(folder, f"{collection_name}.parquet"),
+                                                            table.schema, compression=DEFAULT_COMPRESSION)
+            writers[collection_name].write_table(table)
+            counts[collection_name] = counts.get(collection_name, 0) + table.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+    print(f"✅ Dataset sintetis ke {folder}: {counts} dalam {time.perf_counter() - start:.1f}s")
+    return counts
@@ -0,0 +1,110 @@
+# index_bullying.py
+# Index filter in-memory untuk explorer pandas (mode file export / data dummy)
+# Dibangun sekali per versi data: setiap nilai kolom filter punya bitmap baris
+# (np.packbits, 1 bit per baris) dan jumlah barisnya. Kombinasi filter cukup
+# AND beberapa bitmap, jumlah hasil dihitung dengan popcount, dan urutan
+# terbaru-dulu dihitung sekali sehingga paging hanya memotong array row id
+# hasil filter yang di-cache per kombinasi filter.
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+TWEET_INDEX_FIELDS = ['city', 'risk_level', 'sentiment']
+CCTV_INDEX_FIELDS = ['city', 'location', 'is_anomaly']
+
+# Kombinasi filter terakhir yang row id-nya disimpan (per index)
+MAX_CACHED_RESULTS = 32
+
+# Jumlah bit 1 untuk setiap nilai byte 0-255
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def _popcount(bitmap):
+    """Jumlah baris yang bit-nya 1 di bitmap hasil np.packbits"""
+    return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+def _sort_order(df, sort_field):
+    """Row id terurut terbaru dulu (NaN/NaT di akhir), sama dengan page_frame"""
+    if sort_field not in df.columns:
+        return np.arange(len(df))
+    values = df[sort_field].reset_index(drop=True)
+    return values.sort_values(ascending=False, kind='stable', na_position='last').index.to_numpy()
+
+class FilterIndex:
+    """Bitmap per nilai untuk kolom filter + urutan sort, dipakai semua sesi (read-only)
+
+    Hanya field di fields yang difilter; field query lain diabaikan, sama
+    seperti filter_frame mengabaikan kolom yang tidak ada di DataFrame.
+    """
+
+    def __init__(self, df, fields, sort_field=None):
+        self.size = len(df)
+        self.fields = [field for field in fields if field in df.columns]
+        self.bitmaps = {}
+        self.counts = {}
+        for field in self.fields:
+            codes, uniques = pd.factorize(df[field], sort=True)
+            values = list(uniques.tolist() if hasattr(uniques, 'tolist') else uniques)
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            self.bitmaps[field] = {value: np.packbits(codes == code) for code, value in enumerate(values)}
+            self.counts[field] = {value: int(count) for value, count in zip(values, counts)}
+        self.order = _sort_order(df, sort_field)
+        self._empty = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def _terms(self, query):
+        """Pasangan (field, nilai) query yang terindeks, urut nama field (key cache)"""
+        return tuple(sorted((field, value) for field, value in query.items() if field in self.bitmaps))
+
+    def _bitmap(self, terms):
+        """AND bitmap semua term (None = tanpa filter)"""
+        bitmap = None
+        for field, value in terms:
+            term_bitmap = self.bitmaps[field].get(value, self._empty)
+            bitmap = term_bitmap if bitmap is None else np.bitwise_and(bitmap, term_bitmap)
+        return bitmap
+
+    def values(self, field):
+        """Nilai unik sebuah field (string, terurut) untuk pilihan selectbox"""
+        return sorted(str(value) for value, count in self.counts.get(field, {}).items() if count)
+
+    def count(self, query):
+        """Jumlah baris yang cocok dengan filter (untuk baris "Menampilkan X dari Y")"""
+        terms = self._terms(query)
+        if not terms:
+            return self.size
+        if len(terms) == 1:
+            field, value = terms[0]
+            return self.counts[field].get(value, 0)
+        with self._lock:
+            if terms in self._results:
+                return len(self._results[terms])
+        return _popcount(self._bitmap(terms))
+
+    def rows(self, query):
+        """Row id hasil filter, terurut terbaru dulu (di-cache per kombinasi filter)"""
+        terms = self._terms(query)
+        if not terms:
+            return self.order
+        with self._lock:
+            if terms in self._results:
+                self._results.move_to_end(terms)
+                return self._results[terms]
+        mask = np.unpackbits(self._bitmap(terms), count=self.size).view(bool)
+        rows = self.order[mask[self.order]]
+        with self._lock:
+            self._results[terms] = rows
+            while len(self._results) > MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+        return rows
+
+    def page(self, df, query, page, per_page):
+        """Satu halaman hasil filter (pengganti filter_frame + page_frame)"""
+        start = (max(1, int(page)) - 1) * per_page
+        return df.iloc[self.rows(query)[start:start + per_page]]
+
+    def frame(self, df, query):
+        """Semua baris hasil filter, terurut terbaru dulu (untuk download CSV)"""
+        return df.iloc[self.rows(query)]
@@ -0,0 +1,679 @@
+# nlp_bullying.py
+# Engine NLP untuk deteksi bullying (dipakai notebook dan pipeline batch):
+# preprocessing teks, analisis sentimen dan perhitungan risk level.
+# Kamus kata dibangun sekali saat import lalu dikompilasi menjadi automaton
+# Aho-Corasick (untuk frase substring) dan trie token (untuk kata/frase utuh),
+# sehingga satu teks cukup di-scan sekali, bukan sekali per entri kamus.
+
+import hashlib
+import json
+import os
+import re
+import pandas as pd
+from collections import OrderedDict, deque
+from datetime import datetime
+
+# ========== KAMUS KATA ==========
+# Bobot: -5 (sangat negatif) sampai +5 (sangat positif)
+
+# === KATA POSITIF (mendukung/perbaikan) ===
+POSITIVE_WORDS = {
+    # Support/helping words: HIGH POSITIVE (+3 to +5)
+    'support': 5, 'dukung': 5, 'bantu': 4, 'tolong': 4, 'peduli': 5,
+    'membantu': 4, 'terima kasih': 5, 'bangga': 4, 'semangat': 3,
+    'positif': 3, 'baik': 3, 'aman': 3, 'nyaman': 3, 'senang': 3,
+    'bahagia': 4, 'gembira': 3, 'legah': 3, 'tenang': 2, 'damai': 3,
+    'ceria': 2, 'optimis': 3, 'sukses': 3, 'berhasil': 3,
+
+    # Anti-bullying initiatives: POSITIVE CONTEXT
+    'anti bullying': 4, 'stop bullying': 4, 'kampanye': 2,
+    'program': 1, 'konseling': 2, 'psikolog': 1, 'guru bk': 2,
+    'workshop': 1, 'pelatihan': 1, 'edukasi': 2,
+
+    # Recovery/support terms
+    'pulih': 3, 'sembuh': 3, 'bangkit': 4, 'melawan': 2,
+    'berani': 3, 'kuat': 3, 'percaya diri': 3,
+
+    # Community/social support
+    'komunitas': 2, 'kelompok': 1, 'teman': 2, 'sahabat': 3,
+    'keluarga': 3, 'orang tua': 2, 'guru': 1, 'sekolah': 0,
+}
+
+# === KATA NEGATIF (korban/penderitaan) ===
+NEGATIVE_WORDS = {
+    # Physical violence: VERY NEGATIVE (-4 to -5)
+    'pukul': -5, 'dipukul': -5, 'pukuli': -5, 'pukulan': -4,
+    'tendang': -4, 'ditendang': -4, 'tampar': -4, 'ditampar': -4,
+    'cubit': -3, 'dicubit': -3, 'dorong': -3, 'didorong': -3,
+    'serang': -4, 'diserang': -4, 'aniaya': -5, 'dianiaya': -5,
+
+    # Emotional abuse: NEGATIVE (-3 to -4)
+    'hina': -4, 'dihina': -5, 'hinaan': -4, 'ejek': -4, 'diejek': -5,
+    'olok': -3, 'diolok': -4, 'cela': -3, 'dicela': -4,
+    'rendahkan': -3, 'direndahkan': -4, 'hancurkan': -4, 'dihancurkan': -5,
+
+    # Social exclusion: NEGATIVE (-3 to -4)
+    'jauhi': -4, 'dijauhi': -5, 'kucil': -4, 'dikucilkan': -5,
+    'asing': -3, 'terasing': -4, 'tolak': -3, 'ditolak': -4,
+    'abaikan': -3, 'diabaikan': -4, 'singkir': -3, 'disingkirkan': -4,
+
+    # Threats/intimidation: VERY NEGATIVE (-4 to -5)
+    'ancam': -5, 'diancam': -5, 'ancaman': -4, 'intimidasi': -4,
+    'teror': -5, 'terorisasi': -5, 'takut': -4, 'ketakutan': -4,
+    'teror': -4, 'diteror': -5,
+
+    # Theft/extortion: NEGATIVE (-4)
+    'ambil': -4, 'diambil': -4, 'rampas': -5, 'dirampas': -5,
+    'paksa': -4, 'dipaksa': -5, 'paksaan': -4, 'peras': -5, 'dipengaruhi': -4,
+
+    # Emotional state: NEGATIVE (-2 to -3)
+    'sedih': -3, 'kesedihan': -3, 'sakit hati': -4, 'terluka': -3,
+    'kecewa': -3, 'kekecewaan': -3, 'marah': -3, 'kemarahan': -3,
+    'benci': -4, 'kebencian': -4, 'jengkel': -2, 'kesal': -2,
+
+    # Mental health issues: NEGATIVE (-3 to -5)
+    'trauma': -5, 'traumatis': -5, 'depresi': -5, 'stress': -4,
+    'cemas': -3, 'kecemasan': -3, 'panik': -3, 'kepanikan': -3,
+    'putus asa': -5, 'tertekan': -4, 'gelisah': -3, 'bingung': -2,
+
+    # School avoidance: NEGATIVE (-4)
+    'bolos': -3, 'membolos': -3, 'takut sekolah': -4, 'enggan sekolah': -3,
+    'mogok sekolah': -4, 'tidak mau sekolah': -4,
+}
+
+# === KATA BULLYING (konteks spesifik) ===
+# Kata "bullying" sendiri bisa netral/negatif tergantung konteks
+BULLYING_WORDS = {
+    'bully': -2,  # Netral jika sendiri
+    'dibully': -4,  # Negatif jika sebagai korban
+    'bullying': -2,  # Netral jika sendiri
+    'pembullyan': -2,
+    'pelaku': -1,
+    'korban': -1,
+}
+
+# === KATA PERBAIKAN/POSITIF dalam konteks bullying ===
+# Kata-kata ini membuat konteks bullying menjadi POSITIF
+POSITIVE_CONTEXT_WORDS = {
+    'support group': 5, 'dukungan': 4, 'bantuan': 4, 'konseling': 3,
+    'psikolog': 2, 'guru bk': 2, 'terapi': 3, 'rehabilitasi': 3,
+    'pemulihan': 4, 'pencegahan': 3, 'penanganan': 3, 'solusi': 3,
+    'perlindungan': 4, 'keamanan': 3, 'perhatian': 2, 'peduli': 4,
+    'advokasi': 3, 'pendampingan': 3, 'mediasi': 2,
+}
+
+# Urutan kamus menentukan urutan detected_words
+LEXICON_GROUPS = [
+    (POSITIVE_WORDS, "POS"),
+    (NEGATIVE_WORDS, "NEG"),
+    (BULLYING_WORDS, "BLY"),
+    (POSITIVE_CONTEXT_WORDS, "PCTX")
+]
+
+# ========== PREPROCESSING ==========
+CUSTOM_STOPWORDS = ['yg', 'dg', 'rt', 'dgn', 'ny', 'd', 'klo',
+                    'kalo', 'amp', 'biar', 'bikin', 'bilang',
+                    'gak', 'ga', 'krn', 'nya', 'nih', 'sih',
+                    'si', 'tau', 'tdk', 'tuh', 'utk', 'ya',
+                    'jd', 'jgn', 'sdh', 'aja', 'n', 't',
+                    'nyg', 'hehe', 'wkwk', 'lol', 'haha']
+
+def load_nltk_stopwords():
+    """Stopwords Indonesia dari korpus NLTK jika sudah terpasang (tanpa download)"""
+    try:
+        from nltk.corpus import stopwords
+        return set(stopwords.words('indonesian') if 'indonesian' in stopwords.fileids() else [])
+    except (ImportError, LookupError, OSError):
+        print("⚠️ Korpus stopwords NLTK tidak ditemukan, hanya memakai custom stopwords")
+        return set()
+
+STOP_WORDS_INDONESIA = load_nltk_stopwords()
+STOP_WORDS_INDONESIA.update(CUSTOM_STOPWORDS)
+
+# Pola regex dikompilasi sekali
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+MENTION_PATTERN = re.compile(r'@\w+')
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+DIGIT_PATTERN = re.compile(r'\d+')
+
+# Setelah tanda baca dibuang, word_tokenize NLTK sama dengan split() kecuali
+# untuk kontraksi Inggris berikut yang dipecah menjadi dua token
+TOKEN_SPLITS = {
+    'cannot': ('can', 'not'), 'gimme': ('gim', 'me'), 'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'), 'lemme': ('lem', 'me'), 'wanna': ('wan', 'na')
+}
+
+def _clean_text(text):
+    """Lowercase, buang URL/mention, simpan teks hashtag, buang tanda baca dan angka"""
+    text = URL_PATTERN.sub('', text.lower())
+    text = MENTION_PATTERN.sub('', text)
+    text = HASHTAG_PATTERN.sub(r'\1', text)
+    text = PUNCTUATION_PATTERN.sub(' ', text)
+    return DIGIT_PATTERN.sub('', text)
+
+def _filter_tokens(text):
+    """Split whitespace + buang stopwords dan kata pendek dalam satu pass"""
+    return ' '.join([
+        word for token in text.split() for word in TOKEN_SPLITS.get(token, (token,))
+        if len(word) > 2 and word not in STOP_WORDS_INDONESIA
+    ])
+
+def preprocess_text(text):
+    """Preprocessing text untuk analisis NLP"""
+    if not isinstance(text, str):
+        return ""
+    return _filter_tokens(_clean_text(text))
+
+def preprocess_series(texts):
+    """Versi vektor preprocess_text untuk list/Series (teks yang sama diproses sekali)"""
+    texts = pd.Series(texts, dtype=object)
+    is_text = texts.map(lambda value: isinstance(value, str))
+    unique_texts = pd.Series(texts[is_text].unique(), dtype=object)
+
+    cleaned = (unique_texts.str.lower()
+               .str.replace(URL_PATTERN, '', regex=True)
+               .str.replace(MENTION_PATTERN, '', regex=True)
+               .str.replace(HASHTAG_PATTERN, r'\1', regex=True)
+               .str.replace(PUNCTUATION_PATTERN, ' ', regex=True)
+               .str.replace(DIGIT_PATTERN, '', regex=True)
+               .map(_filter_tokens))
+
+    lookup = dict(zip(unique_texts, cleaned))
+    return texts.map(lookup).where(is_text, "")
+
+# ========== FRASE & KATA KONTEKS ==========
+# Frase dicek sebagai substring teks
+SUPPORT_CONTEXT_PHRASES = ['support group', 'dukungan', 'bantuan', 'konseling', 'pemulihan']
+VICTIM_CONTEXT_PHRASES = ['aku ', 'saya ', 'gw ', 'gue ', 'diriku ', 'dipukul', 'dihina', 'diancam']
+DIRECT_VICTIM_PHRASES = ['dipukul', 'dihina', 'diancam']
+FORCED_PHRASES = ['diambil paksa', 'dirampas', 'dipaksa']
+
+# Kata dicek per token (split whitespace)
+FIRST_PERSON_WORDS = {'aku', 'saya', 'gw', 'gue'}
+PERPETRATOR_WORDS = {'asyik', 'lucu', 'seru', 'wkwk', 'haha'}
+WITNESS_WORDS = {'liat', 'lihat', 'temen', 'teman', 'kasihan'}
+REPORT_WORDS = {'lapor', 'melapor', 'laporkan', 'pengaduan'}
+
+# ========== VERSI LEKSIKON ==========
+def lexicon_version(groups=LEXICON_GROUPS, context_words=POSITIVE_CONTEXT_WORDS):
+    """Hash isi semua kamus dan frase konteks (berubah jika ada kata/bobot yang diubah)"""
+    content = json.dumps({
+        "groups": [[label, list(word_dict.items())] for word_dict, label in groups],
+        "context_words": list(context_words.items()),
+        "phrases": [SUPPORT_CONTEXT_PHRASES, VICTIM_CONTEXT_PHRASES, DIRECT_VICTIM_PHRASES, FORCED_PHRASES],
+        "tokens": [sorted(FIRST_PERSON_WORDS), sorted(PERPETRATOR_WORDS), sorted(WITNESS_WORDS), sorted(REPORT_WORDS)]
+    }, ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]
+
+# ========== STRUKTUR PENCOCOKAN ==========
+class PhraseMatcher:
+    """Automaton Aho-Corasick: semua frase substring ditemukan dalam satu pass"""
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        for phrase in phrases:
+            self._add(phrase)
+        self._build()
+
+    def _add(self, phrase):
+        node = 0
+        for ch in phrase:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+            node = nxt
+        self.output[node].add(phrase)
+
+    def _build(self):
+        """Hitung failure link secara BFS"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fail = self.fail[node]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[nxt] = self.goto[fail].get(ch, 0)
+                self.output[nxt] |= self.output[self.fail[nxt]]
+        self.output = [frozenset(out) for out in self.output]
+
+    def find_all(self, text):
+        """Set frase yang muncul di text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                found |= output[node]
+        return found
+
+class TokenTrie:
+    """Trie per token untuk kata/frase utuh (dibatasi spasi)"""
+
+    def __init__(self, words):
+        self.root = {}
+        for word in words:
+            node = self.root
+            for token in word.split(' '):
+                node = node.setdefault(token, {})
+            node[None] = word
+
+    def find_all(self, tokens):
+        """Set kata/frase yang muncul sebagai deret token berurutan"""
+        found = set()
+        for i, token in enumerate(tokens):
+            node = self.root.get(token)
+            j = i + 1
+            while node is not None:
+                if None in node:
+                    found.add(node[None])
+                if j >= len(tokens):
+                    break
+                node = node.get(tokens[j])
+                j += 1
+        return found
+
+def _build_char_trie(words):
+    """Trie karakter sederhana (key None menandai akhir kata)"""
+    root = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = word
+    return root
+
+def _walk_char_trie(root, chars):
+    """Kata di trie yang menjadi awalan dari deret karakter"""
+    found = []
+    node = root
+    for ch in chars:
+        node = node.get(ch)
+        if node is None:
+            break
+        if None in node:
+            found.append(node[None])
+    return found
+
+# ========== ENGINE LEKSIKON ==========
+class LexiconEngine:
+    """Kamus kata yang sudah dikompilasi untuk analisis sentimen
+
+    Aturan pencocokan sama dengan versi notebook lama:
+      1. frase POSITIVE_CONTEXT_WORDS dicek sebagai substring (PHRASE:...)
+      2. setiap kata kamus cocok jika muncul utuh dibatasi spasi, atau teks
+         diawali/diakhiri kata tersebut; kata dilewati jika sudah tercakup
+         frase langkah 1 yang diawali kata itu
+    """
+
+    def __init__(self, groups=LEXICON_GROUPS, context_words=POSITIVE_CONTEXT_WORDS):
+        self.context_words = context_words
+        self.version = lexicon_version(groups, context_words)
+        self.entries = []
+        self.entries_by_word = {}
+        for word_dict, label in groups:
+            for word, weight in word_dict.items():
+                self.entries_by_word.setdefault(word, []).append(len(self.entries))
+                self.entries.append((f"{label}:{word}", weight))
+
+        words = list(self.entries_by_word)
+        self.phrase_matcher = PhraseMatcher(
+            list(context_words) + SUPPORT_CONTEXT_PHRASES + VICTIM_CONTEXT_PHRASES + FORCED_PHRASES
+        )
+        self.token_trie = TokenTrie(words)
+        self.prefix_trie = _build_char_trie(words)
+        self.suffix_trie = _build_char_trie(word[::-1] for word in words)
+        self.suffix_words = {word[::-1]: word for word in words}
+        # Kata yang sudah tercakup oleh frase konteks (frase diawali kata tersebut)
+        self.phrase_prefix_words = {
+            phrase: {word for word in words if phrase.startswith(word)}
+            for phrase in context_words
+        }
+
+    def match(self, text_lower):
+        """Return (score, detected_words, frase substring yang ditemukan)"""
+        found = self.phrase_matcher.find_all(text_lower)
+
+        # 1. Frase konteks positif (prioritas tinggi)
+        detected_words = [
+            (f"PHRASE:{phrase}", weight)
+            for phrase, weight in self.context_words.items() if phrase in found
+        ]
+        skip = set()
+        for phrase, _ in detected_words:
+            skip |= self.phrase_prefix_words[phrase[len("PHRASE:"):]]
+
+        # 2. Kata individual: utuh, awalan teks, atau akhiran teks
+        words = self.token_trie.find_all(text_lower.split(' '))
+        words.update(_walk_char_trie(self.prefix_trie, text_lower))
+        words.update(self.suffix_words[w] for w in _walk_char_trie(self.suffix_trie, reversed(text_lower)))
+
+        indexes = sorted(i for word in words if word not in skip for i in self.entries_by_word[word])
+        detected_words.extend(self.entries[i] for i in indexes)
+
+        score = sum(weight for _, weight in detected_words)
+        return score, detected_words, found
+
+ENGINE = LexiconEngine()
+
+def rebuild_engine():
+    """Kompilasi ulang ENGINE setelah kamus kata diubah
+
+    Versi leksikon ikut berubah sehingga SENTIMENT_CACHE otomatis dikosongkan.
+    """
+    global ENGINE
+    ENGINE = LexiconEngine()
+    return ENGINE
+
+# ========== ANALISIS SENTIMEN ==========
+def analyze_sentiment(text, verbose=True):
+    """Analisis sentimen kontekstual berbasis kamus kata berbobot"""
+    text_lower = text.lower()
+
+    base_score, detected_words, found = ENGINE.match(text_lower)
+
+    # ========== TENTUKAN KONTEKS UTAMA ==========
+    is_support_context = any(phrase in found for phrase in SUPPORT_CONTEXT_PHRASES)
+    is_victim_context = any(phrase in found for phrase in VICTIM_CONTEXT_PHRASES)
+
+    # ========== ADJUSTMENTS BERDASARKAN KONTEKS ==========
+    final_score = base_score
+
+    # ADJUSTMENT 1: Jika ada kata "support group" + "bullying" → POSITIF
+    if is_support_context and any('bully' in word.lower() for word, _ in detected_words):
+        final_score += 6
+        if verbose:
+            print(f"   CONTEXT ADJUSTMENT: Support context + bullying = +6")
+
+    # ADJUSTMENT 2: Jika ada kata "diambil paksa" → SANGAT NEGATIF
+    if any(phrase in found for phrase in FORCED_PHRASES):
+        final_score -= 8
+        if verbose:
+            print(f"   CONTEXT ADJUSTMENT: 'diambil paksa' = -8")
+
+    # ADJUSTMENT 3: Jika korban langsung (aku/saya + kata negatif)
+    if is_victim_context and base_score < 0:
+        final_score -= 3
+        if verbose:
+            print(f"   CONTEXT ADJUSTMENT: Victim direct speech = -3")
+
+    # ========== TENTUKAN SENTIMEN FINAL ==========
+    final_score = max(-10, min(10, final_score))
+
+    if final_score >= 2:
+        sentiment = "positif"
+    elif final_score <= -2:
+        sentiment = "negatif"
+    else:
+        sentiment = "netral"
+
+    # ========== TENTUKAN KATEGORI ==========
+    pos_count = sum(1 for w, wt in detected_words if wt > 0)
+    neg_count = sum(1 for w, wt in detected_words if wt < 0)
+    bully_count = sum(1 for w, wt in detected_words if w.startswith("BLY:"))
+
+    tokens = set(text_lower.split())
+    category = "unknown"
+
+    # Korban langsung
+    if tokens & FIRST_PERSON_WORDS:
+        if any(phrase in found for phrase in DIRECT_VICTIM_PHRASES):
+            category = "korban_direct"
+        elif neg_count > 0:
+            category = "korban_potensial"
+
+    # Support/help context
+    elif is_support_context:
+        category = "support"
+
+    # Pelaku
+    elif tokens & PERPETRATOR_WORDS:
+        if 'bully' in text_lower:
+            category = "pelaku"
+
+    # Saksi/laporan
+    elif tokens & WITNESS_WORDS:
+        if bully_count > 0:
+            category = "saksi"
+
+    # Report
+    elif tokens & REPORT_WORDS:
+        category = "report"
+
+    return {
+        "sentiment": sentiment,
+        "bullying_detected": bully_count > 0,
+        "category": category,
+        "score": final_score,
+        "positive_words": pos_count,
+        "negative_words": neg_count,
+        "bullying_words": bully_count,
+        "detected_words": detected_words[:8],
+        "is_support_context": is_support_context,
+        "is_victim_context": is_victim_context
+    }
+
+# ========== CACHE HASIL SENTIMEN ==========
+DEFAULT_CACHE_SIZE = 100000
+
+class SentimentCache:
+    """Cache LRU hasil analyze_sentiment, key = hash(versi leksikon + teks hasil preprocess)
+
+    Hanya hasil sentimen yang di-cache: calculate_risk_level juga bergantung pada
+    engagement, umur tweet dan teks asli, jadi tetap dihitung per tweet (murah).
+    Jika versi leksikon berubah (rebuild_engine), isi cache dibuang.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.new_entries = {}
+        self.version = ENGINE.version
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        """Key cache untuk teks hasil preprocess"""
+        return hashlib.blake2b(f"{self.version}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _check_version(self):
+        """Kosongkan cache jika ENGINE sudah dikompilasi ulang dengan kamus lain"""
+        if self.version != ENGINE.version:
+            self.clear()
+            self.version = ENGINE.version
+
+    def _put(self, key, result):
+        """Simpan satu entri, buang entri paling lama jika melebihi max_size"""
+        self.entries[key] = result
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def analyze(self, text):
+        """analyze_sentiment(text, verbose=False) lewat cache"""
+        self._check_version()
+        key = self.key(text)
+        result = self.entries.get(key)
+        if result is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            self.misses += 1
+            result = analyze_sentiment(text, verbose=False)
+            self._put(key, result)
+            self.new_entries[key] = result
+        return dict(result)
+
+    def update(self, entries):
+        """Tambahkan entri dari cache lain (mis. hasil worker)"""
+        self._check_version()
+        for key, result in entries.items():
+            self._put(key, result)
+
+    def pop_new_entries(self):
+        """Ambil entri yang baru dihitung sejak pemanggilan terakhir"""
+        new_entries, self.new_entries = self.new_entries, {}
+        return new_entries
+
+    def clear(self):
+        """Kosongkan semua entri cache"""
+        self.entries.clear()
+        self.new_entries = {}
+
+    def stats(self):
+        """Counter hit/miss dan ukuran cache"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self.entries),
+            'lexicon_version': self.version
+        }
+
+    def save(self, path):
+        """Simpan cache ke file JSON"""
+        self._check_version()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"lexicon_version": self.version, "entries": list(self.entries.items())},
+                      f, ensure_ascii=False)
+        print(f"💾 Cache sentimen disimpan: {len(self.entries)} entri → {path}")
+
+    def load(self, path):
+        """Muat cache dari file JSON; dilewati jika file tidak ada atau versi leksikon beda"""
+        self._check_version()
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("lexicon_version") != self.version:
+            print(f"⚠️ Cache {path} dibuat dengan leksikon lain, diabaikan")
+            return 0
+        for key, result in data["entries"]:
+            result["detected_words"] = [tuple(word) for word in result["detected_words"]]
+            self._put(key, result)
+        return len(data["entries"])
+
+SENTIMENT_CACHE = SentimentCache()
+
+def analyze_sentiment_batch(texts, cache=None):
+    """Analisis sentimen list/Series teks lewat cache; teks yang sama hanya dihitung sekali
+
+    Return list dict (atau Series dengan index yang sama jika input Series).
+    """
+    cache = cache or SENTIMENT_CACHE
+    values = texts.tolist() if isinstance(texts, pd.Series) else list(texts)
+    results = [cache.analyze(text) for text in values]
+
+    if isinstance(texts, pd.Series):
+        return pd.Series(results, index=texts.index, name=texts.name)
+    return results
+
+# ========== RISK LEVEL ==========
+def calculate_risk_level(tweet_data, sentiment_result, verbose=True):
+    """Hitung risk level (skor 0-20) dari hasil sentimen, konteks, engagement dan recency"""
+    
+    risk_score = 0
+    
+    # ========== 1. BASE SCORE dari sentiment ==========
+    sentiment_base = {
+        "positif": 0,    # Positif = risiko rendah
+        "netral": 3,     # Netral = risiko medium
+        "negatif": 8     # Negatif = risiko tinggi
+    }
+    risk_score += sentiment_base.get(sentiment_result["sentiment"], 3)
+    
+    # ========== 2. KATEGORI RISIKO ==========
+    category_risk = {
+        # HIGH RISK (10-15)
+        "korban_direct": 12,      # Korban langsung: DARURAT
+        
+        # MEDIUM-HIGH RISK (7-10)
+        "pelaku": 9,              # Pelaku: perlu intervensi
+        "korban_potensial": 8,    # Potensi korban: waspada
+        
+        # MEDIUM RISK (4-7)
+        "saksi": 6,               # Saksi: perlu perhatian
+        
+        # LOW RISK (1-4)
+        "report": 4,              # Laporan: monitoring
+        "unknown": 3,             # Tidak diketahui
+        "support": 1,             # Support: risiko sangat rendah
+        
+        # VERY LOW RISK (0-1)
+        "positif_umum": 0,        # Positif umum: aman
+    }
+    risk_score += category_risk.get(sentiment_result["category"], 3)
+    
+    # ========== 3. KONTEKS SPESIAL ==========
+    # CASE 1: "support group" → TURUNKAN risiko meski ada kata "bullying"
+    if sentiment_result.get("is_support_context", False):
+        risk_score -= 6  # Large reduction
+        if verbose:
+            print(f"   RISK ADJUSTMENT: Support context = -6")
+    
+    # CASE 2: "diambil paksa" → TINGKATKAN risiko signifikan
+    text_lower = tweet_data.get('text', '').lower()
+    if any(phrase in text_lower for phrase in ['diambil paksa', 'dirampas', 'dipaksa']):
+        risk_score += 8  # Large increase
+        if verbose:
+            print(f"   RISK ADJUSTMENT: 'diambil paksa' = +8")
+    
+    # CASE 3: "uang jajan diambil" → RISIKO TINGGI
+    if 'uang jajan' in text_lower and any(w in text_lower for w in ['ambil', 'rampas', 'paksa']):
+        risk_score += 7
+        if verbose:
+            print(f"   RISK ADJUSTMENT: 'uang jajan diambil' = +7")
+    
+    # ========== 4. FAKTOR LAIN ==========
+    # Engagement (viral = lebih berbahaya)
+    engagement = (tweet_data.get('retweet_count', 0) * 2 + 
+                  tweet_data.get('like_count', 0) + 
+                  tweet_data.get('reply_count', 0))
+    
+    if engagement > 100:
+        risk_score += 4
+    elif engagement > 50:
+        risk_score += 2
+    elif engagement > 20:
+        risk_score += 1
+    
+    # Recency (lebih baru = lebih urgent)
+    now = datetime.now()
+    created_at = tweet_data.get('created_at')
+    # Tanggal kosong/NaT (mis. created_at CSV tak terbaca) dianggap tweet baru
+    if not isinstance(created_at, datetime) or created_at != created_at:
+        created_at = now
+    hours_old = (now - created_at).total_seconds() / 3600
+    
+    if hours_old < 6:      # Kurang dari 6 jam
+        risk_score += 3
+    elif hours_old < 24:   # Kurang dari 24 jam
+        risk_score += 2
+    elif hours_old < 72:   # Kurang dari 3 hari
+        risk_score += 1
+    
+    # ========== 5. NORMALIZE & TENTUKAN LEVEL ==========
+    risk_score = max(0, min(20, risk_score))
+    
+    # THRESHOLD LEVEL:
+    if risk_score >= 15:    # 15-20: DARURAT
+        level = "merah"
+    elif risk_score >= 10:  # 10-14: WASPADA
+        level = "kuning"
+    elif risk_score >= 5:   # 5-9: PERHATIAN
+        level = "hijau"
+    else:                   # 0-4: AMAN
+        level = "aman"
+    
+    return level, risk_score
@@ -0,0 +1,257 @@
+# pipeline_bullying.py
+# Pipeline batch untuk memproses tweet dalam jumlah besar
+# Tweet dipecah per chunk, tahap NLP (preprocess → sentiment → risk) dijalankan
+# paralel di process pool, lalu hasilnya ditulis ke MongoDB dengan bulk_write
+# (satu round trip per batch, bukan satu update_one per tweet). Koleksi rollup
+# untuk chart dashboard ikut diperbarui per batch (rollup_bullying).
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pymongo import UpdateOne
+from nlp_bullying import SENTIMENT_CACHE, preprocess_series, analyze_sentiment_batch, calculate_risk_level
+from rollup_bullying import update_tweet_rollups, update_alert_rollups
+from timing_bullying import record, write_metrics
+
+DEFAULT_BATCH_SIZE = 500
+
+# Field tweet yang dibutuhkan tahap NLP (hanya ini yang dikirim ke worker)
+NLP_FIELDS = ['text', 'retweet_count', 'like_count', 'reply_count', 'created_at']
+
+STAGES = ['preprocess', 'sentiment', 'risk', 'write_tweets', 'write_alerts', 'write_rollups']
+
+# ========== TAHAP NLP (DI WORKER) ==========
+def init_worker(cache_path):
+    """Initializer process pool: muat cache sentimen dari disk"""
+    if cache_path:
+        SENTIMENT_CACHE.load(cache_path)
+
+def analyze_chunk(tweets):
+    """Jalankan preprocess → sentiment → risk untuk satu chunk tweet
+
+    Return (list field hasil per tweet, dict waktu per tahap dalam detik,
+    info cache: hit/miss chunk ini dan entri sentimen yang baru dihitung).
+    """
+    timings = {}
+    hits, misses = SENTIMENT_CACHE.hits, SENTIMENT_CACHE.misses
+
+    start = time.perf_counter()
+    cleaned_texts = preprocess_series([tweet['text'] for tweet in tweets]).tolist()
+    timings['preprocess'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sentiment_results = analyze_sentiment_batch(cleaned_texts)
+    timings['sentiment'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = []
+    for tweet, cleaned_text, sentiment_result in zip(tweets, cleaned_texts, sentiment_results):
+        risk_level, risk_score = calculate_risk_level(tweet, sentiment_result, verbose=False)
+        results.append({
+            'processed_text': cleaned_text,
+            'sentiment': sentiment_result['sentiment'],
+            'bullying_detected': sentiment_result['bullying_detected'],
+            'category': sentiment_result['category'],
+            'risk_level': risk_level,
+            'risk_score': risk_score,
+            'processed': True,
+            'sentiment_score': sentiment_result['score'],
+            'is_support_context': sentiment_result.get('is_support_context', False),
+            'is_victim_context': sentiment_result.get('is_victim_context', False)
+        })
+    timings['risk'] = time.perf_counter() - start
+
+    cache_info = {
+        'hits': SENTIMENT_CACHE.hits - hits,
+        'misses': SENTIMENT_CACHE.misses - misses,
+        'new_entries': SENTIMENT_CACHE.pop_new_entries()
+    }
+    return results, timings, cache_info
+
+# ========== TULIS KE MONGODB ==========
+def bulk_upsert_tweets(collection, tweets):
+    """Upsert tweet berdasarkan tweet_id dengan satu bulk_write (ordered=False)"""
+    if not tweets:
+        return None
+    operations = [
+        UpdateOne({"tweet_id": tweet["tweet_id"]}, {"$set": tweet}, upsert=True)
+        for tweet in tweets
+    ]
+    return collection.bulk_write(operations, ordered=False)
+
+def build_alert(tweet):
+    """Buat dokumen alert untuk tweet risiko kuning/merah"""
+    return {
+        "alert_id": f"alert_{tweet.get('tweet_id', 'unknown')}_{int(time.time())}",
+        "tweet_id": tweet.get('tweet_id'),
+        "school": tweet.get('school'),
+        "city": tweet.get('city'),
+        "risk_level": tweet['risk_level'],
+        "risk_score": tweet['risk_score'],
+        "text": tweet['text'][:200],
+        "sentiment": tweet['sentiment'],
+        "category": tweet['category'],
+        "created_at": datetime.now(),
+        "status": "new",
+        "alert_type": "tweet_analysis",
+        "priority": "high" if tweet['risk_level'] == "merah" else "medium"
+    }
+
+# Field tweet lama yang dibaca sebelum upsert: processed_at dan kunci daily_stats
+PREVIOUS_FIELDS = {"_id": 0, "tweet_id": 1, "processed_at": 1, "created_at": 1,
+                   "city": 1, "risk_level": 1, "sentiment": 1, "category": 1}
+
+def processed_versions(collection, tweets):
+    """Dict tweet_id → dokumen lama untuk tweet di batch yang sudah pernah diproses"""
+    ids = [tweet["tweet_id"] for tweet in tweets]
+    cursor = collection.find({"tweet_id": {"$in": ids}, "processed": True}, PREVIOUS_FIELDS)
+    return {doc["tweet_id"]: doc for doc in cursor}
+
+def write_processed_tweets(tweets_collection, tweets, report=None):
+    """Upsert tweet yang sudah diproses lalu perbarui daily_stats
+
+    Tweet yang diproses ulang mempertahankan processed_at lamanya (store
+    inkremental tidak menghitungnya dua kali) dan kontribusi lamanya di
+    daily_stats dikurangi sebelum hasil baru ditambahkan.
+    """
+    report = report if report is not None else dict.fromkeys(STAGES, 0.0)
+    if not tweets:
+        return tweets
+    start = time.perf_counter()
+    previous = processed_versions(tweets_collection, tweets)
+    processed_at = datetime.now()
+    for tweet in tweets:
+        old = previous.get(tweet["tweet_id"], {}).get("processed_at")
+        tweet['processed_at'] = old if isinstance(old, datetime) else processed_at
+    bulk_upsert_tweets(tweets_collection, tweets)
+    report['write_tweets'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    update_tweet_rollups(tweets_collection.database, tweets, previous=previous.values())
+    report['write_rollups'] += time.perf_counter() - start
+    return tweets
+
+def write_alerts(alerts_collection, alerts, report=None):
+    """Simpan alert, satu alert per tweet_id, lalu perbarui alert_daily
+
+    Alert di-upsert dengan $setOnInsert sehingga tweet yang diproses ulang tidak
+    membuat alert kedua (status alert lama juga tidak tertimpa). Return alert
+    yang benar-benar baru.
+    """
+    report = report if report is not None else dict.fromkeys(STAGES, 0.0)
+    if not alerts:
+        return []
+    start = time.perf_counter()
+    operations = [
+        UpdateOne({"tweet_id": alert["tweet_id"]}, {"$setOnInsert": alert}, upsert=True)
+        for alert in alerts
+    ]
+    result = alerts_collection.bulk_write(operations, ordered=False)
+    inserted = [alerts[index] for index in sorted(result.upserted_ids)]
+    report['write_alerts'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    update_alert_rollups(alerts_collection.database, inserted)
+    report['write_rollups'] += time.perf_counter() - start
+    return inserted
+
+def _write_chunk(tweets_collection, alerts_collection, chunk, results, report):
+    """Gabungkan hasil NLP ke tweet asli, lalu tulis tweet, alert dan rollup satu batch"""
+    for tweet, result in zip(chunk, results):
+        tweet.update(result)
+    write_processed_tweets(tweets_collection, chunk, report)
+    alerts = [build_alert(tweet) for tweet in chunk if tweet['risk_level'] in ["merah", "kuning"]]
+    return write_alerts(alerts_collection, alerts, report)
+
+# ========== PIPELINE BATCH ==========
+def process_tweets_batched(tweets_collection, alerts_collection, tweets,
+                           batch_size=DEFAULT_BATCH_SIZE, workers=None, cache_path=None):
+    """Versi batch dari process_tweets
+
+    Return (processed_tweets, alerts, report). report berisi waktu dan
+    throughput (tweet/detik) per tahap serta hit rate cache sentimen. Waktu
+    tahap NLP adalah total waktu CPU semua worker; total_seconds adalah waktu
+    dinding keseluruhan. Jika cache_path diisi, cache sentimen dimuat dari
+    disk sebelum proses dan disimpan kembali setelahnya.
+    """
+    wall_start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    chunks = [tweets[i:i + batch_size] for i in range(0, len(tweets), batch_size)]
+    payloads = [[{k: tweet[k] for k in NLP_FIELDS if k in tweet} for tweet in chunk] for chunk in chunks]
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    cache_counts = {'hits': 0, 'misses': 0}
+    processed_tweets = []
+    alerts = []
+    init_worker(cache_path)
+
+    # Pool hanya dipakai jika ada lebih dari satu chunk
+    pool = None
+    if workers > 1 and len(chunks) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                   initializer=init_worker, initargs=(cache_path,))
+    try:
+        chunk_results = pool.map(analyze_chunk, payloads) if pool else map(analyze_chunk, payloads)
+        for chunk, (results, chunk_timings, cache_info) in zip(chunks, chunk_results):
+            for stage, seconds in chunk_timings.items():
+                timings[stage] += seconds
+            cache_counts['hits'] += cache_info['hits']
+            cache_counts['misses'] += cache_info['misses']
+            SENTIMENT_CACHE.update(cache_info['new_entries'])
+            alerts.extend(_write_chunk(tweets_collection, alerts_collection, chunk, results, timings))
+            processed_tweets.extend(chunk)
+            print(f"   ✅ Batch {len(processed_tweets)}/{len(tweets)} tweet diproses & disimpan")
+    finally:
+        if pool:
+            pool.shutdown()
+
+    if cache_path:
+        SENTIMENT_CACHE.save(cache_path)
+    lookups = cache_counts['hits'] + cache_counts['misses']
+
+    report = {
+        'tweets': len(processed_tweets),
+        'alerts': len(alerts),
+        'batch_size': batch_size,
+        'workers': workers if pool else 1,
+        'total_seconds': time.perf_counter() - wall_start,
+        'cache': {**cache_counts, 'hit_rate': cache_counts['hits'] / lookups if lookups else 0.0},
+        'stages': {}
+    }
+    for stage in STAGES:
+        docs = len(alerts) if stage == 'write_alerts' else len(processed_tweets)
+        seconds = timings[stage]
+        report['stages'][stage] = {
+            'seconds': seconds,
+            'docs': docs,
+            'docs_per_sec': docs / seconds if seconds > 0 else 0.0
+        }
+        record(f"pipeline.{stage}", seconds, rows=docs)
+    record("pipeline.total", report['total_seconds'], rows=len(processed_tweets))
+    write_metrics()
+    print_report(report)
+    return processed_tweets, alerts, report
+
+def process_micro_batch(tweets_collection, alerts_collection, tweets):
+    """Proses satu micro-batch dari stream di proses ini (tanpa pool)
+
+    Return (alerts, waktu per tahap dalam detik). Dipakai stream_bullying
+    karena micro-batch kecil lebih murah diproses langsung daripada dikirim
+    ke worker.
+    """
+    results, timings, _ = analyze_chunk(tweets)
+    timings.update(write_tweets=0.0, write_alerts=0.0, write_rollups=0.0)
+    alerts = _write_chunk(tweets_collection, alerts_collection, tweets, results, timings)
+    for stage, seconds in timings.items():
+        record(f"stream.{stage}", seconds, rows=len(alerts) if stage == 'write_alerts' else len(tweets))
+    return alerts, timings
+
+def print_report(report):
+    """Tampilkan throughput per tahap"""
+    print(f"\n📊 Throughput pipeline ({report['tweets']} tweet, batch {report['batch_size']}, "
+          f"{report['workers']} worker, {report['total_seconds']:.2f}s):")
+    for stage, stats in report['stages'].items():
+        print(f"   • {stage:<13} {stats['seconds']:7.3f}s  {stats['docs_per_sec']:10,.0f} dok/detik")
+    cache = report['cache']
+    print(f"   • cache sentimen: {cache['hits']} hit / {cache['misses']} miss ({cache['hit_rate']:.1%})")
@@ -0,0 +1,107 @@
+# query_bullying.py
+# Query layer MongoDB untuk dashboard deteksi bullying
+# Filter, projection, sort dan pagination dijalankan di server MongoDB
+# sehingga satu halaman hanya mentransfer baris yang ditampilkan.
+
+from pymongo import DESCENDING
+
+# Nilai selectbox yang berarti "tanpa filter"
+SEMUA = "Semua"
+
+# ========== PROJECTION ==========
+# Hanya kolom yang benar-benar ditampilkan di tab "Semua Tweet"
+TWEET_PAGE_PROJECTION = {
+    "_id": 0, "tweet_id": 1, "text": 1, "city": 1, "school": 1,
+    "sentiment": 1, "risk_level": 1, "risk_score": 1, "category": 1,
+    "created_at": 1
+}
+
+# Kolom untuk tab "CCTV Log"
+CCTV_PAGE_PROJECTION = {
+    "_id": 0, "log_id": 1, "cctv_id": 1, "school": 1, "city": 1,
+    "location": 1, "timestamp": 1, "crowd_level": 1, "noise_level": 1,
+    "is_anomaly": 1, "warning_level": 1
+}
+
+# Field sort harus sama dengan index yang dibuat connect_mongodb:
+#   tweets    -> [("created_at", -1)]
+#   cctv_logs -> [("timestamp", -1), ("is_anomaly", 1)]
+TWEET_SORT_FIELD = "created_at"
+CCTV_SORT_FIELD = "timestamp"
+
+# ========== BUILDER FILTER ==========
+def build_tweet_filter(city=SEMUA, risk_level=SEMUA, sentiment=SEMUA):
+    """Ubah pilihan selectbox tab tweet menjadi filter MongoDB"""
+    query = {"processed": True}
+    if risk_level != SEMUA:
+        query["risk_level"] = risk_level
+    if city != SEMUA:
+        query["city"] = city
+    if sentiment != SEMUA:
+        query["sentiment"] = sentiment
+    return query
+
+def build_cctv_filter(city=SEMUA, location=SEMUA, anomaly=SEMUA):
+    """Ubah pilihan selectbox tab CCTV menjadi filter MongoDB"""
+    query = {}
+    if city != SEMUA:
+        query["city"] = city
+    if location != SEMUA:
+        query["location"] = location
+    if anomaly == "Anomali":
+        query["is_anomaly"] = True
+    elif anomaly == "Normal":
+        query["is_anomaly"] = False
+    return query
+
+# ========== QUERY KE MONGODB ==========
+def page_cursor(collection, query, projection, sort_field, page, per_page):
+    """Cursor satu halaman dokumen (skip/limit) terurut terbaru dulu"""
+    page = max(1, int(page))
+    return (collection.find(query, projection)
+            .sort(sort_field, DESCENDING)
+            .skip((page - 1) * per_page)
+            .limit(per_page))
+
+def all_cursor(collection, query, projection, sort_field, batch_size=1000):
+    """Cursor semua dokumen hasil filter (dipakai hanya untuk download CSV)"""
+    return (collection.find(query, projection)
+            .sort(sort_field, DESCENDING)
+            .batch_size(batch_size))
+
+def fetch_page(collection, query, projection, sort_field, page, per_page):
+    """Ambil satu halaman dokumen sebagai list dict"""
+    return list(page_cursor(collection, query, projection, sort_field, page, per_page))
+
+def fetch_all(collection, query, projection, sort_field, batch_size=1000):
+    """Ambil semua dokumen hasil filter sebagai list dict"""
+    return list(all_cursor(collection, query, projection, sort_field, batch_size))
+
+def fetch_distinct(collection, field, query=None):
+    """Ambil nilai unik sebuah field untuk pilihan selectbox"""
+    values = collection.distinct(field, query or {})
+    return sorted(str(v) for v in values if v is not None)
+
+# ========== FALLBACK PANDAS ==========
+def filter_frame(df, query):
+    """Terapkan filter bergaya MongoDB (equality) ke DataFrame
+
+    Dipakai saat dashboard jalan dengan data dummy sehingga filter
+    yang sama bisa dipakai untuk kedua sumber data.
+    """
+    if df.empty:
+        return df
+    mask = None
+    for field, value in query.items():
+        if field not in df.columns:
+            continue
+        field_mask = df[field] == value
+        mask = field_mask if mask is None else (mask & field_mask)
+    return df if mask is None else df[mask]
+
+def page_frame(df, sort_field, page, per_page):
+    """Potong DataFrame menjadi satu halaman, terurut terbaru dulu"""
+    if sort_field in df.columns:
+        df = df.sort_values(sort_field, ascending=False)
+    start = (max(1, int(page)) - 1) * per_page
+    return df.iloc[start:start + per_page]
@@ -0,0 +1,312 @@
+# rollup_bullying.py
+# Koleksi rollup (materialized view) untuk chart tren dan breakdown dashboard
+# Setiap batch yang diproses langsung menambah hitungan di dokumen rollup lewat
+# upsert $inc, jadi dashboard cukup membaca beberapa ratus dokumen ringkas
+# alih-alih mengagregasi seluruh tweet/log CCTV:
+#   daily_stats  {date, city, risk_level, sentiment, category, count}
+#   cctv_hourly  {date, hour, city, location, count, anomalies, period_start}
+#   cctv_daily   {date, city, location, count, anomalies, period_start}
+#   alert_daily  {date, risk_level, count}
+# Log CCTV mentah hanya disimpan CCTV_RAW_DAYS hari (TTL koleksi time-series);
+# setelah itu datanya tinggal di tier per jam lalu per hari, masing-masing
+# dengan TTL sendiri pada period_start. Kunci tier tidak memuat cctv_id, jadi
+# ukuran tier dan biaya baca dashboard tidak ikut naik saat kamera bertambah.
+
+from collections import Counter
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, UpdateOne
+from stats_bullying import HIGH_RISK_LEVELS, stats_from_facets
+
+DAILY_STATS = "daily_stats"
+CCTV_HOURLY = "cctv_hourly"
+CCTV_DAILY = "cctv_daily"
+ALERT_DAILY = "alert_daily"
+
+# Field kunci dokumen rollup (juga dipakai sebagai unique index)
+ROLLUP_KEYS = {
+    DAILY_STATS: ['date', 'city', 'risk_level', 'sentiment', 'category'],
+    CCTV_HOURLY: ['date', 'hour', 'city', 'location'],
+    CCTV_DAILY: ['date', 'city', 'location'],
+    ALERT_DAILY: ['date', 'risk_level']
+}
+
+# Key statistik dashboard yang diambil dari rollup
+TWEET_ROLLUP_STATS = ['sentiment', 'risk_level', 'city', 'category', 'high_risk_city',
+                      'risk_by_city', 'daily_tweets']
+CCTV_ROLLUP_STATS = ['total_cctv', 'cctv_anomalies', 'anomaly_status', 'cctv_location',
+                     'anomaly_location', 'anomaly_city']
+ALERT_ROLLUP_STATS = ['alert_trend']
+
+# ========== TIER RETENSI CCTV ==========
+# Retensi (hari) log mentah dan tiap tier; TTL tier memakai PERIOD_FIELD (awal jam/hari)
+CCTV_RAW_DAYS = 7
+CCTV_RETENTION_DAYS = {CCTV_HOURLY: 90, CCTV_DAILY: 730}
+PERIOD_FIELD = "period_start"
+
+# Rentang sampai sekian hari dibaca dari tier per jam, lebih panjang dari tier per hari
+HOURLY_MAX_RANGE_DAYS = 2
+
+# ========== HELPER ==========
+def _day(value):
+    """Tanggal YYYY-MM-DD dari datetime (None jika kosong/NaT)"""
+    if isinstance(value, datetime) and value == value:
+        return value.strftime("%Y-%m-%d")
+    return None
+
+def _hour(value):
+    """Jam dari datetime (None jika kosong/NaT)"""
+    if isinstance(value, datetime) and value == value:
+        return value.hour
+    return None
+
+def _period_start(doc):
+    """Awal periode dokumen rollup dari date (+ hour untuk tier per jam), None jika tanpa tanggal"""
+    if not doc.get("date"):
+        return None
+    return datetime.strptime(doc["date"], "%Y-%m-%d") + timedelta(hours=doc.get("hour") or 0)
+
+def _upsert_counts(collection, fields, counts, period=False):
+    """Satu bulk_write berisi upsert $inc per kombinasi kunci
+
+    period=True mengisi PERIOD_FIELD saat dokumen dibuat (untuk index TTL tier CCTV).
+    """
+    if not counts:
+        return None
+    operations = []
+    for key, increments in counts.items():
+        match = dict(zip(fields, key))
+        update = {"$inc": increments}
+        start = _period_start(match) if period else None
+        if start is not None:
+            update["$setOnInsert"] = {PERIOD_FIELD: start}
+        operations.append(UpdateOne(match, update, upsert=True))
+    return collection.bulk_write(operations, ordered=False)
+
+def ensure_rollup_indexes(db):
+    """Unique index pada field kunci + index TTL tier CCTV"""
+    for name, fields in ROLLUP_KEYS.items():
+        db[name].create_index([(field, 1) for field in fields], unique=True)
+    for name, days in CCTV_RETENTION_DAYS.items():
+        db[name].create_index([(PERIOD_FIELD, 1)], expireAfterSeconds=days * 86400)
+
+# ========== UPDATE PER BATCH ==========
+def _tweet_key(tweet):
+    """Kunci daily_stats untuk satu tweet"""
+    return (_day(tweet.get('created_at')), tweet.get('city'), tweet.get('risk_level'),
+            tweet.get('sentiment'), tweet.get('category'))
+
+def update_tweet_rollups(db, tweets, previous=None):
+    """Tambahkan satu batch tweet yang sudah diproses ke daily_stats
+
+    previous: versi lama tweet di batch yang sudah pernah diproses; kontribusinya
+    dikurangi agar proses ulang tidak menghitung tweet yang sama dua kali.
+    """
+    counts = Counter(_tweet_key(tweet) for tweet in tweets)
+    counts.subtract(_tweet_key(tweet) for tweet in previous or [])
+    increments = {key: {"count": count} for key, count in counts.items() if count}
+    return _upsert_counts(db[DAILY_STATS], ROLLUP_KEYS[DAILY_STATS], increments)
+
+def update_cctv_rollups(db, cctv_logs):
+    """Tambahkan satu batch log CCTV ke cctv_hourly dan cctv_daily (jumlah log dan anomali)"""
+    hourly, daily = {}, {}
+    for log in cctv_logs:
+        day = _day(log.get('timestamp'))
+        anomaly = int(bool(log.get('is_anomaly')))
+        for increments, key in [(hourly, (day, _hour(log.get('timestamp')), log.get('city'), log.get('location'))),
+                                (daily, (day, log.get('city'), log.get('location')))]:
+            bucket = increments.setdefault(key, {"count": 0, "anomalies": 0})
+            bucket["count"] += 1
+            bucket["anomalies"] += anomaly
+    return {
+        CCTV_HOURLY: _upsert_counts(db[CCTV_HOURLY], ROLLUP_KEYS[CCTV_HOURLY], hourly, period=True),
+        CCTV_DAILY: _upsert_counts(db[CCTV_DAILY], ROLLUP_KEYS[CCTV_DAILY], daily, period=True)
+    }
+
+def update_alert_rollups(db, alerts):
+    """Tambahkan satu batch alert ke alert_daily"""
+    counts = Counter((_day(alert.get('created_at')), alert.get('risk_level')) for alert in alerts)
+    increments = {key: {"count": count} for key, count in counts.items()}
+    return _upsert_counts(db[ALERT_DAILY], ROLLUP_KEYS[ALERT_DAILY], increments)
+
+# ========== BANGUN ULANG ==========
+def _rebuild(db, source_name, target_name, group_id, sums, match=None, since=None, period=False):
+    """Hitung ulang satu koleksi rollup dari koleksi sumber lalu ganti isinya
+
+    since (datetime) membatasi penggantian ke tanggal >= since; dokumen rollup
+    yang lebih lama dipertahankan karena sumbernya sudah kedaluwarsa.
+    """
+    pipeline = [
+        {"$match": match or {}},
+        {"$group": {"_id": group_id, **sums}}
+    ]
+    docs = [{**row["_id"], **{name: row[name] for name in sums}}
+            for row in db[source_name].aggregate(pipeline, allowDiskUse=True)]
+    if period:
+        for doc in docs:
+            start = _period_start(doc)
+            if start is not None:
+                doc[PERIOD_FIELD] = start
+    db[target_name].delete_many({"date": {"$gte": _day(since)}} if since else {})
+    if docs:
+        db[target_name].insert_many(docs, ordered=False)
+    print(f"   🧮 {target_name}: {len(docs)} dokumen rollup" + (f" (mulai {_day(since)})" if since else ""))
+    return len(docs)
+
+def _rebuild_since(source, time_field, target):
+    """Awal rentang tier yang boleh dibangun ulang dari source (None = seluruhnya)
+
+    Jika target punya hari yang lebih tua dari isi source, source sudah terpotong
+    TTL dan hari tertuanya bisa tidak lengkap, jadi hari itu dan sebelumnya
+    dipertahankan dari isi target.
+    """
+    doc = source.find_one({time_field: {"$type": "date"}}, {time_field: 1}, sort=[(time_field, ASCENDING)])
+    if not doc:
+        # Source kosong (semua sudah kedaluwarsa): jangan hapus isi target
+        return datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    oldest = doc[time_field]
+    if target.find_one({"date": {"$lt": _day(oldest)}}, {"_id": 1}) is None:
+        return None
+    return datetime.combine(oldest.date() + timedelta(days=1), datetime.min.time())
+
+def rebuild_rollups(db, tweets_name="tweets", cctv_name="cctv_logs", alerts_name="alerts", cctv_complete=False):
+    """Bangun ulang semua rollup dari data mentah (backfill data lama / setelah proses ulang)
+
+    cctv_complete=True menandai log CCTV mentah belum pernah terpotong TTL (mis.
+    koleksi biasa sebelum migrasi), sehingga tier CCTV dibangun ulang seluruhnya.
+    """
+    print("🧮 Membangun ulang koleksi rollup...")
+    ensure_rollup_indexes(db)
+    counts = {
+        DAILY_STATS: _rebuild(db, tweets_name, DAILY_STATS, {
+            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "city": "$city", "risk_level": "$risk_level",
+            "sentiment": "$sentiment", "category": "$category"
+        }, {"count": {"$sum": 1}}, match={"processed": True})
+    }
+    # Tier CCTV dari log mentah, hanya rentang yang log mentahnya masih utuh
+    since = None if cctv_complete else _rebuild_since(db[cctv_name], "timestamp", db[CCTV_DAILY])
+    match = {"timestamp": {"$gte": since}} if since else None
+    sums = {"count": {"$sum": 1}, "anomalies": {"$sum": {"$cond": ["$is_anomaly", 1, 0]}}}
+    day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}
+    counts[CCTV_HOURLY] = _rebuild(db, cctv_name, CCTV_HOURLY, {
+        "date": day, "hour": {"$hour": "$timestamp"}, "city": "$city", "location": "$location"
+    }, sums, match=match, since=since, period=True)
+    counts[CCTV_DAILY] = _rebuild(db, cctv_name, CCTV_DAILY, {
+        "date": day, "city": "$city", "location": "$location"
+    }, sums, match=match, since=since, period=True)
+    counts[ALERT_DAILY] = _rebuild(db, alerts_name, ALERT_DAILY, {
+        "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+        "risk_level": "$risk_level"
+    }, {"count": {"$sum": 1}})
+    return counts
+
+# ========== BACA UNTUK DASHBOARD ==========
+def _sum_by(field, value="$count"):
+    """Stage $group yang menjumlahkan field hitungan rollup per nilai field"""
+    return {"$group": {"_id": f"${field}", "count": {"$sum": value}}}
+
+def build_daily_rollup_pipeline():
+    """$facet di daily_stats dengan bentuk hasil sama seperti build_tweet_stats_pipeline
+
+    Dokumen berhitungan 0 (semua tweet-nya pindah kunci saat diproses ulang) dilewati.
+    """
+    return [{"$match": {"count": {"$gt": 0}}}, {"$facet": {
+        "total": [{"$group": {"_id": None, "n": {"$sum": "$count"}}}],
+        "sentiment": [_sum_by("sentiment")],
+        "risk_level": [_sum_by("risk_level")],
+        "city": [_sum_by("city")],
+        "category": [_sum_by("category")],
+        "high_risk_city": [
+            {"$match": {"risk_level": {"$in": HIGH_RISK_LEVELS}}},
+            _sum_by("city")
+        ],
+        "risk_by_city": [
+            {"$group": {"_id": {"city": "$city", "risk_level": "$risk_level"},
+                        "count": {"$sum": "$count"}}}
+        ],
+        "daily": [_sum_by("date")]
+    }}]
+
+def build_cctv_rollup_pipeline(match=None):
+    """$facet di tier CCTV (cctv_hourly/cctv_daily): total log, total anomali, per lokasi dan per kota"""
+    return [{"$match": match or {}}, {"$facet": {
+        "total": [{"$group": {"_id": None, "n": {"$sum": "$count"}, "anomalies": {"$sum": "$anomalies"}}}],
+        "location": [_sum_by("location")],
+        "anomaly_location": [_sum_by("location", "$anomalies"), {"$match": {"count": {"$gt": 0}}}],
+        "anomaly_city": [_sum_by("city", "$anomalies"), {"$match": {"count": {"$gt": 0}}}]
+    }}]
+
+def _cctv_facet(facet):
+    """Lengkapi hasil $facet tier CCTV dengan hitungan status anomali (True/False)"""
+    total = facet["total"][0] if facet["total"] else {"n": 0, "anomalies": 0}
+    facet["anomaly_status"] = [
+        {"_id": status, "count": count}
+        for status, count in [(True, total["anomalies"]), (False, total["n"] - total["anomalies"])]
+        if count > 0
+    ]
+    return facet
+
+def load_rollup_stats(db, trend_days=7):
+    """Statistik chart dashboard dari koleksi rollup
+
+    Return dict berisi key statistik yang rollup-nya sudah terisi saja,
+    sehingga bisa langsung menimpa statistik dari sumber lain.
+    """
+    stats = {}
+    if db[DAILY_STATS].estimated_document_count():
+        tweet_facet = next(db[DAILY_STATS].aggregate(build_daily_rollup_pipeline()), None)
+        rollup = stats_from_facets(tweet_facet, None, [], trend_days)
+        stats.update({key: rollup[key] for key in TWEET_ROLLUP_STATS})
+    stats.update(load_cctv_range_stats(db, None, trend_days))
+    if db[ALERT_DAILY].estimated_document_count():
+        since = (datetime.now() - timedelta(days=trend_days)).strftime('%Y-%m-%d')
+        rows = list(db[ALERT_DAILY].aggregate([{"$match": {"date": {"$gte": since}}}, _sum_by("date")]))
+        stats.update({key: stats_from_facets(None, None, rows, trend_days)[key] for key in ALERT_ROLLUP_STATS})
+    return stats
+
+# ========== TIER CCTV PER RENTANG WAKTU ==========
+def cctv_tier(db, days=None):
+    """Tier rollup CCTV untuk rentang days hari terakhir (None = semua), None jika belum terisi
+
+    Rentang pendek memakai tier per jam (presisi jam), rentang panjang dan
+    "semua" memakai tier per hari; tier lain dipakai jika pilihan pertama kosong.
+    """
+    if days is not None and days <= HOURLY_MAX_RANGE_DAYS:
+        preferred = [CCTV_HOURLY, CCTV_DAILY]
+    else:
+        preferred = [CCTV_DAILY, CCTV_HOURLY]
+    for name in preferred:
+        if db[name].estimated_document_count():
+            return name
+    return None
+
+def cctv_range_match(tier, days=None, now=None):
+    """Filter dokumen tier untuk days hari terakhir (tier per jam dibulatkan ke jam, per hari ke tanggal)"""
+    if days is None:
+        return {}
+    since = (now or datetime.now()) - timedelta(days=days)
+    if tier == CCTV_HOURLY:
+        return {PERIOD_FIELD: {"$gte": since.replace(minute=0, second=0, microsecond=0)}}
+    return {"date": {"$gte": _day(since)}}
+
+def load_cctv_tier_facet(db, days=None, **kwargs):
+    """$facet CCTV (bentuk sama dengan build_cctv_stats_pipeline) dari tier rollup, None jika belum terisi
+
+    kwargs diteruskan ke aggregate (mis. maxTimeMS).
+    """
+    tier = cctv_tier(db, days)
+    if tier is None:
+        return None
+    pipeline = build_cctv_rollup_pipeline(cctv_range_match(tier, days))
+    return _cctv_facet(next(db[tier].aggregate(pipeline, **kwargs)))
+
+def load_cctv_range_stats(db, days=None, trend_days=7):
+    """Statistik CCTV (total, anomali, per lokasi/kota) untuk days hari terakhir dari tier rollup
+
+    Return dict berisi key CCTV_ROLLUP_STATS, atau {} jika tier CCTV belum terisi.
+    """
+    facet = load_cctv_tier_facet(db, days)
+    if facet is None:
+        return {}
+    rollup = stats_from_facets(None, facet, [], trend_days)
+    return {key: rollup[key] for key in CCTV_ROLLUP_STATS}
@@ -0,0 +1,67 @@
+# schema_bullying.py
+# Schema DataFrame untuk tweet dan log CCTV
+# Kolom bernilai sedikit (kota, sekolah, sentimen, ...) disimpan sebagai category,
+# angka memakai int16/float32, waktu di-parse sekali ke datetime64, dan field
+# yang tidak dipakai dashboard (mis. _id ObjectId) dibuang saat load.
+
+import pandas as pd
+
+# Kolom -> dtype. Kolom di luar schema dibuang.
+TWEET_SCHEMA = {
+    'tweet_id': 'object',
+    'text': 'object',
+    'city': 'category',
+    'school': 'category',
+    'sentiment': 'category',
+    'risk_level': 'category',
+    'risk_score': 'float32',
+    'category': 'category',
+    'created_at': 'datetime'
+}
+
+CCTV_SCHEMA = {
+    'log_id': 'object',
+    'cctv_id': 'category',
+    'school': 'category',
+    'city': 'category',
+    'location': 'category',
+    'timestamp': 'datetime',
+    'crowd_level': 'int16',
+    'noise_level': 'float32',
+    'is_anomaly': 'bool',
+    'warning_level': 'category'
+}
+
+# ========== CAST ==========
+def _cast(values, dtype):
+    """Cast satu kolom ke dtype schema"""
+    if dtype == 'datetime':
+        return pd.to_datetime(values, errors='coerce')
+    if dtype in ('int16', 'float32'):
+        numbers = pd.to_numeric(values, errors='coerce')
+        # int16 tidak bisa menyimpan NaN, jatuh ke float32
+        if dtype == 'int16' and numbers.isna().any():
+            return numbers.astype('float32')
+        return numbers.astype(dtype)
+    if dtype == 'bool':
+        return values.astype(object).fillna(False).astype(bool)
+    return values.astype(dtype)
+
+def apply_schema(df, schema):
+    """Ambil kolom schema saja lalu cast setiap kolom ke dtype-nya"""
+    df = df[[col for col in schema if col in df.columns]].copy()
+    for col in df.columns:
+        df[col] = _cast(df[col], schema[col])
+    return df
+
+def tweets_frame(records):
+    """DataFrame tweet dari list dokumen/dict dengan TWEET_SCHEMA"""
+    return apply_schema(pd.DataFrame(records), TWEET_SCHEMA)
+
+def cctv_frame(records):
+    """DataFrame log CCTV dari list dokumen/dict dengan CCTV_SCHEMA"""
+    return apply_schema(pd.DataFrame(records), CCTV_SCHEMA)
+
+def frame_memory_mb(df):
+    """Pemakaian memori DataFrame (termasuk isi string) dalam MB"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
@@ -0,0 +1,233 @@
+# snapshot_bullying.py
+# Snapshot kolumnar (Parquet / Arrow IPC) untuk koleksi MongoDB
+# Dokumen dibaca per batch dari cursor dan langsung ditulis sebagai dataset
+# terpartisi date=/city= (hive), sehingga memori terpakai sebatas satu batch.
+# Setiap koleksi punya manifest.json yang menunjuk snapshot terbaru; pembaca
+# membuka snapshot itu dengan memory-mapping dan schema tetap terjaga.
+
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from pyarrow import fs
+from arrow_bullying import docs_to_batch
+
+SNAPSHOT_FOLDER = "snapshots"
+MANIFEST_NAME = "manifest.json"
+DEFAULT_SNAPSHOT_BATCH = 50000
+DEFAULT_COMPRESSION = "zstd"
+PARTITION_FIELDS = ["date", "city"]
+
+# Schema Arrow per koleksi + field waktu sumber kolom partisi date
+SNAPSHOT_SPECS = {
+    "tweets": {
+        "date_field": "created_at",
+        "query": {"processed": True},
+        "schema": pa.schema([
+            ("tweet_id", pa.string()),
+            ("text", pa.string()),
+            ("city", pa.string()),
+            ("school", pa.string()),
+            ("sentiment", pa.string()),
+            ("risk_level", pa.string()),
+            ("risk_score", pa.float32()),
+            ("category", pa.string()),
+            ("bullying_detected", pa.bool_()),
+            ("created_at", pa.timestamp("ms")),
+            ("processed_at", pa.timestamp("ms")),
+            ("retweet_count", pa.int32()),
+            ("like_count", pa.int32())
+        ])
+    },
+    "cctv_logs": {
+        "date_field": "timestamp",
+        "query": {},
+        "schema": pa.schema([
+            ("log_id", pa.string()),
+            ("cctv_id", pa.string()),
+            ("school", pa.string()),
+            ("city", pa.string()),
+            ("location", pa.string()),
+            ("timestamp", pa.timestamp("ms")),
+            ("crowd_level", pa.int16()),
+            ("noise_level", pa.float32()),
+            ("is_anomaly", pa.bool_()),
+            ("warning_level", pa.string())
+        ])
+    },
+    "alerts": {
+        "date_field": "created_at",
+        "query": {},
+        "schema": pa.schema([
+            ("alert_id", pa.string()),
+            ("tweet_id", pa.string()),
+            ("school", pa.string()),
+            ("city", pa.string()),
+            ("risk_level", pa.string()),
+            ("risk_score", pa.float32()),
+            ("sentiment", pa.string()),
+            ("category", pa.string()),
+            ("status", pa.string()),
+            ("created_at", pa.timestamp("ms")),
+            ("alert_type", pa.string()),
+            ("priority", pa.string())
+        ])
+    }
+}
+
+# ========== HELPER ==========
+def _file_format(fmt):
+    """Format dataset dan opsi tulis (kompresi) untuk 'parquet' atau 'ipc'"""
+    if fmt == "parquet":
+        file_format = ds.ParquetFileFormat()
+        return file_format, file_format.make_write_options(compression=DEFAULT_COMPRESSION)
+    if fmt == "ipc":
+        file_format = ds.IpcFileFormat()
+        return file_format, file_format.make_write_options(compression=DEFAULT_COMPRESSION)
+    raise ValueError(f"Format snapshot tidak dikenal: {fmt}")
+
+def _partitioning(partition_by):
+    """Partisi hive, default date=YYYY-MM-DD/city=<kota>"""
+    return ds.partitioning(pa.schema([(name, pa.string()) for name in partition_by]), flavor="hive")
+
+def _batch_table(docs, schema, date_field):
+    """Ubah satu batch dokumen menjadi tabel Arrow + kolom partisi date"""
+    # Dokumen langsung dipecah ke kolom Arrow (field hilang/NaN menjadi null)
+    table = pa.Table.from_batches([docs_to_batch(docs, schema)])
+    dates = pc.strftime(table[date_field], format="%Y-%m-%d")
+    return table.append_column("date", dates)
+
+def _collection_folder(base_folder, collection_name):
+    """Folder snapshot sebuah koleksi: <base>/snapshots/<koleksi>"""
+    return os.path.join(base_folder, SNAPSHOT_FOLDER, collection_name)
+
+def _new_snapshot_id(base_folder, collection_name):
+    """Id snapshot YYYYMMDD_HHMMSS, diberi akhiran _<n> jika detik yang sama sudah dipakai"""
+    folder = _collection_folder(base_folder, collection_name)
+    base_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    snapshot_id, n = base_id, 1
+    while os.path.exists(os.path.join(folder, snapshot_id)):
+        snapshot_id = f"{base_id}_{n}"
+        n += 1
+    return snapshot_id
+
+def read_manifest(base_folder, collection_name):
+    """Baca manifest snapshot koleksi (dict kosong jika belum ada)"""
+    path = os.path.join(_collection_folder(base_folder, collection_name), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_manifest(base_folder, collection_name, manifest):
+    """Tulis manifest lewat file sementara agar pembaca tidak melihat file setengah jadi"""
+    path = os.path.join(_collection_folder(base_folder, collection_name), MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# ========== TULIS SNAPSHOT ==========
+def _cursor_batches(cursor, schema, date_field, batch_size, progress, collection_name):
+    """Generator RecordBatch dari cursor MongoDB, batch_size dokumen per langkah"""
+    while True:
+        docs = list(islice(cursor, batch_size))
+        if not docs:
+            return
+        table = _batch_table(docs, schema, date_field)
+        progress["rows"] += len(docs)
+        progress["batches"] += 1
+        print(f"   💾 {collection_name}: batch {progress['batches']} ({progress['rows']} baris)")
+        yield from table.to_batches()
+
+def write_snapshot(db, collection_name, base_folder="hasil_analisis", fmt="parquet",
+                   batch_size=DEFAULT_SNAPSHOT_BATCH, partition_by=PARTITION_FIELDS):
+    """Tulis snapshot satu koleksi secara streaming (memori sebatas satu batch cursor)
+
+    Return entri manifest snapshot yang baru (None jika koleksi kosong).
+    Untuk data kecil partition_by=["date"] menghindari banyak file kecil.
+    """
+    spec = SNAPSHOT_SPECS[collection_name]
+    schema = spec["schema"]
+    file_format, write_options = _file_format(fmt)
+
+    snapshot_id = _new_snapshot_id(base_folder, collection_name)
+    snapshot_path = os.path.join(_collection_folder(base_folder, collection_name), snapshot_id)
+    projection = {"_id": 0, **{name: 1 for name in schema.names}}
+    cursor = db[collection_name].find(spec["query"], projection).batch_size(batch_size)
+
+    start = time.perf_counter()
+    progress = {"rows": 0, "batches": 0}
+    batches = _cursor_batches(cursor, schema, spec["date_field"], batch_size, progress, collection_name)
+    # write_dataset menarik batch satu per satu dan menjaga file per partisi tetap
+    # terbuka, jadi satu partisi = satu file walau datanya datang dari banyak batch
+    ds.write_dataset(
+        batches, snapshot_path, schema=schema.append(pa.field("date", pa.string())),
+        format=file_format, file_options=write_options, partitioning=_partitioning(partition_by),
+        basename_template=f"part-{{i}}.{fmt}", existing_data_behavior="error"
+    )
+    rows, batch_no = progress["rows"], progress["batches"]
+
+    if rows == 0:
+        print(f"⚠️ {collection_name}: tidak ada data untuk snapshot")
+        return None
+
+    entry = {
+        "id": snapshot_id,
+        "path": snapshot_id,
+        "format": fmt,
+        "compression": DEFAULT_COMPRESSION,
+        "rows": rows,
+        "batches": batch_no,
+        "partitioning": list(partition_by),
+        "schema": [{"name": field.name, "type": str(field.type)} for field in schema],
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    manifest = read_manifest(base_folder, collection_name)
+    manifest["latest"] = snapshot_id
+    manifest.setdefault("snapshots", []).append(entry)
+    _write_manifest(base_folder, collection_name, manifest)
+
+    print(f"✅ Snapshot {collection_name}: {rows} baris, {batch_no} batch, "
+          f"{time.perf_counter() - start:.2f}s → {snapshot_path}")
+    return entry
+
+def export_snapshots(db, base_folder="hasil_analisis", fmt="parquet", batch_size=DEFAULT_SNAPSHOT_BATCH,
+                     partition_by=PARTITION_FIELDS):
+    """Snapshot kolumnar semua koleksi (pelengkap export CSV)"""
+    print("\n" + "=" * 60)
+    print(f"🧊 EXPORT SNAPSHOT KOLUMNAR ({fmt.upper()}, {DEFAULT_COMPRESSION})")
+    print("=" * 60)
+    return {name: write_snapshot(db, name, base_folder, fmt, batch_size, partition_by) for name in SNAPSHOT_SPECS}
+
+# ========== BACA SNAPSHOT ==========
+def open_snapshot(base_folder, collection_name, snapshot_id=None):
+    """Buka snapshot (default: terbaru di manifest) sebagai pyarrow Dataset memory-mapped
+
+    Return None jika koleksi belum punya snapshot; snapshot_id yang tidak ada di
+    manifest memunculkan ValueError.
+    """
+    manifest = read_manifest(base_folder, collection_name)
+    snapshot_id = snapshot_id or manifest.get("latest")
+    if snapshot_id is None:
+        return None
+    entry = next((item for item in manifest.get("snapshots", []) if item["id"] == snapshot_id), None)
+    if entry is None:
+        raise ValueError(f"Snapshot {collection_name} tidak ditemukan di manifest: {snapshot_id}")
+    path = os.path.join(_collection_folder(base_folder, collection_name), entry["path"])
+    return ds.dataset(path, format=entry["format"], partitioning=_partitioning(entry["partitioning"]),
+                      filesystem=fs.LocalFileSystem(use_mmap=True))
+
+def load_snapshot(base_folder, collection_name, columns=None, row_filter=None, snapshot_id=None):
+    """Muat snapshot ke DataFrame (kolom dan filter diterapkan sebelum dibaca)
+
+    Contoh filter: pyarrow.dataset.field("city") == "Jakarta"
+    """
+    dataset = open_snapshot(base_folder, collection_name, snapshot_id)
+    if dataset is None:
+        return None
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
@@ -0,0 +1,188 @@
+# source_bullying.py
+# Sumber data dashboard
+# Dashboard hanya butuh dua hal dari sumber data: dict statistik dan (opsional)
+# DataFrame tweet/CCTV untuk explorer berbasis pandas. StoreDataSource membaca
+# MongoDB lewat store inkremental (chart dari koleksi rollup); FileDataSource membaca file export terbaru
+# (snapshot Parquet atau CSV) di HASIL_ANALISIS_BULLYING untuk mode offline.
+
+from abc import ABC, abstractmethod
+import glob
+import os
+import threading
+import pandas as pd
+from rollup_bullying import load_rollup_stats
+from schema_bullying import TWEET_SCHEMA, CCTV_SCHEMA, apply_schema
+from snapshot_bullying import read_manifest, load_snapshot
+from stats_bullying import stats_from_frames
+
+# Lokasi file export per jenis data: (subfolder, pola nama file, koleksi snapshot)
+EXPORT_FILES = {
+    'tweets': ('data_tweet', 'tweets_export_*.csv', 'tweets'),
+    'cctv': ('data_cctv', 'cctv_logs_export_*.csv', 'cctv_logs'),
+    'alerts': ('data_alert', 'alerts_export_*.csv', 'alerts')
+}
+
+ALERT_COLUMNS = ['created_at', 'risk_level', 'city']
+
+# ========== INTERFACE ==========
+class DataSource(ABC):
+    """Interface sumber data dashboard"""
+
+    name = "base"
+
+    def refresh(self, force=False):
+        """Tarik data baru dari sumber (boleh dilewati jika belum ada perubahan)"""
+
+    @abstractmethod
+    def stats(self):
+        """Dict statistik dashboard (format stats_bullying)"""
+
+    def frames(self):
+        """(tweets_df, cctv_df) untuk explorer pandas; kosong = explorer membaca MongoDB per halaman"""
+        return pd.DataFrame(), pd.DataFrame()
+
+    @property
+    @abstractmethod
+    def version(self):
+        """Penanda versi data, berubah setiap isi sumber berubah"""
+
+    def stale(self):
+        """Dict bagian data → alasan untuk bagian yang gagal/terlambat diperbarui (kosong = semua terbaru)"""
+        return {}
+
+    def describe(self):
+        """Keterangan singkat sumber untuk panel debug"""
+        return self.name
+
+# ========== MONGODB ==========
+class StoreDataSource(DataSource):
+    """MongoDB lewat IncrementalStore (statistik per delta watermark)
+
+    Statistik chart tren/breakdown diambil dari koleksi rollup jika sudah terisi,
+    dibaca ulang hanya saat versi store berubah.
+    """
+
+    name = "mongodb"
+
+    def __init__(self, store):
+        self.store = store
+        self._rollup_stats = {}
+        self._rollup_version = None
+
+    def refresh(self, force=False):
+        self.store.refresh(force=force)
+        if force or self._rollup_version != self.store.version:
+            self._rollup_stats = load_rollup_stats(self.store.db)
+            self._rollup_version = self.store.version
+
+    def stats(self):
+        stats = self.store.stats()
+        stats.update(self._rollup_stats)
+        return stats
+
+    @property
+    def version(self):
+        return self.store.version
+
+    def stale(self):
+        return {self.store.names[kind]: reason for kind, reason in self.store.stale.items()}
+
+    def describe(self):
+        charts = "rollup" if self._rollup_stats else "store"
+        return f"MongoDB (store inkremental, chart dari {charts}), delta terakhir {self.store.last_delta}"
+
+# ========== FILE EXPORT ==========
+def newest_export(base_folder, kind):
+    """Path file export CSV terbaru untuk satu jenis data (None jika tidak ada)
+
+    Nama file memakai timestamp YYYYMMDD_HHMMSS sehingga urutan nama = urutan waktu.
+    """
+    subfolder, pattern, _ = EXPORT_FILES[kind]
+    files = sorted(glob.glob(os.path.join(base_folder, subfolder, pattern)))
+    return files[-1] if files else None
+
+def _normalize_cctv(df):
+    """Kolom is_anomaly di CSV export berisi 'YA'/'TIDAK'"""
+    if 'is_anomaly' in df.columns and df['is_anomaly'].dtype == object:
+        df['is_anomaly'] = df['is_anomaly'].isin(['YA', 'True', True])
+    return df
+
+class FileDataSource(DataSource):
+    """File export terbaru di folder hasil analisis, dimuat saat pertama dipakai
+
+    Snapshot kolumnar (manifest.json) dipakai jika ada, selain itu CSV export
+    terbaru dibaca dengan memory_map dan hanya kolom yang dipakai dashboard.
+    """
+
+    name = "file"
+
+    def __init__(self, base_folder):
+        self.base_folder = base_folder
+        self._lock = threading.Lock()
+        self._paths = {}
+        self._frames = None
+        self._stats = None
+
+    def _locate(self):
+        """Cari sumber terbaru per jenis data: ('snapshot', id) atau ('csv', path)"""
+        paths = {}
+        for kind, (_, _, collection) in EXPORT_FILES.items():
+            latest = read_manifest(self.base_folder, collection).get('latest')
+            if latest:
+                paths[kind] = ('snapshot', latest)
+            else:
+                path = newest_export(self.base_folder, kind)
+                paths[kind] = ('csv', path) if path else None
+        return paths
+
+    def available(self):
+        """True jika minimal ada data tweet atau CCTV"""
+        paths = self._locate()
+        return paths['tweets'] is not None or paths['cctv'] is not None
+
+    def _read(self, kind, schema_columns):
+        """Baca satu jenis data dari snapshot atau CSV, hanya kolom yang dibutuhkan"""
+        source = self._paths.get(kind)
+        if source is None:
+            return pd.DataFrame()
+        source_type, location = source
+        if source_type == 'snapshot':
+            collection = EXPORT_FILES[kind][2]
+            df = load_snapshot(self.base_folder, collection, snapshot_id=location)
+            return df[[col for col in schema_columns if col in df.columns]]
+        return pd.read_csv(location, usecols=lambda col: col in schema_columns, memory_map=True)
+
+    def _load(self):
+        """Muat semua file lalu hitung statistik sekali per versi"""
+        print(f"📂 Memuat file export: {self.describe()}")
+        tweets_df = apply_schema(self._read('tweets', TWEET_SCHEMA), TWEET_SCHEMA)
+        cctv_df = apply_schema(_normalize_cctv(self._read('cctv', CCTV_SCHEMA)), CCTV_SCHEMA)
+        alerts_df = self._read('alerts', ALERT_COLUMNS)
+        if 'created_at' in alerts_df.columns:
+            alerts_df['created_at'] = pd.to_datetime(alerts_df['created_at'], errors='coerce')
+        self._frames = (tweets_df, cctv_df)
+        self._stats = stats_from_frames(tweets_df, cctv_df, alerts_df)
+
+    def refresh(self, force=False):
+        """Muat ulang hanya jika ada file export yang lebih baru"""
+        with self._lock:
+            paths = self._locate()
+            if force or self._frames is None or paths != self._paths:
+                self._paths = paths
+                self._load()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def frames(self):
+        with self._lock:
+            return self._frames
+
+    @property
+    def version(self):
+        return "|".join(os.path.basename(str(location)) for _, location in filter(None, self._paths.values()))
+
+    def describe(self):
+        files = [f"{kind}: {os.path.basename(str(source[1]))}" for kind, source in self._paths.items() if source]
+        return f"File export ({', '.join(files)})"
@@ -0,0 +1,202 @@
+# stats_bullying.py
+# Agregasi server-side untuk metric card, statistik sidebar dan chart dashboard
+# Semua hitungan (value_counts) dikerjakan MongoDB lewat satu $facet per koleksi,
+# dashboard hanya menerima hasil ringkasnya.
+
+import pandas as pd
+from datetime import datetime, timedelta
+
+HIGH_RISK_LEVELS = ['merah', 'kuning']
+
+# ========== PIPELINE AGREGASI ==========
+def _group_count(field):
+    """Stage $group untuk menghitung jumlah dokumen per nilai field"""
+    return {"$group": {"_id": f"${field}", "count": {"$sum": 1}}}
+
+def _daily_group(field):
+    """Stage $group untuk menghitung jumlah dokumen per tanggal"""
+    return {"$group": {
+        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}},
+        "count": {"$sum": 1}
+    }}
+
+def build_tweet_stats_pipeline(match=None):
+    """Satu $facet untuk semua hitungan tweet yang dipakai dashboard
+
+    match: filter tambahan (mis. watermark processed_at untuk update delta)
+    """
+    return [
+        {"$match": {"processed": True, **(match or {})}},
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "sentiment": [_group_count("sentiment")],
+            "risk_level": [_group_count("risk_level")],
+            "city": [_group_count("city")],
+            "category": [_group_count("category")],
+            "high_risk_city": [
+                {"$match": {"risk_level": {"$in": HIGH_RISK_LEVELS}}},
+                _group_count("city")
+            ],
+            "risk_by_city": [
+                {"$group": {"_id": {"city": "$city", "risk_level": "$risk_level"},
+                            "count": {"$sum": 1}}}
+            ],
+            "daily": [
+                {"$match": {"created_at": {"$type": "date"}}},
+                _daily_group("created_at")
+            ]
+        }}
+    ]
+
+def build_cctv_stats_pipeline(match=None):
+    """Satu $facet untuk semua hitungan log CCTV"""
+    return [
+        {"$match": match or {}},
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "anomaly_status": [_group_count("is_anomaly")],
+            "location": [_group_count("location")],
+            "anomaly_location": [
+                {"$match": {"is_anomaly": True}},
+                _group_count("location")
+            ],
+            "anomaly_city": [
+                {"$match": {"is_anomaly": True}},
+                _group_count("city")
+            ]
+        }}
+    ]
+
+def build_alert_trend_pipeline(since=None, match=None):
+    """Jumlah alert per hari sejak tanggal tertentu (None = semua tanggal)"""
+    query = dict(match or {})
+    if since is not None:
+        query["created_at"] = {"$gte": since}
+    return [
+        {"$match": query},
+        _daily_group("created_at")
+    ]
+
+# ========== KONVERSI HASIL ==========
+def _counts_to_series(rows):
+    """Ubah hasil $group menjadi Series seperti value_counts()"""
+    counts = {row["_id"]: row["count"] for row in rows if row.get("_id") is not None}
+    series = pd.Series(counts, dtype='int64', name='count')
+    return series.sort_values(ascending=False, kind='stable')
+
+def _total(rows):
+    """Ambil angka dari hasil stage $count"""
+    return int(rows[0]["n"]) if rows else 0
+
+def _daily_frame(rows, count_name):
+    """Ubah hasil group per tanggal menjadi DataFrame (date, count) terurut"""
+    daily = pd.DataFrame([(row["_id"], row["count"]) for row in rows if row.get("_id")],
+                         columns=['date', count_name])
+    daily['date'] = pd.to_datetime(daily['date']).dt.date
+    return daily.sort_values('date').reset_index(drop=True)
+
+def _risk_by_city_frame(rows):
+    """Ubah hasil group (city, risk_level) menjadi tabel kota x level risiko"""
+    records = [(row["_id"].get("city"), row["_id"].get("risk_level"), row["count"]) for row in rows]
+    table = pd.DataFrame(records, columns=['city', 'risk_level', 'count']).dropna()
+    return table.pivot_table(index='city', columns='risk_level', values='count',
+                             aggfunc='sum', fill_value=0)
+
+def _empty_stats():
+    """Struktur statistik kosong"""
+    empty = pd.Series(dtype='int64', name='count')
+    return {
+        'total_tweets': 0, 'high_risk': 0,
+        'sentiment': empty, 'risk_level': empty, 'city': empty, 'category': empty,
+        'high_risk_city': empty, 'risk_by_city': pd.DataFrame(),
+        'daily_tweets': pd.DataFrame(columns=['date', 'count']),
+        'total_cctv': 0, 'cctv_anomalies': 0,
+        'anomaly_status': empty, 'cctv_location': empty,
+        'anomaly_location': empty, 'anomaly_city': empty,
+        'alert_trend': pd.DataFrame(columns=['date', 'alert_count'])
+    }
+
+# ========== LOAD DARI MONGODB ==========
+def load_dashboard_stats(tweets_collection, cctv_collection, alerts_collection, trend_days=7):
+    """Jalankan agregasi $facet dan kembalikan dict statistik dashboard"""
+    tweet_facet = next(tweets_collection.aggregate(build_tweet_stats_pipeline()), None)
+    cctv_facet = next(cctv_collection.aggregate(build_cctv_stats_pipeline()), None)
+
+    since = datetime.now() - timedelta(days=trend_days)
+    alert_rows = list(alerts_collection.aggregate(build_alert_trend_pipeline(since)))
+
+    return stats_from_facets(tweet_facet, cctv_facet, alert_rows, trend_days)
+
+def stats_from_facets(tweet_facet, cctv_facet, alert_rows, trend_days=7):
+    """Susun dict statistik dashboard dari hasil $facet tweet, $facet CCTV dan alert per hari"""
+    stats = _empty_stats()
+
+    if tweet_facet:
+        stats['total_tweets'] = _total(tweet_facet['total'])
+        for key in ['sentiment', 'risk_level', 'city', 'category', 'high_risk_city']:
+            stats[key] = _counts_to_series(tweet_facet[key])
+        stats['risk_by_city'] = _risk_by_city_frame(tweet_facet['risk_by_city'])
+        stats['daily_tweets'] = _daily_frame(tweet_facet['daily'], 'count')
+        stats['high_risk'] = int(stats['risk_level'].reindex(HIGH_RISK_LEVELS).fillna(0).sum())
+
+    if cctv_facet:
+        stats['total_cctv'] = _total(cctv_facet['total'])
+        stats['anomaly_status'] = _counts_to_series(cctv_facet['anomaly_status'])
+        stats['cctv_location'] = _counts_to_series(cctv_facet['location'])
+        stats['anomaly_location'] = _counts_to_series(cctv_facet['anomaly_location'])
+        stats['anomaly_city'] = _counts_to_series(cctv_facet['anomaly_city'])
+        stats['cctv_anomalies'] = int(stats['anomaly_status'].get(True, 0))
+
+    since = (datetime.now() - timedelta(days=trend_days)).strftime('%Y-%m-%d')
+    stats['alert_trend'] = _daily_frame([row for row in alert_rows if str(row.get("_id")) >= since],
+                                        'alert_count')
+
+    return stats
+
+# ========== HITUNG DARI DATAFRAME ==========
+def _value_counts(values):
+    """value_counts() yang hanya berisi nilai yang muncul (aman untuk kolom category)"""
+    counts = values.value_counts()
+    counts = counts[counts > 0]
+    if isinstance(counts.index, pd.CategoricalIndex):
+        counts.index = counts.index.astype(object)
+    return counts
+
+def stats_from_frames(tweets_df, cctv_df, alerts_df, trend_days=7):
+    """Hitung statistik yang sama dari DataFrame (untuk data dummy/offline)"""
+    stats = _empty_stats()
+
+    if not tweets_df.empty:
+        stats['total_tweets'] = len(tweets_df)
+        for key in ['sentiment', 'risk_level', 'city', 'category']:
+            if key in tweets_df.columns:
+                stats[key] = _value_counts(tweets_df[key])
+        if 'risk_level' in tweets_df.columns:
+            high_risk_df = tweets_df[tweets_df['risk_level'].isin(HIGH_RISK_LEVELS)]
+            stats['high_risk'] = len(high_risk_df)
+            if 'city' in tweets_df.columns:
+                stats['high_risk_city'] = _value_counts(high_risk_df['city'])
+                stats['risk_by_city'] = tweets_df.groupby(['city', 'risk_level'], observed=True).size().unstack(fill_value=0)
+        if 'created_at' in tweets_df.columns:
+            dates = pd.to_datetime(tweets_df['created_at'], errors='coerce').dt.date
+            stats['daily_tweets'] = dates.value_counts().sort_index().rename_axis('date').reset_index(name='count')
+
+    if not cctv_df.empty:
+        stats['total_cctv'] = len(cctv_df)
+        if 'is_anomaly' in cctv_df.columns:
+            stats['anomaly_status'] = _value_counts(cctv_df['is_anomaly'])
+            anomaly_df = cctv_df[cctv_df['is_anomaly'] == True]
+            stats['cctv_anomalies'] = len(anomaly_df)
+            if 'location' in cctv_df.columns:
+                stats['anomaly_location'] = _value_counts(anomaly_df['location'])
+            if 'city' in cctv_df.columns:
+                stats['anomaly_city'] = _value_counts(anomaly_df['city'])
+        if 'location' in cctv_df.columns:
+            stats['cctv_location'] = _value_counts(cctv_df['location'])
+
+    if not alerts_df.empty and 'created_at' in alerts_df.columns:
+        created_at = pd.to_datetime(alerts_df['created_at'])
+        recent = created_at[created_at >= datetime.now() - timedelta(days=trend_days)]
+        stats['alert_trend'] = recent.dt.date.value_counts().sort_index().rename_axis('date').reset_index(name='alert_count')
+
+    return stats
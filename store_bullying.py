@@ -0,0 +1,297 @@
+# store_bullying.py
+# Store inkremental untuk statistik dashboard
+# Hasil agregasi disimpan di memori proses (satu store untuk semua sesi Streamlit).
+# Setiap refresh hanya mengagregasi dokumen yang masuk setelah watermark terakhir
+# lalu menjumlahkannya ke hitungan yang sudah ada, sehingga biaya refresh
+# sebanding dengan jumlah dokumen baru, bukan total dokumen.
+# Delta ketiga koleksi diambil paralel di thread pool, masing-masing dengan
+# interval refresh dan batas waktu sendiri; koleksi yang lambat tidak menahan
+# statistik koleksi lain (hasil terakhirnya dipakai dan ditandai stale).
+# Statistik CCTV dibaca dari tier rollup (cctv_daily/cctv_hourly) jika sudah
+# terisi; delta log mentah hanya dipakai sebelum tier ada.
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from bson import ObjectId
+from pymongo import DESCENDING
+from stats_bullying import (
+    build_tweet_stats_pipeline, build_cctv_stats_pipeline, build_alert_trend_pipeline,
+    stats_from_facets
+)
+from rollup_bullying import load_cctv_tier_facet
+from timing_bullying import record
+
+# Field watermark per koleksi:
+#   tweets    -> processed_at (tweet baru masuk statistik setelah selesai diproses)
+#   cctv_logs -> timestamp (timeField time-series; _id tidak terindeks di koleksi
+#                time-series sehingga setiap delta memindai seluruh log mentah)
+#   alerts    -> _id (ObjectId berisi waktu pembuatan, dibatasi WATERMARK_GRACE)
+TWEET_WATERMARK_FIELD = "processed_at"
+CCTV_WATERMARK_FIELD = "timestamp"
+ALERT_WATERMARK_FIELD = "_id"
+
+# Watermark CCTV saat hitungan diambil dari tier rollup (bukan delta log mentah)
+CCTV_TIER_WATERMARK = "rollup"
+
+# Dokumen dengan watermark lebih baru dari sekian detik belum dihitung: satu chunk
+# pipeline memakai processed_at yang sama dan bulk_write-nya tidak atomik, log
+# CCTV bisa masuk sedikit terlambat dari timestamp-nya, dan _id alert dibuat
+# sebelum commit oleh beberapa penulis (stream, notebook, telemetri), jadi dokumen
+# yang masih ditulis baru diambil pada refresh berikutnya
+WATERMARK_GRACE = 15
+
+# Jeda minimum antar refresh otomatis per koleksi (detik): log CCTV terus masuk
+# dari kamera, tweet dan alert mengikuti batch pipeline
+REFRESH_INTERVALS = {"tweets": 30, "cctv": 10, "alerts": 60}
+
+# Batas waktu fetch delta per koleksi (detik), juga dikirim sebagai maxTimeMS agregasi
+DELTA_TIMEOUT = 10
+
+# ========== HELPER MERGE ==========
+def _row_key(value):
+    """Key hashable untuk _id hasil $group (dict menjadi tuple)"""
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    return value
+
+def _merge_rows(bucket, rows):
+    """Tambahkan hasil $group (_id, count) ke bucket hitungan"""
+    for row in rows:
+        key = _row_key(row.get("_id"))
+        if key in bucket:
+            bucket[key]["count"] += row["count"]
+        else:
+            bucket[key] = {"_id": row.get("_id"), "count": row["count"]}
+
+def _delta_query(field, low, high):
+    """Filter dokumen dengan watermark di rentang (low, high]"""
+    bounds = {"$lte": high}
+    if low is not None:
+        bounds["$gt"] = low
+    return {field: bounds}
+
+# ========== STORE INKREMENTAL ==========
+class IncrementalStore:
+    """Statistik dashboard yang diperbarui per delta berdasarkan watermark"""
+
+    def __init__(self, db, tweets_name, cctv_name, alerts_name):
+        self.db = db
+        self.tweets_name = tweets_name
+        self.cctv_name = cctv_name
+        self.alerts_name = alerts_name
+        self.names = {"tweets": tweets_name, "cctv": cctv_name, "alerts": alerts_name}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.names), thread_name_prefix="store-delta")
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        """Kosongkan semua hitungan; refresh berikutnya membangun ulang dari awal"""
+        self._tweet_total = 0
+        self._tweet_counts = {}
+        self._cctv_total = 0
+        self._cctv_counts = {}
+        self._alert_counts = {}
+        self._watermarks = {"tweets": None, "cctv": None, "alerts": None}
+        self.last_refresh = dict.fromkeys(self.names)
+        self.last_delta = dict.fromkeys(self.names, 0)
+        # kind -> alasan (timeout/exception) untuk koleksi yang statistiknya tidak terbaru
+        self.stale = {}
+        # kind -> (watermark saat fetch dimulai, future) untuk fetch yang belum digabung;
+        # fetch lama yang masih jalan saat reset diabaikan hasilnya
+        self._pending = {}
+        # Naik setiap isi store berubah; dipakai sebagai key cache figure dashboard
+        self.version += 1
+
+    def _latest(self, collection, field, query):
+        """Nilai watermark terbaru di koleksi (None jika kosong)"""
+        doc = collection.find_one(query, {field: 1}, sort=[(field, DESCENDING)])
+        return doc.get(field) if doc else None
+
+    def _merge_facet(self, facet, counts):
+        """Jumlahkan satu hasil $facet delta ke hitungan store, return jumlah dokumen delta"""
+        if not facet:
+            return 0
+        for name, rows in facet.items():
+            if name != "total":
+                _merge_rows(counts.setdefault(name, {}), rows)
+        return facet["total"][0]["n"] if facet["total"] else 0
+
+    # Fetch delta jalan di thread pool (hanya baca MongoDB, tidak mengubah store);
+    # hasilnya (watermark terbaru, facet/rows) digabung di thread pemanggil.
+    def _fetch_tweets(self, watermark):
+        """Agregasi tweet yang diproses setelah watermark"""
+        collection = self.db[self.tweets_name]
+        base = {"processed": True, TWEET_WATERMARK_FIELD: {"$type": "date"}}
+        latest = self._latest(collection, TWEET_WATERMARK_FIELD, base)
+        if latest is None:
+            return latest, None
+        latest = min(latest, datetime.now() - timedelta(seconds=WATERMARK_GRACE))
+        if watermark is not None and latest <= watermark:
+            return watermark, None
+        match = _delta_query(TWEET_WATERMARK_FIELD, watermark, latest)
+        pipeline = build_tweet_stats_pipeline(match)
+        return latest, next(collection.aggregate(pipeline, maxTimeMS=DELTA_TIMEOUT * 1000), None)
+
+    def _fetch_cctv(self, watermark):
+        """Hitungan CCTV dari tier rollup, atau agregasi log mentah setelah watermark
+
+        Tier rollup kecil (satu dokumen per lokasi per hari) dan sudah memuat
+        riwayat yang lebih tua dari TTL log mentah, jadi dibaca utuh setiap refresh.
+        Tanpa tier, log mentah diambil per delta timestamp; log yang timestamp-nya
+        lebih tua dari watermark saat di-insert tidak ikut terhitung.
+        """
+        facet = load_cctv_tier_facet(self.db, maxTimeMS=DELTA_TIMEOUT * 1000)
+        if facet is not None:
+            return CCTV_TIER_WATERMARK, facet
+        if watermark == CCTV_TIER_WATERMARK:
+            watermark = None
+        collection = self.db[self.cctv_name]
+        latest = self._latest(collection, CCTV_WATERMARK_FIELD, {})
+        if latest is None:
+            return latest, None
+        latest = min(latest, datetime.now() - timedelta(seconds=WATERMARK_GRACE))
+        if watermark is not None and latest <= watermark:
+            return watermark, None
+        match = _delta_query(CCTV_WATERMARK_FIELD, watermark, latest)
+        pipeline = build_cctv_stats_pipeline(match)
+        return latest, next(collection.aggregate(pipeline, maxTimeMS=DELTA_TIMEOUT * 1000), None)
+
+    def _fetch_alerts(self, watermark):
+        """Hitung alert per hari untuk alert yang di-insert setelah watermark"""
+        collection = self.db[self.alerts_name]
+        latest = self._latest(collection, ALERT_WATERMARK_FIELD, {})
+        if latest is None:
+            return latest, None
+        grace = datetime.now(timezone.utc) - timedelta(seconds=WATERMARK_GRACE)
+        latest = min(latest, ObjectId.from_datetime(grace))
+        if watermark is not None and latest <= watermark:
+            return watermark, None
+        match = _delta_query(ALERT_WATERMARK_FIELD, watermark, latest)
+        pipeline = build_alert_trend_pipeline(match=match)
+        return latest, list(collection.aggregate(pipeline, maxTimeMS=DELTA_TIMEOUT * 1000))
+
+    def _timed_fetch(self, kind, watermark):
+        """Jalankan fetch satu koleksi di worker, return (detik, watermark terbaru, hasil)"""
+        start = time.perf_counter()
+        latest, result = getattr(self, f"_fetch_{kind}")(watermark)
+        return time.perf_counter() - start, latest, result
+
+    def _apply(self, kind, watermark, latest, result):
+        """Gabungkan hasil fetch ke hitungan store, return jumlah dokumen delta"""
+        if result is None or self._watermarks[kind] != watermark:
+            # Tidak ada delta, atau store sudah di-reset sejak fetch dimulai
+            return 0
+        if kind == "tweets":
+            added = self._merge_facet(result, self._tweet_counts)
+            self._tweet_total += added
+        elif kind == "cctv" and latest == CCTV_TIER_WATERMARK:
+            # Tier rollup berisi total lengkap: ganti hitungan, delta = selisih total
+            previous = self._cctv_total
+            self._cctv_counts = {}
+            self._cctv_total = self._merge_facet(result, self._cctv_counts)
+            added = self._cctv_total - previous
+        elif kind == "cctv":
+            if watermark == CCTV_TIER_WATERMARK:
+                # Tier rollup hilang: hitung ulang dari log mentah
+                self._cctv_counts = {}
+                self._cctv_total = 0
+            added = self._merge_facet(result, self._cctv_counts)
+            self._cctv_total += added
+        else:
+            _merge_rows(self._alert_counts, result)
+            added = sum(row["count"] for row in result)
+        self._watermarks[kind] = latest
+        return added
+
+    def _has_deletions(self):
+        """Deteksi dokumen terhapus dari estimated_document_count (metadata, tanpa scan)
+
+        Jumlah dokumen di koleksi lebih kecil dari hitungan store berarti ada yang
+        dihapus. Tweet yang diproses ulang tidak perlu dicek di sini: penulisnya
+        (pipeline_bullying.write_processed_tweets) mempertahankan processed_at lama,
+        jadi tweet itu tidak masuk delta lagi. Log CCTV tidak dicek: dengan tier
+        rollup hitungannya diganti utuh setiap refresh, tanpa tier log mentah yang
+        kedaluwarsa lewat TTL tetap terhitung.
+        """
+        options = {"maxTimeMS": DELTA_TIMEOUT * 1000}
+        stored_alerts = sum(row["count"] for row in self._alert_counts.values())
+        if self.db[self.alerts_name].estimated_document_count(**options) < stored_alerts:
+            return True
+        return self.db[self.tweets_name].estimated_document_count(**options) < self._tweet_total
+
+    def _due(self, force, now):
+        """Koleksi yang sudah lewat REFRESH_INTERVALS-nya (semua jika force)"""
+        return [kind for kind in self.names
+                if force or self.last_refresh[kind] is None
+                or now - self.last_refresh[kind] >= REFRESH_INTERVALS[kind]]
+
+    def refresh(self, force=False):
+        """Tarik delta semua koleksi yang jatuh tempo secara paralel
+
+        Koleksi yang melewati DELTA_TIMEOUT atau gagal dicatat di stale dan
+        statistiknya memakai hasil terakhir; fetch yang terlambat tetap jalan
+        dan hasilnya digabung pada refresh berikutnya.
+        """
+        with self._lock:
+            now = time.time()
+            due = self._due(force, now)
+            if not due and not any(future.done() for _, future in self._pending.values()):
+                return self.last_delta
+            if any(self.last_refresh.values()) and self._has_deletions():
+                print("⚠️ Ada dokumen terhapus, membangun ulang statistik...")
+                self.reset()
+                due = list(self.names)
+
+            for kind in due:
+                if kind not in self._pending:
+                    watermark = self._watermarks[kind]
+                    self._pending[kind] = (watermark, self._executor.submit(self._timed_fetch, kind, watermark))
+
+            deadline = time.monotonic() + DELTA_TIMEOUT
+            delta = {}
+            for kind, (watermark, future) in list(self._pending.items()):
+                # Fetch terlambat dari refresh sebelumnya hanya diambil jika sudah selesai
+                wait = max(0, deadline - time.monotonic()) if kind in due else 0
+                try:
+                    seconds, latest, result = future.result(timeout=wait)
+                except FuturesTimeoutError:
+                    if kind in due:
+                        # Jangan tunggu fetch yang sama lagi sampai interval berikutnya
+                        self.stale[kind] = f"timeout > {DELTA_TIMEOUT}s"
+                        self.last_refresh[kind] = now
+                        print(f"⏳ Delta {self.names[kind]} melewati {DELTA_TIMEOUT}s, memakai statistik terakhir")
+                    continue
+                except Exception as e:
+                    del self._pending[kind]
+                    self.stale[kind] = type(e).__name__
+                    self.last_refresh[kind] = now
+                    print(f"❌ Delta {self.names[kind]} gagal: {e}")
+                    continue
+                del self._pending[kind]
+                delta[kind] = self._apply(kind, watermark, latest, result)
+                self.stale.pop(kind, None)
+                self.last_refresh[kind] = now
+                record(f"mongo.delta.{self.names[kind]}", seconds, rows=delta[kind])
+
+            self.last_delta = {kind: delta.get(kind, 0) for kind in self.names}
+            if any(self.last_delta.values()):
+                self.version += 1
+            print(f"🔄 Delta refresh: {self.last_delta}" + (f" (stale: {self.stale})" if self.stale else ""))
+            return self.last_delta
+
+    def stats(self, trend_days=7):
+        """Dict statistik dashboard dari hitungan yang tersimpan"""
+        with self._lock:
+            tweet_facet = {name: list(bucket.values()) for name, bucket in self._tweet_counts.items()}
+            tweet_facet["total"] = [{"n": self._tweet_total}]
+            cctv_facet = {name: list(bucket.values()) for name, bucket in self._cctv_counts.items()}
+            cctv_facet["total"] = [{"n": self._cctv_total}]
+            alert_rows = list(self._alert_counts.values())
+        return stats_from_facets(
+            tweet_facet if self._tweet_counts else None,
+            cctv_facet if self._cctv_counts else None,
+            alert_rows, trend_days
+        )
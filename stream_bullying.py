@@ -0,0 +1,201 @@
+# stream_bullying.py
+# Ingestion tweet secara streaming
+# Producer async mengisi antrean berukuran tetap: jika antrean penuh producer
+# menunggu (backpressure), sehingga memori tidak tumbuh tanpa batas. Consumer
+# mengumpulkan micro-batch dan mem-flush-nya ke jalur proses + bulk_write saat
+# ukuran batch tercapai atau batas waktu habis.
+
+import asyncio
+import time
+import pandas as pd
+from pipeline_bullying import process_micro_batch
+from timing_bullying import write_metrics
+
+DEFAULT_QUEUE_SIZE = 2000
+DEFAULT_MICRO_BATCH = 200
+DEFAULT_FLUSH_SECONDS = 2.0
+
+# Kolom hasil analisis di file export, dibuang agar dihitung ulang saat replay
+ANALYSIS_COLUMNS = ['sentiment', 'risk_level', 'risk_score', 'category',
+                    'bullying_detected', 'processed_at', 'processed_text']
+COUNT_COLUMNS = ['retweet_count', 'like_count', 'reply_count']
+
+# ========== SUMBER TWEET ==========
+def load_tweet_records(path):
+    """Baca file tweets_export_*.csv menjadi list tweet mentah (belum diproses)"""
+    df = pd.read_csv(path)
+    df = df.drop(columns=[col for col in ANALYSIS_COLUMNS if col in df.columns])
+    df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna(0).astype(int)
+    df = df.dropna(subset=['text'])
+    return df.to_dict('records')
+
+async def csv_tweet_source(path, rate=None, repeat=1):
+    """Replay file CSV sebagai stream tweet (pengganti API live)
+
+    rate: tweet per detik (None = secepat mungkin)
+    repeat: berapa kali file diputar ulang (None = tanpa henti). Putaran
+    berikutnya memberi akhiran _r<n> pada tweet_id agar tidak menimpa tweet lama.
+    """
+    records = load_tweet_records(path)
+    interval = 1.0 / rate if rate else 0
+    round_no = 0
+    while repeat is None or round_no < repeat:
+        for record in records:
+            tweet = dict(record)
+            if round_no:
+                tweet['tweet_id'] = f"{tweet['tweet_id']}_r{round_no}"
+            tweet['created_at'] = tweet['created_at'].to_pydatetime() if pd.notna(tweet['created_at']) else None
+            tweet['processed'] = False
+            yield tweet
+            await asyncio.sleep(interval)
+        round_no += 1
+
+# ========== METRIK STREAM ==========
+class StreamStats:
+    """Metrik stream: jumlah tweet, kedalaman antrean dan lag"""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.started = time.perf_counter()
+        self.received = 0
+        self.processed = 0
+        self.alerts = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.failed_tweets = 0
+        self.max_queue_depth = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def record_batch(self, size, alerts, lag):
+        """Catat satu micro-batch yang sudah ditulis"""
+        self.processed += size
+        self.alerts += alerts
+        self.batches += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def record_failure(self, size):
+        """Catat satu micro-batch yang gagal dan dilewati"""
+        self.failed_batches += 1
+        self.failed_tweets += size
+
+    def snapshot(self):
+        """Dict metrik saat ini
+
+        lag = waktu dari tweet tertua di batch masuk antrean sampai batch
+        selesai ditulis ke MongoDB.
+        """
+        elapsed = time.perf_counter() - self.started
+        return {
+            'received': self.received,
+            'processed': self.processed,
+            'alerts': self.alerts,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'failed_tweets': self.failed_tweets,
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'max_queue_depth': self.max_queue_depth,
+            'last_lag_seconds': self.last_lag,
+            'max_lag_seconds': self.max_lag,
+            'tweets_per_sec': self.processed / elapsed if elapsed > 0 else 0.0
+        }
+
+# ========== STREAM ==========
+class TweetStream:
+    """Producer → antrean terbatas → consumer micro-batch → proses + bulk_write
+
+    source: async iterable yang menghasilkan dict tweet (mis. csv_tweet_source,
+    atau adaptor stream API live).
+    """
+
+    def __init__(self, tweets_collection, alerts_collection, source,
+                 queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_MICRO_BATCH,
+                 flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.tweets_collection = tweets_collection
+        self.alerts_collection = alerts_collection
+        self.source = source
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue = None
+        self.stats = None
+
+    async def _produce(self):
+        """Masukkan tweet ke antrean; put() menunggu jika antrean penuh"""
+        try:
+            async for tweet in self.source:
+                await self.queue.put((time.monotonic(), tweet))
+                self.stats.received += 1
+                self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+        finally:
+            await self.queue.put(None)
+
+    async def _flush(self, batch):
+        """Proses dan tulis satu micro-batch di thread terpisah
+
+        Batch yang gagal (data rusak, MongoDB error) dicatat lalu dilewati agar
+        consumer tetap berjalan.
+        """
+        tweets = [tweet for _, tweet in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            alerts, _ = await loop.run_in_executor(
+                None, process_micro_batch, self.tweets_collection, self.alerts_collection, tweets
+            )
+        except Exception as e:
+            self.stats.record_failure(len(tweets))
+            print(f"   ❌ Micro-batch gagal ({len(tweets)} tweet dilewati): {type(e).__name__}: {e}")
+            return
+        lag = time.monotonic() - batch[0][0]
+        self.stats.record_batch(len(tweets), len(alerts), lag)
+        # File metrik diperbarui per micro-batch agar stream yang berjalan lama tetap terpantau
+        write_metrics()
+        print(f"   📥 Micro-batch {self.stats.batches}: {len(tweets)} tweet, {len(alerts)} alert, "
+              f"lag {lag:.2f}s, antrean {self.queue.qsize()}/{self.queue.maxsize}")
+
+    async def _consume(self):
+        """Kumpulkan micro-batch, flush saat penuh atau saat flush_seconds habis"""
+        batch = []
+        deadline = None
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush(batch)
+                batch = []
+                continue
+            if item is None:
+                break
+            if not batch:
+                deadline = time.monotonic() + self.flush_seconds
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+
+    async def run(self):
+        """Jalankan producer dan consumer sampai sumber habis, return metrik akhir"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.stats = StreamStats(self.queue)
+        print(f"🚀 Stream dimulai (antrean {self.queue_size}, micro-batch {self.batch_size}, "
+              f"flush {self.flush_seconds}s)")
+        await asyncio.gather(self._produce(), self._consume())
+        snapshot = self.stats.snapshot()
+        print(f"✅ Stream selesai: {snapshot['processed']} tweet, {snapshot['alerts']} alert, "
+              f"{snapshot['batches']} batch ({snapshot['failed_batches']} gagal), {snapshot['tweets_per_sec']:,.0f} tweet/detik, "
+              f"lag maks {snapshot['max_lag_seconds']:.2f}s, antrean maks {snapshot['max_queue_depth']}")
+        return snapshot
+
+def run_csv_stream(tweets_collection, alerts_collection, path, rate=None, repeat=1, **kwargs):
+    """Replay file CSV lewat TweetStream (untuk script; di Jupyter pakai await stream.run())"""
+    stream = TweetStream(tweets_collection, alerts_collection,
+                         csv_tweet_source(path, rate=rate, repeat=repeat), **kwargs)
+    return asyncio.run(stream.run())
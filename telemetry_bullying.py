@@ -0,0 +1,176 @@
+# telemetry_bullying.py
+# Deteksi anomali streaming per kamera CCTV
+# Setiap kamera (cctv_id) punya ring buffer kecil berisi N pembacaan terakhir
+# crowd_level dan noise_level. Pembacaan baru dibandingkan dengan rata-rata dan
+# simpangan baku jendela itu (rolling z-score) sehingga anomali berarti "tidak
+# biasa untuk kamera ini", bukan sekadar lewat ambang global. Update per event
+# O(1): jumlah dan jumlah kuadrat disimpan berjalan, tanpa scan ulang jendela.
+
+import time
+from array import array
+from datetime import datetime
+import pandas as pd
+from rollup_bullying import update_cctv_rollups
+
+DEFAULT_WINDOW = 30          # pembacaan per kamera yang diingat
+DEFAULT_MIN_READINGS = 10    # pemanasan: belum ada event sebelum jendela berisi sebanyak ini
+DEFAULT_Z_THRESHOLD = 3.0    # |z| di atas nilai ini = anomali kuning
+RED_Z_THRESHOLD = 4.5        # |z| di atas nilai ini = anomali merah
+MIN_STD = 1.0                # batas bawah simpangan baku agar kamera yang sangat stabil tidak terlalu sensitif
+DEFAULT_EVENT_BATCH = 500    # event yang ditampung sebelum insert_many
+
+METRICS = ['crowd_level', 'noise_level']
+
+# ========== JENDELA PER KAMERA ==========
+class CameraWindow:
+    """Ring buffer float32 untuk semua metrik satu kamera + jumlah berjalan"""
+
+    __slots__ = ('size', 'values', 'pos', 'count', 'sums', 'squares', 'updates')
+
+    def __init__(self, size=DEFAULT_WINDOW):
+        self.size = size
+        self.values = [array('f', bytes(4 * size)) for _ in METRICS]
+        self.pos = 0
+        self.count = 0
+        self.sums = [0.0] * len(METRICS)
+        self.squares = [0.0] * len(METRICS)
+        self.updates = 0
+
+    def zscores(self, readings):
+        """z-score tiap metrik terhadap isi jendela saat ini (sebelum pembacaan baru masuk)"""
+        scores = []
+        for i, value in enumerate(readings):
+            mean = self.sums[i] / self.count
+            variance = max(self.squares[i] / self.count - mean * mean, 0.0)
+            scores.append((value - mean) / max(variance ** 0.5, MIN_STD))
+        return scores
+
+    def push(self, readings):
+        """Masukkan satu pembacaan, buang yang tertua jika jendela penuh"""
+        full = self.count == self.size
+        for i, value in enumerate(readings):
+            buffer = self.values[i]
+            if full:
+                old = buffer[self.pos]
+                self.sums[i] -= old
+                self.squares[i] -= old * old
+            buffer[self.pos] = value
+            self.sums[i] += value
+            self.squares[i] += value * value
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        # Hitung ulang jumlah dari buffer sesekali agar galat pengurangan float tidak menumpuk
+        self.updates += 1
+        if self.updates % self.size == 0:
+            self.sums = [sum(buffer[:self.count]) for buffer in self.values]
+            self.squares = [sum(v * v for v in buffer[:self.count]) for buffer in self.values]
+
+# ========== DETEKTOR ==========
+class CctvStreamDetector:
+    """Detektor rolling z-score per cctv_id, satu event per pembacaan"""
+
+    def __init__(self, window=DEFAULT_WINDOW, z_threshold=DEFAULT_Z_THRESHOLD, min_readings=DEFAULT_MIN_READINGS):
+        self.window = window
+        self.z_threshold = z_threshold
+        self.min_readings = min_readings
+        self.cameras = {}
+        self.readings = 0
+        self.events = 0
+
+    def process(self, reading):
+        """Proses satu pembacaan kamera, return dokumen event anomali atau None"""
+        camera = self.cameras.get(reading['cctv_id'])
+        if camera is None:
+            camera = self.cameras[reading['cctv_id']] = CameraWindow(self.window)
+        values = [float(reading[metric]) for metric in METRICS]
+        self.readings += 1
+
+        event = None
+        if camera.count >= self.min_readings:
+            scores = camera.zscores(values)
+            peak = max(abs(score) for score in scores)
+            if peak > self.z_threshold:
+                event = self._build_event(reading, scores, peak)
+        camera.push(values)
+        return event
+
+    def _build_event(self, reading, scores, peak):
+        """Dokumen log CCTV untuk anomali hasil deteksi streaming"""
+        self.events += 1
+        timestamp = reading['timestamp']
+        return {
+            "log_id": f"stream_{reading['cctv_id']}_{timestamp:%Y%m%d%H%M%S}_{self.events}",
+            "cctv_id": reading['cctv_id'],
+            "school": reading.get('school'),
+            "city": reading.get('city'),
+            "location": reading.get('location'),
+            "timestamp": timestamp,
+            "crowd_level": int(reading['crowd_level']),
+            "noise_level": int(reading['noise_level']),
+            "is_anomaly": True,
+            "warning_level": "merah" if peak > RED_Z_THRESHOLD else "kuning",
+            "anomaly_source": "stream_zscore",
+            "crowd_z": round(scores[0], 2),
+            "noise_z": round(scores[1], 2),
+            "detected_at": datetime.now(),
+            "processed": True
+        }
+
+# ========== REPLAY CSV ==========
+def csv_cctv_source(path):
+    """Replay file cctv_logs_export_*.csv sebagai stream pembacaan, urut timestamp"""
+    df = pd.read_csv(path, usecols=['cctv_id', 'school', 'city', 'location', 'timestamp',
+                                    'crowd_level', 'noise_level'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    df = df.dropna(subset=['cctv_id', 'timestamp', 'crowd_level', 'noise_level'])
+    df = df.sort_values('timestamp', kind='stable')
+    for reading in df.to_dict('records'):
+        reading['timestamp'] = reading['timestamp'].to_pydatetime()
+        yield reading
+
+def run_cctv_detector(cctv_collection, source, detector=None, event_batch=DEFAULT_EVENT_BATCH):
+    """Jalankan detektor atas sumber pembacaan dan tulis event anomali ke cctv_logs
+
+    cctv_collection=None hanya menghitung event tanpa menulis. Return report
+    berisi jumlah pembacaan, event, kamera dan throughput (pembacaan/detik).
+    """
+    detector = detector or CctvStreamDetector()
+    pending = []
+    write_seconds = 0.0
+
+    def flush():
+        nonlocal write_seconds
+        if cctv_collection is not None and pending:
+            start = time.perf_counter()
+            cctv_collection.insert_many(pending, ordered=False)
+            update_cctv_rollups(cctv_collection.database, pending)
+            write_seconds += time.perf_counter() - start
+        pending.clear()
+
+    start = time.perf_counter()
+    for reading in source:
+        event = detector.process(reading)
+        if event is not None:
+            pending.append(event)
+            if len(pending) >= event_batch:
+                flush()
+    flush()
+    seconds = time.perf_counter() - start
+
+    report = {
+        'readings': detector.readings,
+        'events': detector.events,
+        'cameras': len(detector.cameras),
+        'seconds': seconds,
+        'write_seconds': write_seconds,
+        'readings_per_sec': detector.readings / seconds if seconds > 0 else 0.0,
+        'detect_readings_per_sec': detector.readings / (seconds - write_seconds) if seconds > write_seconds else 0.0
+    }
+    print(f"📹 Detektor streaming: {report['readings']} pembacaan dari {report['cameras']} kamera, "
+          f"{report['events']} event anomali, {report['readings_per_sec']:,.0f} pembacaan/detik "
+          f"(deteksi saja {report['detect_readings_per_sec']:,.0f}/detik)")
+    return report
+
+def replay_cctv_csv(cctv_collection, path, **kwargs):
+    """Replay satu file export CCTV lewat detektor streaming (untuk pengujian)"""
+    return run_cctv_detector(cctv_collection, csv_cctv_source(path), **kwargs)
@@ -0,0 +1,277 @@
+# timing_bullying.py
+# Instrumentasi waktu per tahap (fetch MongoDB, build DataFrame, filter, figure, pipeline)
+# Setiap tahap dicatat sebagai span: nama tahap, waktu dinding, jumlah baris dan
+# ukuran data (byte). Span dikumpulkan dua kali:
+#   - per rerun (per thread script Streamlit) untuk panel timing di sidebar
+#   - akumulasi per proses untuk metrik format Prometheus (textfile collector)
+# Jika env BULLYING_TIMING_LOG diisi, setiap span juga ditulis sebagai satu baris
+# JSON ke file tersebut; env BULLYING_METRICS_FILE menentukan file metrik Prometheus.
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+TIMING_LOG_PATH = os.environ.get("BULLYING_TIMING_LOG")
+METRICS_FILE_PATH = os.environ.get("BULLYING_METRICS_FILE")
+METRIC_PREFIX = "bullying_stage"
+
+# Span per rerun yang disimpan; proses tanpa rerun (notebook/stream) tidak menumpuk memori
+MAX_RERUN_SPANS = 500
+
+# Batas bucket histogram waktu (detik)
+SECONDS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# ========== SPAN ==========
+class Span:
+    """Satu tahap yang diukur; rows/nbytes boleh diisi di dalam blok timed"""
+
+    __slots__ = ('stage', 'seconds', 'rows', 'nbytes', 'depth', 'error', 'started_at')
+
+    def __init__(self, stage, rows=None, nbytes=None, depth=0):
+        self.stage = stage
+        self.seconds = 0.0
+        self.rows = rows
+        self.nbytes = nbytes
+        self.depth = depth
+        self.error = None
+        self.started_at = datetime.now()
+
+    def measure(self, obj):
+        """Isi rows dan nbytes dari hasil tahap (DataFrame, tabel Arrow, list)"""
+        rows, nbytes = size_of(obj)
+        if rows is not None:
+            self.rows = rows
+        if nbytes is not None:
+            self.nbytes = nbytes
+        return obj
+
+    def to_dict(self):
+        return {
+            "ts": self.started_at.isoformat(timespec="milliseconds"),
+            "stage": self.stage,
+            "seconds": round(self.seconds, 6),
+            "rows": self.rows,
+            "bytes": self.nbytes,
+            "depth": self.depth,
+            "error": self.error
+        }
+
+def size_of(obj):
+    """(jumlah baris, ukuran byte) dari hasil tahap; None jika tidak diketahui
+
+    Ukuran DataFrame memakai memory_usage tanpa deep agar pengukuran tetap murah.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(index=False).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), int(obj.memory_usage(index=False))
+    if isinstance(obj, (pa.Table, pa.RecordBatch)):
+        return obj.num_rows, obj.nbytes
+    if isinstance(obj, (list, dict)):
+        return len(obj), None
+    return None, None
+
+# ========== METRIK AKUMULASI ==========
+class StageMetrics:
+    """Akumulasi per tahap untuk seluruh proses (aman dipakai banyak sesi/thread)"""
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def observe(self, span):
+        with self._lock:
+            entry = self._stages.get(span.stage)
+            if entry is None:
+                entry = self._stages[span.stage] = {
+                    "calls": 0, "errors": 0, "seconds": 0.0, "rows": 0, "bytes": 0,
+                    "buckets": [0] * len(self.buckets)
+                }
+            entry["calls"] += 1
+            entry["errors"] += int(span.error is not None)
+            entry["seconds"] += span.seconds
+            entry["rows"] += span.rows or 0
+            entry["bytes"] += span.nbytes or 0
+            for i, bound in enumerate(self.buckets):
+                if span.seconds <= bound:
+                    entry["buckets"][i] += 1
+
+    def snapshot(self):
+        """Salinan akumulasi per tahap"""
+        with self._lock:
+            return {stage: {**entry, "buckets": list(entry["buckets"])} for stage, entry in self._stages.items()}
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+
+    def to_prometheus(self, prefix=METRIC_PREFIX):
+        """Teks exposition format Prometheus (counter + histogram waktu per tahap)"""
+        stages = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_seconds Waktu dinding per tahap dashboard/pipeline",
+            f"# TYPE {prefix}_seconds histogram"
+        ]
+        for stage, entry in sorted(stages.items()):
+            label = _label(stage)
+            for bound, count in zip(self.buckets, entry["buckets"]):
+                lines.append(f'{prefix}_seconds_bucket{{stage="{label}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_seconds_bucket{{stage="{label}",le="+Inf"}} {entry["calls"]}')
+            lines.append(f'{prefix}_seconds_sum{{stage="{label}"}} {entry["seconds"]:.6f}')
+            lines.append(f'{prefix}_seconds_count{{stage="{label}"}} {entry["calls"]}')
+        for name, key, help_text in [("rows_total", "rows", "Baris yang diproses per tahap"),
+                                     ("bytes_total", "bytes", "Ukuran data per tahap (byte)"),
+                                     ("errors_total", "errors", "Tahap yang gagal (exception)")]:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for stage, entry in sorted(stages.items()):
+                lines.append(f'{prefix}_{name}{{stage="{_label(stage)}"}} {entry[key]}')
+        return "\n".join(lines) + "\n"
+
+def _label(value):
+    """Escape nilai label Prometheus"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+METRICS = StageMetrics()
+
+# ========== LOG JSON ==========
+class JsonLogWriter:
+    """Tulis span sebagai JSON lines (append, satu baris per span)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                folder = os.path.dirname(self.path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line + "\n")
+
+JSON_LOG = JsonLogWriter(TIMING_LOG_PATH) if TIMING_LOG_PATH else None
+
+# Fungsi tambahan yang mengembalikan teks Prometheus (mis. metrik pool koneksi)
+METRIC_PROVIDERS = []
+
+def register_metrics(provider):
+    """Daftarkan fungsi () → teks Prometheus yang ikut ditulis write_metrics"""
+    if provider not in METRIC_PROVIDERS:
+        METRIC_PROVIDERS.append(provider)
+
+def prometheus_text():
+    """Metrik tahap + semua provider terdaftar dalam satu teks Prometheus"""
+    return METRICS.to_prometheus() + "".join(provider() for provider in METRIC_PROVIDERS)
+
+def write_metrics(path=None):
+    """Tulis metrik Prometheus ke file (atomic replace) untuk node_exporter textfile collector"""
+    path = path or METRICS_FILE_PATH
+    if not path:
+        return None
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(temp_path, path)
+    return path
+
+# ========== SPAN PER RERUN ==========
+_local = threading.local()
+
+def _rerun_state():
+    if not hasattr(_local, "spans"):
+        _local.spans = deque(maxlen=MAX_RERUN_SPANS)
+        _local.depth = 0
+        _local.started = time.perf_counter()
+    return _local
+
+def start_rerun():
+    """Mulai pencatatan rerun baru di thread ini (span rerun sebelumnya dibuang)"""
+    state = _rerun_state()
+    state.spans = deque(maxlen=MAX_RERUN_SPANS)
+    state.depth = 0
+    state.started = time.perf_counter()
+
+def rerun_spans():
+    """Span yang tercatat sejak start_rerun di thread ini, urut waktu mulai"""
+    return list(_rerun_state().spans)
+
+def rerun_seconds():
+    """Waktu dinding sejak start_rerun di thread ini"""
+    return time.perf_counter() - _rerun_state().started
+
+def finish_rerun():
+    """Tutup rerun: tulis file metrik Prometheus jika dikonfigurasi"""
+    return write_metrics()
+
+def _finish(span):
+    METRICS.observe(span)
+    if JSON_LOG is not None:
+        JSON_LOG.write(span)
+
+# ========== API PENCATATAN ==========
+@contextmanager
+def timed(stage, rows=None, nbytes=None):
+    """Ukur satu blok kode sebagai tahap
+
+    with timed("filter.tweets") as span:
+        result = span.measure(filter_frame(df, query))
+    """
+    state = _rerun_state()
+    span = Span(stage, rows, nbytes, state.depth)
+    state.spans.append(span)
+    state.depth += 1
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        span.seconds = time.perf_counter() - start
+        state.depth -= 1
+        _finish(span)
+
+def timed_call(stage):
+    """Decorator timed; stage boleh string atau fungsi(*args, **kwargs) → nama tahap
+
+    Baris dan ukuran diambil dari nilai return fungsi.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            name = stage(*args, **kwargs) if callable(stage) else stage
+            with timed(name) as span:
+                return span.measure(func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def record(stage, seconds, rows=None, nbytes=None):
+    """Catat tahap yang waktunya sudah diukur sendiri (mis. report pipeline)"""
+    span = Span(stage, rows, nbytes, _rerun_state().depth)
+    span.seconds = seconds
+    _rerun_state().spans.append(span)
+    _finish(span)
+    return span
+
+def spans_frame(spans):
+    """DataFrame ringkas untuk panel timing: tahap (↳ = sub-tahap), ms, baris, MB"""
+    return pd.DataFrame({
+        "tahap": [("  " * (span.depth - 1) + "↳ " if span.depth else "") + span.stage + (" ⚠️" if span.error else "")
+                  for span in spans],
+        "ms": [round(span.seconds * 1000, 1) for span in spans],
+        "baris": pd.array([span.rows for span in spans], dtype="Int64"),
+        "MB": [None if span.nbytes is None else round(span.nbytes / 1024 / 1024, 3) for span in spans]
+    })